@@ -0,0 +1,168 @@
+# admission.py
+# Admission control and load shedding for /predict.
+#
+# At most `max_in_flight` requests run the model at once; up to `max_queue`
+# more wait for a slot. A waiting request gives up when its deadline passes -
+# and a request is turned away immediately when the expected wait (queue
+# position x recent service time) already exceeds the deadline - so under
+# overload the excess is answered with a fast 503 and Retry-After instead of
+# piling onto the CPUs and stretching everyone's tail latency. Each client
+# (remote address) also has a token bucket refilled at `rate` requests per
+# second up to `burst`; an empty bucket is answered with 429 and Retry-After.
+#
+# X-Forwarded-For is never read here: clients can set it to anything and get
+# a fresh bucket per request. Behind a trusted reverse proxy, wrap the app in
+# werkzeug's ProxyFix so remote_addr is the address that proxy saw:
+#   from werkzeug.middleware.proxy_fix import ProxyFix
+#   app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1)
+#
+# Limits are per process; with several workers the effective limits are
+# multiplied by the worker count. snapshot() exposes queue depth and counters
+# for /metrics/admission.
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import jsonify, request
+
+# Weight of the newest sample in the service-time moving average
+EWMA_WEIGHT = 0.1
+MAX_CLIENTS = 10000
+
+
+class Rejected(Exception):
+    """Request refused; carries the HTTP status and Retry-After seconds"""
+
+    def __init__(self, status, reason, retry_after):
+        super().__init__(reason)
+        self.status = status
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class TokenBuckets:
+    """Per-client token buckets, least recently seen clients evicted first"""
+
+    def __init__(self, rate, burst, max_clients=MAX_CLIENTS):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, client, now=None):
+        """0 if a token was taken, else seconds until one is available"""
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            tokens, stamp = self._buckets.pop(client, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - stamp) * self.rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / self.rate
+            self._buckets[client] = (tokens, now)
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+            return wait
+
+
+class AdmissionController:
+    """In-flight limit with a bounded, deadline-aware wait queue"""
+
+    def __init__(self, max_in_flight, max_queue, deadline, rate=0.0, burst=10):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.deadline = deadline
+        self.buckets = TokenBuckets(rate, burst)
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._waiting = 0
+        self._service_time = 0.05
+        self.counters = {'admitted': 0, 'queued': 0, 'rejected_queue_full': 0,
+                         'rejected_deadline': 0, 'rejected_rate_limit': 0}
+        self._max_waiting_seen = 0
+
+    def _expected_wait(self, position):
+        return position / max(self.max_in_flight, 1) * self._service_time
+
+    def acquire(self, client):
+        """Block until the request may run and return its start time; raises Rejected otherwise"""
+        wait = self.buckets.take(client)
+        if wait:
+            with self._cond:
+                self.counters['rejected_rate_limit'] += 1
+            raise Rejected(429, 'rate limit exceeded', wait)
+
+        start = time.monotonic()
+        with self._cond:
+            if self._in_flight < self.max_in_flight and not self._waiting:
+                self._in_flight += 1
+                self.counters['admitted'] += 1
+                return time.monotonic()
+            if self._waiting >= self.max_queue:
+                self.counters['rejected_queue_full'] += 1
+                raise Rejected(503, 'server busy', self._expected_wait(self._waiting + 1))
+            if self._expected_wait(self._waiting + 1) > self.deadline:
+                self.counters['rejected_deadline'] += 1
+                raise Rejected(503, 'server busy', self._expected_wait(self._waiting + 1))
+
+            self._waiting += 1
+            self.counters['queued'] += 1
+            self._max_waiting_seen = max(self._max_waiting_seen, self._waiting)
+            try:
+                while self._in_flight >= self.max_in_flight:
+                    remaining = self.deadline - (time.monotonic() - start)
+                    if remaining <= 0:
+                        self.counters['rejected_deadline'] += 1
+                        raise Rejected(503, 'queue deadline exceeded', self._expected_wait(self._waiting))
+                    self._cond.wait(remaining)
+            finally:
+                self._waiting -= 1
+            self._in_flight += 1
+            self.counters['admitted'] += 1
+            return time.monotonic()
+
+    def release(self, started):
+        """Free the slot and fold this request's service time into the estimate"""
+        elapsed = time.monotonic() - started
+        with self._cond:
+            self._in_flight -= 1
+            self._service_time += EWMA_WEIGHT * (elapsed - self._service_time)
+            self._cond.notify()
+
+    def snapshot(self):
+        with self._cond:
+            return {
+                'in_flight': self._in_flight,
+                'queue_depth': self._waiting,
+                'max_queue_depth_seen': self._max_waiting_seen,
+                'max_in_flight': self.max_in_flight,
+                'max_queue': self.max_queue,
+                'deadline_seconds': self.deadline,
+                'service_time_ms': round(self._service_time * 1000, 2),
+                **self.counters
+            }
+
+    def guard(self, view):
+        """Decorator running a Flask view under admission control"""
+        @wraps(view)
+        def guarded(*args, **kwargs):
+            client = request.remote_addr or 'unknown'
+            try:
+                started = self.acquire(client)
+            except Rejected as e:
+                return jsonify({
+                    'success': False,
+                    'error': f"Request rejected: {e.reason}",
+                    'suggestion': 'Retry after the number of seconds in Retry-After.'
+                }), e.status, {'Retry-After': str(max(1, math.ceil(e.retry_after)))}
+            try:
+                return view(*args, **kwargs)
+            finally:
+                self.release(started)
+        return guarded
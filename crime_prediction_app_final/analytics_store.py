@@ -0,0 +1,304 @@
+# analytics_store.py
+# Columnar copy of crime_table for analytic scans.
+#
+# crime_table is created by df.to_sql, so every analytic query is a full row
+# scan over untyped SQLite pages. This module keeps a Parquet copy of it,
+# partitioned by District and Year, with the text columns dictionary-encoded,
+# and reads it back through memory-mapped Arrow with column and partition
+# pruning.
+#
+# Usage:
+#   python analytics_store.py            # append rows inserted since the last sync
+#   python analytics_store.py --full     # rebuild the whole store
+#
+# The incremental sync follows the "ID" watermark, so updates or deletes of
+# already-synced rows need a --full rebuild.
+#
+# arrow_stream() serves bulk consumers (/getData?format=arrow, --export): the
+# table as an Arrow IPC stream with the same dictionary-encoded text columns,
+# written batch by batch straight from the DB cursor. Clients read it
+# zero-copy with pyarrow.ipc.open_stream(...).read_all().
+#
+#   python analytics_store.py --export crime_table.arrows
+import argparse
+import io
+import json
+import os
+import shutil
+import sqlite3
+import time
+from datetime import datetime
+
+from config import DB_PATH, TABLE_NAME, PARQUET_ROOT
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.fs as pafs
+except ImportError:
+    pa = None
+
+DICTIONARY_COLUMNS = ['Primary Type', 'Description', 'Location Description',
+                      'Crime Category', 'DayorNight']
+STATE_FILE = '_sync_state.json'
+BATCH_SIZE = 100000
+ARROW_STREAM_TYPE = 'application/vnd.apache.arrow.stream'
+
+_dataset_cache = {'key': None, 'dataset': None}
+
+
+def _partitioning():
+    return ds.partitioning(pa.schema([('District', pa.int64()), ('Year', pa.int64())]),
+                           flavor='hive')
+
+
+def _arrow_type(name, declared):
+    """Map the SQLite declared type written by df.to_sql to an Arrow type"""
+    declared = (declared or '').upper()
+    if name in DICTIONARY_COLUMNS:
+        return pa.dictionary(pa.int32(), pa.string())
+    if 'INT' in declared:
+        return pa.int64()
+    if 'REAL' in declared or 'FLOA' in declared or 'DOUB' in declared:
+        return pa.float64()
+    if declared:
+        return pa.string()
+    return None
+
+
+def table_schema(conn, columns=None):
+    """Arrow schema for crime_table (or a subset of its columns)"""
+    info = conn.execute(f'PRAGMA table_info("{TABLE_NAME}")').fetchall()
+    declared = {row[1]: row[2] for row in info}
+    names = columns if columns is not None else list(declared)
+    fields = []
+    for name in names:
+        typ = _arrow_type(name, declared.get(name))
+        fields.append(pa.field(name, typ if typ is not None else pa.string()))
+    return pa.schema(fields)
+
+
+def iter_record_batches(cursor, schema, batch_size=BATCH_SIZE):
+    """Convert rows from an executed cursor into Arrow record batches"""
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        columns = list(zip(*rows))
+        arrays = [pa.array(column, type=field.type) for column, field in zip(columns, schema)]
+        yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def _with_year(batch):
+    """Add the Year partition column, taken from Date when the table has one"""
+    if 'Date' in batch.schema.names:
+        years = [int(v[:4]) if isinstance(v, str) and v[:4].isdigit() else None
+                 for v in batch.column('Date').to_pylist()]
+    elif 'Year' in batch.schema.names:
+        return batch
+    else:
+        years = [None] * batch.num_rows
+    return batch.append_column('Year', pa.array(years, type=pa.int64()))
+
+
+def _read_state(root):
+    path = os.path.join(root, STATE_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _write_state(root, state):
+    os.makedirs(root, exist_ok=True)
+    tmp = os.path.join(root, STATE_FILE + '.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(state, f)
+    os.replace(tmp, os.path.join(root, STATE_FILE))
+
+
+def sync(db_path=DB_PATH, root=PARQUET_ROOT, full=False):
+    """Export crime_table rows newer than the last synced ID to the Parquet store"""
+    if pa is None:
+        raise RuntimeError("pyarrow is not installed")
+
+    if full and os.path.exists(root):
+        shutil.rmtree(root)
+    state = _read_state(root)
+    last_id = state.get('last_id', 0)
+
+    conn = sqlite3.connect(db_path)
+    try:
+        schema = table_schema(conn)
+        cursor = conn.execute(
+            f'SELECT * FROM "{TABLE_NAME}" WHERE "ID" > ? ORDER BY "ID"', (last_id,))
+        stamp = int(time.time() * 1000)
+        written = 0
+        for n, batch in enumerate(iter_record_batches(cursor, schema)):
+            batch = _with_year(batch)
+            ds.write_dataset(batch, root, format='parquet', partitioning=_partitioning(),
+                             basename_template=f'part-{stamp}-{n}-{{i}}.parquet',
+                             existing_data_behavior='overwrite_or_ignore')
+            written += batch.num_rows
+            last_id = pc.max(batch.column('ID')).as_py()
+    finally:
+        conn.close()
+
+    _write_state(root, {
+        'last_id': last_id,
+        'rows': state.get('rows', 0) + written,
+        'synced_at': datetime.now().isoformat()
+    })
+    return written
+
+
+def _drain(sink):
+    data = sink.getvalue()
+    sink.seek(0)
+    sink.truncate()
+    return data
+
+
+def arrow_stream(db_path=DB_PATH, batch_size=BATCH_SIZE):
+    """crime_table as Arrow IPC stream bytes, yielded as each batch is read from the cursor"""
+    if pa is None:
+        raise RuntimeError("pyarrow is not installed")
+
+    conn = sqlite3.connect(db_path)
+    try:
+        schema = table_schema(conn)
+        cursor = conn.execute(f'SELECT * FROM "{TABLE_NAME}"')
+        sink = io.BytesIO()
+        writer = pa.ipc.new_stream(sink, schema)
+        yield _drain(sink)
+        for batch in iter_record_batches(cursor, schema, batch_size):
+            writer.write_batch(batch)
+            yield _drain(sink)
+        writer.close()
+        yield _drain(sink)
+    finally:
+        conn.close()
+
+
+def is_available(root=PARQUET_ROOT):
+    return pa is not None and os.path.exists(os.path.join(root, STATE_FILE))
+
+
+def open_dataset(root=PARQUET_ROOT):
+    """Memory-mapped Arrow dataset over the store, re-discovered after each sync"""
+    key = (root, os.path.getmtime(os.path.join(root, STATE_FILE)))
+    if _dataset_cache['key'] != key:
+        _dataset_cache['dataset'] = ds.dataset(
+            root, format='parquet', partitioning=_partitioning(),
+            filesystem=pafs.LocalFileSystem(use_mmap=True))
+        _dataset_cache['key'] = key
+    return _dataset_cache['dataset']
+
+
+def _filter_expression(dataset, filters):
+    expr = None
+    for name, values in (filters or {}).items():
+        if not isinstance(values, (list, tuple)):
+            values = [values]
+        field = dataset.schema.field(name)
+        typ = field.type.value_type if pa.types.is_dictionary(field.type) else field.type
+        value_set = pa.array([str(v) for v in values], type=pa.string()).cast(typ)
+        term = ds.field(name).isin(value_set)
+        expr = term if expr is None else expr & term
+    return expr
+
+
+def query(columns, filters=None, root=PARQUET_ROOT):
+    """Read only `columns` from the partitions/rows matching `filters`
+
+    `filters` maps a column name to a value or a list of accepted values.
+    Filters on District and Year prune whole partitions.
+    """
+    dataset = open_dataset(root)
+    return dataset.to_table(columns=columns, filter=_filter_expression(dataset, filters))
+
+
+def _columns(db_path=DB_PATH):
+    if is_available():
+        return set(open_dataset().schema.names)
+    conn = sqlite3.connect(db_path)
+    try:
+        return {row[1] for row in conn.execute(f'PRAGMA table_info("{TABLE_NAME}")')}
+    finally:
+        conn.close()
+
+
+def summarize(by, filters=None, db_path=DB_PATH):
+    """Incident count and arrest rate grouped by one column
+
+    Runs on the Parquet store when it has been synced, otherwise falls back
+    to a GROUP BY over crime_table.
+    """
+    filters = filters or {}
+    known = _columns(db_path)
+    for name in [by] + list(filters):
+        if name not in known:
+            raise ValueError(f"Unknown column: {name}")
+
+    if is_available():
+        table = query([by, 'Arrest'], filters)
+        grouped = table.group_by(by).aggregate([('Arrest', 'count'), ('Arrest', 'mean')])
+        groups = [
+            {'value': value, 'count': count,
+             'arrest_rate': round(rate, 4) if rate is not None else None}
+            for value, count, rate in zip(grouped.column(by).to_pylist(),
+                                          grouped.column('Arrest_count').to_pylist(),
+                                          grouped.column('Arrest_mean').to_pylist())
+        ]
+        source = 'parquet'
+    else:
+        where, params = [], []
+        for name, values in filters.items():
+            if not isinstance(values, (list, tuple)):
+                values = [values]
+            where.append(f'"{name}" IN ({", ".join("?" * len(values))})')
+            params.extend(values)
+        sql = f'SELECT "{by}", COUNT(*), AVG("Arrest") FROM "{TABLE_NAME}"'
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        sql += f' GROUP BY "{by}"'
+        conn = sqlite3.connect(db_path)
+        try:
+            rows = conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+        groups = [
+            {'value': value, 'count': count,
+             'arrest_rate': round(rate, 4) if rate is not None else None}
+            for value, count, rate in rows
+        ]
+        source = 'sqlite'
+
+    groups.sort(key=lambda g: g['count'], reverse=True)
+    return {
+        'by': by,
+        'source': source,
+        'groups': groups,
+        'total': sum(g['count'] for g in groups)
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Sync crime_table into the Parquet analytics store")
+    parser.add_argument('--db', default=DB_PATH)
+    parser.add_argument('--root', default=PARQUET_ROOT)
+    parser.add_argument('--full', action='store_true', help="rebuild the store from scratch")
+    parser.add_argument('--export', metavar='PATH',
+                        help="write crime_table as an Arrow IPC stream file instead of syncing")
+    args = parser.parse_args()
+
+    start = time.time()
+    if args.export:
+        with open(args.export, 'wb') as f:
+            for chunk in arrow_stream(args.db):
+                f.write(chunk)
+        print(f"✅ Exported {args.db} to {args.export} in {time.time() - start:.1f}s")
+        raise SystemExit(0)
+    rows = sync(args.db, args.root, full=args.full)
+    print(f"✅ Synced {rows:,} rows into {args.root} in {time.time() - start:.1f}s")
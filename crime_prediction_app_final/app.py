@@ -1,4 +1,4 @@
-from flask import Flask, request, jsonify, redirect
+from flask import Flask, Response, request, jsonify, redirect
 from flask_cors import CORS
 import joblib
 import numpy as np
@@ -10,11 +10,39 @@ import sqlite3
 import socket
 import os
 
+from config import (DB_PATH, MODEL_PATH, PREPROCESSOR_PATH, ENCODER_PATH, CALIBRATION_PATH,
+                    STUDENT_PATH, PREDICT_TIER, STUDENT_MIN_CONFIDENCE,
+                    QUANTIZED_MODEL_PATH, ONNX_MODEL_PATH, ONNX_INTRA_OP_THREADS,
+                    MODEL_BACKEND, CATEGORICAL_FEATURES,
+                    ADMISSION_MAX_IN_FLIGHT, ADMISSION_MAX_QUEUE, ADMISSION_DEADLINE_SECONDS,
+                    CLIENT_RATE_LIMIT, CLIENT_BURST, WARMUP_MODE, WARMUP_ROUNDS, FORECAST_DATA_WEEKS)
+import analytics_store
+import prediction_table
+import similarity_index
+import text_search
+import forecast
+import onnx_model
+from inference import predict_with_proba, student_predict, feature_index, top_k
+from features import encoder_categories, records_frame
+import risk_grid
+from explain import Explainer
+import drift_monitor
+from validation import InputValidator
+import static_assets
+import serializers
+import admission
+import warmup
+import threading
+from functools import lru_cache
+
 # Suppress warnings
 warnings.filterwarnings("ignore")
 
 app = Flask(__name__)
 CORS(app)
+# orjson / MessagePack responses and gzip above a size threshold (see serializers.py)
+app.json = serializers.FastJSONProvider(app)
+app.after_request(serializers.compress_response)
 
 print("=" * 70)
 print("🚀 CRIME PREDICTION AI - PRO EDITION")
@@ -23,15 +51,72 @@ print("=" * 70)
 # Load models
 try:
     print("📦 Loading AI models...")
-    model = joblib.load("multi_target_rf_model_compatible.pkl")
-    preprocessor = joblib.load("preprocessor_compatible.pkl")
-    encoder = joblib.load("crime_encoder_compatible.pkl")
+    model = joblib.load(MODEL_PATH)
+    preprocessor = joblib.load(PREPROCESSOR_PATH)
+    encoder = joblib.load(ENCODER_PATH)
+    calibration = joblib.load(CALIBRATION_PATH) if os.path.exists(CALIBRATION_PATH) else None
+    student = joblib.load(STUDENT_PATH) if os.path.exists(STUDENT_PATH) else None
+    # Forest that answers teacher-tier predictions
+    serving_model = model
+    if MODEL_BACKEND == 'quantized':
+        serving_model = joblib.load(QUANTIZED_MODEL_PATH, mmap_mode='r')
+    # Whole pipeline in onnxruntime for /predict; the pickles still serve /risk-grid
+    onnx_pipeline = None
+    if MODEL_BACKEND == 'onnx':
+        onnx_pipeline = onnx_model.load_pipeline(ONNX_MODEL_PATH, ONNX_INTRA_OP_THREADS)
+    # Backend that answers lookup-table misses; the table must have been built with it
+    serving_backend = MODEL_BACKEND if MODEL_BACKEND != 'onnx' or onnx_pipeline else 'sklearn'
+    lookup_table = prediction_table.load_table(backend=serving_backend)
+    encoded_columns = feature_index(preprocessor)
+    drift = drift_monitor.load_monitor()
+    validator = InputValidator(encoder_categories(preprocessor))
+    similar_index = similarity_index.load_index(encoder_categories(preprocessor))
     print("✅ AI Models loaded successfully!")
+    if lookup_table is not None:
+        print(f"✅ Prediction table loaded ({lookup_table.meta['entries']:,} entries)")
+    print(f"✅ Serving backend: {serving_backend}")
+    if calibration is not None:
+        print("✅ Probability calibration loaded")
+    if student is not None:
+        print("✅ Distilled student model loaded")
+    if drift is not None:
+        print("✅ Drift monitoring enabled")
+    if similar_index is not None:
+        print(f"✅ Similarity index loaded ({similar_index.meta['rows']:,} rows)")
 except Exception as e:
     print(f"❌ Error loading models: {e}")
     traceback.print_exc()
     exit(1)
 
+# Per-node attribution deltas of the forest for /predict's explain option.
+# They take about as much memory as the forest's node arrays, so they are
+# built on the first explain request instead of in every worker at startup.
+explainer = None
+explainer_lock = threading.Lock()
+
+def get_explainer():
+    global explainer
+    if explainer is None:
+        with explainer_lock:
+            if explainer is None:
+                explainer = Explainer(model, encoded_columns)
+                print(f"✅ Explanation deltas built ({explainer.nbytes / 1e6:.1f} MB)")
+    return explainer
+
+# Full-text index of crime_table kept in sync by triggers, built by text_search.py
+try:
+    search_enabled = text_search.index_ready(DB_PATH)
+    if search_enabled:
+        print("✅ Full-text search index found")
+    else:
+        print("⚠️ Full-text search disabled: run text_search.py to build the index")
+except Exception as e:
+    print(f"⚠️ Full-text search disabled: {e}")
+    search_enabled = False
+
+# Weekly volume forecasts per District, refitted when crime_table changes (see forecast.py)
+forecaster = forecast.Forecaster(DB_PATH, FORECAST_DATA_WEEKS)
+
 # Crime category mapping with advanced details
 CRIME_CATEGORY_MAPPING = {
     0: {'name': 'Drug Crime', 'color': '#10b981', 'dark_color': '#059669', 
@@ -46,1525 +131,59 @@ CRIME_CATEGORY_MAPPING = {
         'icon': '⚔️', 'risk': 'Critical', 'description': 'Violent assaults and life-threatening offenses'}
 }
 
+# Weight of each category's risk level in the /risk-grid severity score
+RISK_LEVEL_WEIGHTS = {'Low': 0.25, 'Medium': 0.5, 'High': 0.75, 'Critical': 1.0}
+
+# Bounded concurrency and load shedding for /predict
+admission_control = admission.AdmissionController(
+    ADMISSION_MAX_IN_FLIGHT, ADMISSION_MAX_QUEUE, ADMISSION_DEADLINE_SECONDS,
+    CLIENT_RATE_LIMIT, CLIENT_BURST)
+
 # Dashboard URL - Your Power BI dashboard
 DASHBOARD_URL = "https://app.powerbi.com/view?r=eyJrIjoiODdiNzkxMjktN2FhMy00OGZkLWI0ZTUtOTI3MmFiMTk2NWNlIiwidCI6IjkwMWQ5YTk5LTI3NTgtNGM5ZS1iNWM3LTI2MWM2OTIwZmQzNyIsImMiOjl9"
 
+# Page, stylesheet and script, hashed and compressed once at startup (see static_assets.py)
+assets = static_assets.build()
+
 @app.route('/')
 def home():
-    return '''
-    <!DOCTYPE html>
-    <html lang="en">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>🔍 CrimeScope AI | Advanced Crime Analytics Platform</title>
-        <link href="https://fonts.googleapis.com/css2?family=Poppins:wght@300;400;500;600;700;800&display=swap" rel="stylesheet">
-        <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css">
-        <style>
-            :root {
-                --primary: #3b82f6;
-                --primary-dark: #1d4ed8;
-                --primary-glow: rgba(59, 130, 246, 0.4);
-                --secondary: #8b5cf6;
-                --success: #10b981;
-                --danger: #ef4444;
-                --warning: #f59e0b;
-                --info: #06b6d4;
-                --dark: #111827;
-                --darker: #0f172a;
-                --light: #f8fafc;
-                --gray: #94a3b8;
-                --gray-dark: #475569;
-                --card-bg: rgba(255, 255, 255, 0.05);
-                --glass-bg: rgba(255, 255, 255, 0.1);
-                --glass-border: rgba(255, 255, 255, 0.2);
-            }
-            
-            .light-theme {
-                --primary: #2563eb;
-                --primary-dark: #1d4ed8;
-                --primary-glow: rgba(37, 99, 235, 0.2);
-                --light: #111827;
-                --dark: #f8fafc;
-                --card-bg: rgba(255, 255, 255, 0.9);
-                --glass-bg: rgba(255, 255, 255, 0.7);
-                --glass-border: rgba(203, 213, 225, 0.3);
-                --gray: #64748b;
-            }
-            
-            * {
-                margin: 0;
-                padding: 0;
-                box-sizing: border-box;
-            }
-            
-            body {
-                font-family: 'Poppins', sans-serif;
-                background: linear-gradient(135deg, #0f172a 0%, #1e293b 50%, #334155 100%);
-                color: var(--light);
-                min-height: 100vh;
-                overflow-x: hidden;
-                transition: all 0.5s ease;
-            }
-            
-            .light-theme {
-                background: linear-gradient(135deg, #f1f5f9 0%, #e2e8f0 50%, #cbd5e1 100%);
-                color: var(--light);
-            }
-            
-            .container {
-                max-width: 1400px;
-                margin: 0 auto;
-                padding: 20px;
-            }
-            
-            /* Glow Effects */
-            .glow {
-                position: fixed;
-                width: 500px;
-                height: 500px;
-                border-radius: 50%;
-                background: radial-gradient(circle, var(--primary-glow) 0%, transparent 70%);
-                filter: blur(100px);
-                z-index: -1;
-                pointer-events: none;
-            }
-            
-            .glow-1 {
-                top: -200px;
-                right: -200px;
-                background: radial-gradient(circle, rgba(139, 92, 246, 0.3) 0%, transparent 70%);
-            }
-            
-            .glow-2 {
-                bottom: -200px;
-                left: -200px;
-                background: radial-gradient(circle, rgba(239, 68, 68, 0.2) 0%, transparent 70%);
-            }
-            
-            /* Header */
-            header {
-                padding: 30px 0;
-                position: relative;
-                z-index: 10;
-            }
-            
-            .header-top {
-                display: flex;
-                justify-content: space-between;
-                align-items: center;
-                margin-bottom: 40px;
-            }
-            
-            .logo {
-                display: flex;
-                align-items: center;
-                gap: 15px;
-            }
-            
-            .logo-icon {
-                font-size: 2.8rem;
-                background: linear-gradient(135deg, var(--primary), var(--secondary));
-                -webkit-background-clip: text;
-                -webkit-text-fill-color: transparent;
-                animation: pulse 2s infinite;
-            }
-            
-            .logo-text h1 {
-                font-size: 2.2rem;
-                background: linear-gradient(135deg, var(--light) 0%, var(--gray) 100%);
-                -webkit-background-clip: text;
-                -webkit-text-fill-color: transparent;
-                letter-spacing: 1px;
-            }
-            
-            .logo-text span {
-                font-size: 0.9rem;
-                color: var(--gray);
-                letter-spacing: 3px;
-                text-transform: uppercase;
-            }
-            
-            .header-actions {
-                display: flex;
-                align-items: center;
-                gap: 15px;
-            }
-            
-            .theme-switch {
-                position: relative;
-                width: 60px;
-                height: 30px;
-                background: linear-gradient(135deg, var(--card-bg), var(--glass-bg));
-                border-radius: 30px;
-                border: 1px solid var(--glass-border);
-                cursor: pointer;
-                transition: all 0.3s ease;
-                overflow: hidden;
-            }
-            
-            .theme-switch::after {
-                content: '';
-                position: absolute;
-                top: 3px;
-                left: 3px;
-                width: 24px;
-                height: 24px;
-                background: var(--primary);
-                border-radius: 50%;
-                transition: all 0.3s ease;
-                display: flex;
-                align-items: center;
-                justify-content: center;
-                color: white;
-                font-size: 0.8rem;
-            }
-            
-            .light-theme .theme-switch::after {
-                transform: translateX(30px);
-                background: var(--warning);
-                content: '☀️';
-            }
-            
-            .theme-switch::before {
-                content: '🌙';
-                position: absolute;
-                right: 8px;
-                top: 50%;
-                transform: translateY(-50%);
-                font-size: 0.9rem;
-            }
-            
-            .light-theme .theme-switch::before {
-                content: '☀️';
-                left: 8px;
-                right: auto;
-            }
-            
-            /* Dashboard Button */
-            .dashboard-btn {
-                padding: 12px 25px;
-                background: linear-gradient(135deg, var(--success), var(--info));
-                border: none;
-                border-radius: 15px;
-                color: white;
-                font-family: 'Poppins', sans-serif;
-                font-size: 1rem;
-                font-weight: 600;
-                cursor: pointer;
-                transition: all 0.3s ease;
-                display: flex;
-                align-items: center;
-                gap: 10px;
-                text-decoration: none;
-                white-space: nowrap;
-            }
-            
-            .dashboard-btn:hover {
-                transform: translateY(-3px);
-                box-shadow: 0 10px 25px rgba(16, 185, 129, 0.3);
-            }
-            
-            .header-stats {
-                display: grid;
-                grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-                gap: 20px;
-                margin-bottom: 40px;
-            }
-            
-            .stat-card {
-                background: var(--card-bg);
-                backdrop-filter: blur(10px);
-                border: 1px solid var(--glass-border);
-                border-radius: 20px;
-                padding: 25px;
-                text-align: center;
-                transition: all 0.3s ease;
-                position: relative;
-                overflow: hidden;
-            }
-            
-            .stat-card::before {
-                content: '';
-                position: absolute;
-                top: 0;
-                left: 0;
-                right: 0;
-                height: 3px;
-                background: linear-gradient(90deg, var(--primary), var(--secondary));
-                transform: scaleX(0);
-                transition: transform 0.4s ease;
-            }
-            
-            .stat-card:hover {
-                transform: translateY(-5px);
-                box-shadow: 0 10px 20px rgba(0, 0, 0, 0.3);
-            }
-            
-            .stat-card:hover::before {
-                transform: scaleX(1);
-            }
-            
-            .stat-icon {
-                font-size: 2.5rem;
-                margin-bottom: 15px;
-                opacity: 0.9;
-            }
-            
-            .stat-value {
-                font-size: 2.8rem;
-                font-weight: 800;
-                background: linear-gradient(135deg, var(--primary), var(--secondary));
-                -webkit-background-clip: text;
-                -webkit-text-fill-color: transparent;
-                margin-bottom: 5px;
-            }
-            
-            .stat-label {
-                color: var(--gray);
-                font-size: 0.9rem;
-                text-transform: uppercase;
-                letter-spacing: 1px;
-            }
-            
-            /* Main Content */
-            .main-content {
-                display: grid;
-                grid-template-columns: 1.2fr 0.8fr;
-                gap: 30px;
-                margin-bottom: 50px;
-            }
-            
-            @media (max-width: 1100px) {
-                .main-content {
-                    grid-template-columns: 1fr;
-                }
-            }
-            
-            .card {
-                background: var(--card-bg);
-                backdrop-filter: blur(10px);
-                border: 1px solid var(--glass-border);
-                border-radius: 25px;
-                padding: 35px;
-                position: relative;
-                overflow: hidden;
-            }
-            
-            .card-title {
-                display: flex;
-                align-items: center;
-                gap: 15px;
-                margin-bottom: 30px;
-                position: relative;
-                z-index: 2;
-            }
-            
-            .card-title i {
-                font-size: 1.8rem;
-                background: linear-gradient(135deg, var(--primary), var(--secondary));
-                -webkit-background-clip: text;
-                -webkit-text-fill-color: transparent;
-            }
-            
-            .card-title h2 {
-                font-size: 1.8rem;
-                font-weight: 700;
-                color: var(--light);
-            }
-            
-            /* Form Styles */
-            .form-grid {
-                display: grid;
-                grid-template-columns: repeat(2, 1fr);
-                gap: 25px;
-            }
-            
-            .form-group {
-                position: relative;
-                z-index: 2;
-            }
-            
-            .form-group.full-width {
-                grid-column: span 2;
-            }
-            
-            label {
-                display: block;
-                margin-bottom: 10px;
-                font-weight: 500;
-                color: var(--light);
-                font-size: 0.95rem;
-                display: flex;
-                align-items: center;
-                gap: 8px;
-            }
-            
-            .input-container {
-                position: relative;
-            }
-            
-            .input-container i {
-                position: absolute;
-                left: 18px;
-                top: 50%;
-                transform: translateY(-50%);
-                color: var(--gray);
-                z-index: 2;
-                font-size: 1.1rem;
-            }
-            
-            /* Updated input/select styles for dropdown visibility */
-            input, select {
-                width: 100%;
-                padding: 18px 20px 18px 50px;
-                background: rgba(255, 255, 255, 0.1);
-                border: 2px solid transparent;
-                border-radius: 15px;
-                font-family: 'Poppins', sans-serif;
-                font-size: 1rem;
-                color: var(--light);
-                transition: all 0.3s ease;
-                backdrop-filter: blur(5px);
-                -webkit-appearance: none;
-                -moz-appearance: none;
-                appearance: none;
-                cursor: pointer;
-            }
-            
-            /* Custom dropdown arrow */
-            .input-container::after {
-                content: '▼';
-                position: absolute;
-                top: 50%;
-                right: 20px;
-                transform: translateY(-50%);
-                color: var(--gray);
-                pointer-events: none;
-                font-size: 0.8rem;
-                z-index: 3;
-            }
-            
-            /* Style for dropdown options in dark mode */
-            select option {
-                background-color: #1e293b;
-                color: #f8fafc;
-                padding: 12px;
-                font-family: 'Poppins', sans-serif;
-            }
-            
-            /* Style for dropdown options in light mode */
-            .light-theme select option {
-                background-color: #f8fafc;
-                color: #111827;
-            }
-            
-            /* Adjust select padding to accommodate arrow */
-            select {
-                padding-right: 50px !important;
-            }
-            
-            .light-theme input, 
-            .light-theme select {
-                background: rgba(0, 0, 0, 0.05);
-                color: #111827;
-            }
-            
-            input:focus, select:focus {
-                outline: none;
-                border-color: var(--primary);
-                box-shadow: 0 0 0 3px rgba(59, 130, 246, 0.2);
-                background: rgba(255, 255, 255, 0.15);
-            }
-            
-            .light-theme input:focus, 
-            .light-theme select:focus {
-                background: rgba(0, 0, 0, 0.08);
-            }
-            
-            /* Button Styles */
-            .btn-group {
-                display: flex;
-                gap: 15px;
-                margin-top: 30px;
-                z-index: 2;
-                position: relative;
-            }
-            
-            .btn {
-                padding: 18px 35px;
-                border: none;
-                border-radius: 15px;
-                font-family: 'Poppins', sans-serif;
-                font-size: 1.1rem;
-                font-weight: 600;
-                cursor: pointer;
-                transition: all 0.3s ease;
-                display: flex;
-                align-items: center;
-                justify-content: center;
-                gap: 12px;
-                position: relative;
-                overflow: hidden;
-            }
-            
-            .btn-primary {
-                background: linear-gradient(135deg, var(--primary), var(--secondary));
-                color: white;
-                flex: 1;
-            }
-            
-            /* Results Section */
-            .results-container {
-                position: relative;
-            }
-            
-            .prediction-header {
-                text-align: center;
-                margin-bottom: 40px;
-                position: relative;
-            }
-            
-            .prediction-header h2 {
-                font-size: 2.2rem;
-                margin-bottom: 10px;
-                background: linear-gradient(135deg, var(--primary), var(--secondary));
-                -webkit-background-clip: text;
-                -webkit-text-fill-color: transparent;
-            }
-            
-            .prediction-cards {
-                display: grid;
-                grid-template-columns: repeat(2, 1fr);
-                gap: 25px;
-                margin-bottom: 30px;
-            }
-            
-            .prediction-card {
-                padding: 30px;
-                border-radius: 20px;
-                text-align: center;
-                transition: all 0.3s ease;
-                position: relative;
-                overflow: hidden;
-                backdrop-filter: blur(10px);
-            }
-            
-            .prediction-icon {
-                font-size: 3.5rem;
-                margin-bottom: 20px;
-            }
-            
-            .prediction-title {
-                font-size: 1.1rem;
-                color: var(--gray);
-                margin-bottom: 10px;
-                text-transform: uppercase;
-                letter-spacing: 1px;
-            }
-            
-            .prediction-value {
-                font-size: 2.5rem;
-                font-weight: 800;
-                margin-bottom: 15px;
-            }
-            
-            /* Crime Radar */
-            .crime-radar {
-                padding: 30px;
-                border-radius: 20px;
-                background: linear-gradient(135deg, rgba(30, 41, 59, 0.8), rgba(15, 23, 42, 0.9));
-                border: 1px solid var(--glass-border);
-                margin-top: 30px;
-                position: relative;
-                overflow: hidden;
-            }
-            
-            .light-theme .crime-radar {
-                background: linear-gradient(135deg, rgba(226, 232, 240, 0.9), rgba(203, 213, 225, 0.9));
-                border: 1px solid rgba(203, 213, 225, 0.5);
-            }
-            
-            .radar-chart {
-                height: 200px;
-                position: relative;
-                margin: 30px 0;
-            }
-            
-            .radar-line {
-                position: absolute;
-                top: 50%;
-                left: 50%;
-                transform: translate(-50%, -50%);
-                border: 2px solid var(--glass-border);
-                border-radius: 50%;
-            }
-            
-            .radar-line-1 { width: 60px; height: 60px; }
-            .radar-line-2 { width: 120px; height: 120px; }
-            .radar-line-3 { width: 180px; height: 180px; }
-            
-            .radar-point {
-                position: absolute;
-                width: 20px;
-                height: 20px;
-                background: var(--primary);
-                border-radius: 50%;
-                transform: translate(-50%, -50%);
-                animation: radarPulse 2s infinite;
-                box-shadow: 0 0 20px var(--primary);
-            }
-            
-            /* Risk Meter */
-            .risk-meter {
-                height: 20px;
-                background: linear-gradient(90deg, #10b981 0%, #f59e0b 50%, #ef4444 100%);
-                border-radius: 10px;
-                margin: 20px 0;
-                position: relative;
-                overflow: hidden;
-            }
-            
-            .risk-indicator {
-                position: absolute;
-                top: -5px;
-                width: 30px;
-                height: 30px;
-                background: white;
-                border-radius: 50%;
-                transform: translateX(-50%);
-                box-shadow: 0 0 15px rgba(255,255,255,0.5);
-                transition: left 1s ease;
-            }
-            
-            /* Loading Animation */
-            .loading-container {
-                position: fixed;
-                top: 0;
-                left: 0;
-                right: 0;
-                bottom: 0;
-                background: rgba(15, 23, 42, 0.95);
-                display: none;
-                justify-content: center;
-                align-items: center;
-                z-index: 1000;
-                backdrop-filter: blur(10px);
-            }
-            
-            .light-theme .loading-container {
-                background: rgba(241, 245, 249, 0.95);
-            }
-            
-            .ai-loader {
-                text-align: center;
-            }
-            
-            .ai-brain {
-                font-size: 4rem;
-                margin-bottom: 20px;
-                animation: brainPulse 1.5s infinite;
-            }
-            
-            .loader-text {
-                font-size: 1.2rem;
-                color: var(--gray);
-                margin-top: 20px;
-            }
-            
-            .scan-line {
-                position: absolute;
-                top: 0;
-                left: 0;
-                right: 0;
-                height: 2px;
-                background: linear-gradient(90deg, transparent, var(--primary), transparent);
-                animation: scan 2s infinite;
-            }
-            
-            /* Footer */
-            footer {
-                text-align: center;
-                padding: 40px 0;
-                margin-top: 50px;
-                border-top: 1px solid var(--glass-border);
-                position: relative;
-            }
-            
-            .tech-stack {
-                display: flex;
-                justify-content: center;
-                gap: 30px;
-                margin: 30px 0;
-                flex-wrap: wrap;
-            }
-            
-            .tech-item {
-                display: flex;
-                flex-direction: column;
-                align-items: center;
-                gap: 10px;
-            }
-            
-            .tech-icon {
-                font-size: 2rem;
-                color: var(--primary);
-            }
-            
-            /* Sample buttons */
-            .sample-buttons {
-                display: flex;
-                flex-wrap: wrap;
-                gap: 10px;
-                margin-top: 25px;
-            }
-            
-            .sample-btn {
-                padding: 10px 20px;
-                background: rgba(255, 255, 255, 0.1);
-                border: 1px solid var(--glass-border);
-                border-radius: 10px;
-                color: var(--light);
-                font-family: 'Poppins', sans-serif;
-                font-size: 0.9rem;
-                cursor: pointer;
-                transition: all 0.3s ease;
-                display: flex;
-                align-items: center;
-                gap: 8px;
-                flex: 1;
-                min-width: 120px;
-                justify-content: center;
-            }
-            
-            .sample-btn:hover {
-                background: rgba(255, 255, 255, 0.2);
-                transform: translateY(-2px);
-            }
-            
-            .light-theme .sample-btn {
-                background: rgba(0, 0, 0, 0.05);
-                color: #111827;
-                border: 1px solid rgba(203, 213, 225, 0.5);
-            }
-            
-            .light-theme .sample-btn:hover {
-                background: rgba(0, 0, 0, 0.1);
-            }
-            
-            /* Dashboard Modal */
-            .dashboard-modal {
-                position: fixed;
-                top: 0;
-                left: 0;
-                right: 0;
-                bottom: 0;
-                background: rgba(15, 23, 42, 0.95);
-                display: none;
-                justify-content: center;
-                align-items: center;
-                z-index: 1000;
-                backdrop-filter: blur(10px);
-            }
-            
-            .dashboard-modal-content {
-                background: var(--card-bg);
-                border: 1px solid var(--glass-border);
-                border-radius: 25px;
-                padding: 40px;
-                max-width: 500px;
-                width: 90%;
-                text-align: center;
-            }
-            
-            .dashboard-modal h2 {
-                color: var(--primary);
-                margin-bottom: 20px;
-                font-size: 1.8rem;
-            }
-            
-            .dashboard-modal p {
-                color: var(--gray);
-                margin-bottom: 30px;
-                line-height: 1.6;
-            }
-            
-            .dashboard-actions {
-                display: flex;
-                gap: 15px;
-                justify-content: center;
-                margin-top: 25px;
-            }
-            
-            .dashboard-btn-secondary {
-                padding: 12px 25px;
-                background: rgba(255, 255, 255, 0.1);
-                border: 1px solid var(--glass-border);
-                border-radius: 15px;
-                color: var(--light);
-                font-family: 'Poppins', sans-serif;
-                font-size: 1rem;
-                font-weight: 600;
-                cursor: pointer;
-                transition: all 0.3s ease;
-            }
-            
-            .dashboard-btn-secondary:hover {
-                background: rgba(255, 255, 255, 0.2);
-            }
-            
-            /* Animations */
-            @keyframes pulse {
-                0%, 100% { transform: scale(1); }
-                50% { transform: scale(1.1); }
-            }
-            
-            @keyframes brainPulse {
-                0%, 100% { transform: scale(1); opacity: 1; }
-                50% { transform: scale(1.2); opacity: 0.8; }
-            }
-            
-            @keyframes scan {
-                0% { top: 0; }
-                100% { top: 100%; }
-            }
-            
-            @keyframes radarPulse {
-                0%, 100% { transform: translate(-50%, -50%) scale(1); opacity: 1; }
-                50% { transform: translate(-50%, -50%) scale(1.2); opacity: 0.7; }
-            }
-            
-            @keyframes float {
-                0%, 100% { transform: translateY(0); }
-                50% { transform: translateY(-10px); }
-            }
-            
-            /* Responsive */
-            @media (max-width: 768px) {
-                .form-grid {
-                    grid-template-columns: 1fr;
-                }
-                .form-group.full-width {
-                    grid-column: span 1;
-                }
-                .prediction-cards {
-                    grid-template-columns: 1fr;
-                }
-                .header-top {
-                    flex-direction: column;
-                    gap: 20px;
-                }
-                .header-actions {
-                    flex-direction: column;
-                    width: 100%;
-                }
-                .dashboard-btn, .theme-switch {
-                    width: 100%;
-                    justify-content: center;
-                }
-                .btn-group {
-                    flex-direction: column;
-                }
-                .sample-buttons {
-                    flex-direction: column;
-                }
-                .sample-btn {
-                    min-width: 100%;
-                }
-                .dashboard-actions {
-                    flex-direction: column;
-                }
-            }
-        </style>
-    </head>
-    <body>
-        <div class="glow glow-1"></div>
-        <div class="glow glow-2"></div>
-        
-        <!-- Loading Overlay -->
-        <div class="loading-container" id="loading">
-            <div class="ai-loader">
-                <div class="ai-brain">
-                    <i class="fas fa-brain"></i>
-                </div>
-                <h2>CrimeScope AI Analyzing...</h2>
-                <div class="scan-line"></div>
-                <div class="loader-text">
-                    <div>Processing crime patterns</div>
-                    <div>Running Random Forest algorithms</div>
-                    <div>Generating predictive insights</div>
-                </div>
-            </div>
-        </div>
-        
-        <!-- Dashboard Modal -->
-        <div class="dashboard-modal" id="dashboardModal">
-            <div class="dashboard-modal-content">
-                <h2><i class="fas fa-external-link-alt"></i> Open Power BI Dashboard</h2>
-                <p>You are about to open the <strong>Crime Analytics Power BI Dashboard</strong> in a new window.</p>
-                <p>This dashboard is hosted online and requires an internet connection.</p>
-                
-                <div class="dashboard-actions">
-                    <button onclick="openDashboardWindow()" class="dashboard-btn">
-                        <i class="fas fa-external-link-alt"></i> Open Power BI Dashboard
-                    </button>
-                    <button onclick="closeDashboardModal()" class="dashboard-btn-secondary">
-                        Cancel
-                    </button>
-                </div>
-                
-                <div style="margin-top: 25px; padding: 15px; background: rgba(255,255,255,0.05); border-radius: 10px;">
-                    <p style="font-size: 0.9rem; color: var(--gray);">
-                        <i class="fas fa-info-circle"></i> About this dashboard:
-                    </p>
-                    <ul style="text-align: left; margin-top: 10px; color: var(--gray); font-size: 0.85rem; padding-left: 20px;">
-                        <li>Interactive Power BI analytics</li>
-                        <li>Real-time crime data visualization</li>
-                        <li>Advanced filtering and drill-down</li>
-                        <li>Requires internet connection</li>
-                    </ul>
-                </div>
-            </div>
-        </div>
-        
-        <div class="container">
-            <header>
-                <div class="header-top">
-                    <div class="logo">
-                        <div class="logo-icon">
-                            <i class="fas fa-shield-alt"></i>
-                        </div>
-                        <div class="logo-text">
-                            <h1>CrimeScope AI</h1>
-                            <span>Predictive Analytics Platform</span>
-                        </div>
-                    </div>
-                    <div class="header-actions">
-                        <button onclick="showDashboardModal()" class="dashboard-btn">
-                            <i class="fas fa-chart-line"></i>
-                            VIEW DASHBOARD
-                        </button>
-                        <div class="theme-switch" id="themeSwitch"></div>
-                    </div>
-                </div>
-                
-                <div class="header-stats">
-                    <div class="stat-card">
-                        <div class="stat-icon">
-                            <i class="fas fa-database"></i>
-                        </div>
-                        <div class="stat-value" id="crime_records">89.5K</div>
-                        <div class="stat-label">Crime Records</div>
-                    </div>
-                    <div class="stat-card">
-                        <div class="stat-icon">
-                            <i class="fas fa-chart-line"></i>
-                        </div>
-                        <div class="stat-value">91.6%</div>
-                        <div class="stat-label">Prediction Accuracy</div>
-                    </div>
-                    <div class="stat-card">
-                        <div class="stat-icon">
-                            <i class="fas fa-bolt"></i>
-                        </div>
-                        <div class="stat-value">0.8s</div>
-                        <div class="stat-label">Response Time</div>
-                    </div>
-                    <div class="stat-card">
-                        <div class="stat-icon">
-                            <i class="fas fa-layer-group"></i>
-                        </div>
-                        <div class="stat-value">5</div>
-                        <div class="stat-label">Crime Categories</div>
-                    </div>
-                </div>
-            </header>
-            
-            <div class="main-content">
-                <!-- Left Column - Input Form -->
-                <div class="card">
-                    <div class="card-title">
-                        <i class="fas fa-clipboard-list"></i>
-                        <h2>Crime Scene Analysis</h2>
-                    </div>
-                    
-                    <form id="predictionForm">
-                        <div class="form-grid">
-                            <div class="form-group">
-                                <label><i class="fas fa-gavel"></i> Crime Type</label>
-                                <div class="input-container">
-                                    <i class="fas fa-exclamation-triangle"></i>
-                                    <select name="Primary Type">
-                                        <option value="THEFT">THEFT - Property Theft</option>
-                                        <option value="BATTERY">BATTERY - Physical Assault</option>
-                                        <option value="ASSAULT">ASSAULT - Threat of Violence</option>
-                                        <option value="ROBBERY">ROBBERY - Armed Theft</option>
-                                        <option value="NARCOTICS">NARCOTICS - Drug Offenses</option>
-                                        <option value="OTHER OFFENSE">OTHER OFFENSE - Miscellaneous</option>
-                                        <option value="SEX OFFENSE">SEX OFFENSE - Sexual Crimes</option>
-                                        <option value="HOMICIDE">HOMICIDE - Murder</option>
-                                        <option value="BURGLARY">BURGLARY - Property Break-in</option>
-                                        <option value="MOTOR VEHICLE THEFT">VEHICLE THEFT - Auto Theft</option>
-                                    </select>
-                                </div>
-                            </div>
-                            
-                            <div class="form-group">
-                                <label><i class="fas fa-file-alt"></i> Description</label>
-                                <div class="input-container">
-                                    <i class="fas fa-align-left"></i>
-                                    <input type="text" name="Description" value="OVER $500" placeholder="Crime details...">
-                                </div>
-                            </div>
-                            
-                            <div class="form-group">
-                                <label><i class="fas fa-map-marker-alt"></i> Location Type</label>
-                                <div class="input-container">
-                                    <i class="fas fa-building"></i>
-                                    <select name="Location Description">
-                                        <option value="STREET">STREET - Public Road</option>
-                                        <option value="RESIDENCE">RESIDENCE - Private Home</option>
-                                        <option value="APARTMENT">APARTMENT - Multi-unit Building</option>
-                                        <option value="COMMERCIAL / BUSINESS OFFICE">COMMERCIAL - Business Premises</option>
-                                        <option value="PARKING LOT">PARKING LOT - Vehicle Area</option>
-                                        <option value="SCHOOL">SCHOOL - Educational Facility</option>
-                                        <option value="HOSPITAL">HOSPITAL - Medical Facility</option>
-                                        <option value="AIRPORT">AIRPORT - Transportation Hub</option>
-                                    </select>
-                                </div>
-                            </div>
-                            
-                            <div class="form-group">
-                                <label><i class="fas fa-users"></i> Domestic Incident</label>
-                                <div class="input-container">
-                                    <i class="fas fa-home"></i>
-                                    <select name="Domestic">
-                                        <option value="0">No - Public Incident</option>
-                                        <option value="1">Yes - Domestic Violence</option>
-                                    </select>
-                                </div>
-                            </div>
-                            
-                            <div class="form-group">
-                                <label><i class="fas fa-map-pin"></i> Police District</label>
-                                <div class="input-container">
-                                    <i class="fas fa-map"></i>
-                                    <input type="number" name="District" value="12" min="1" max="25" placeholder="1-25">
-                                </div>
-                            </div>
-                            
-                            <div class="form-group">
-                                <label><i class="fas fa-calendar-day"></i> Day of Week</label>
-                                <div class="input-container">
-                                    <i class="fas fa-calendar"></i>
-                                    <select name="DayOfWeek">
-                                        <option value="0">Sunday - Weekend</option>
-                                        <option value="1">Monday - Weekday</option>
-                                        <option value="2">Tuesday - Weekday</option>
-                                        <option value="3">Wednesday - Weekday</option>
-                                        <option value="4">Thursday - Weekday</option>
-                                        <option value="5">Friday - Weekend Start</option>
-                                        <option value="6">Saturday - Weekend</option>
-                                    </select>
-                                </div>
-                            </div>
-                            
-                            <div class="form-group">
-                                <label><i class="fas fa-clock"></i> Hour of Day</label>
-                                <div class="input-container">
-                                    <i class="fas fa-hourglass-half"></i>
-                                    <input type="number" name="HourofDay" value="14" min="0" max="23" placeholder="0-23">
-                                </div>
-                            </div>
-                            
-                            <div class="form-group">
-                                <label><i class="fas fa-sun"></i> Time Period</label>
-                                <div class="input-container">
-                                    <i class="fas fa-moon"></i>
-                                    <select name="DayorNight">
-                                        <option value="DAY">Daytime (6 AM - 6 PM)</option>
-                                        <option value="NIGHT">Nighttime (6 PM - 6 AM)</option>
-                                    </select>
-                                </div>
-                            </div>
-                        </div>
-                        
-                        <div class="btn-group">
-                            <button type="submit" class="btn btn-primary">
-                                <i class="fas fa-brain"></i>
-                                ANALYZE WITH AI
-                            </button>
-                        </div>
-                    </form>
-                    
-                    <div class="sample-buttons">
-                        <button class="sample-btn" onclick="loadSample('theft')">
-                            <i class="fas fa-money-bill-wave"></i> Test Theft
-                        </button>
-                        <button class="sample-btn" onclick="loadSample('violent')">
-                            <i class="fas fa-fist-raised"></i> Test Assault
-                        </button>
-                        <button class="sample-btn" onclick="loadSample('drug')">
-                            <i class="fas fa-pills"></i> Test Narcotics
-                        </button>
-                        <button class="sample-btn" onclick="loadSample('burglary')">
-                            <i class="fas fa-house-user"></i> Test Burglary
-                        </button>
-                    </div>
-                </div>
-                
-                <!-- Right Column - Results -->
-                <div class="results-container">
-                    <div class="prediction-header">
-                        <h2>AI PREDICTION RESULTS</h2>
-                        <p>Real-time analysis powered by machine learning</p>
-                    </div>
-                    
-                    <div id="resultContent">
-                        <div class="prediction-cards">
-                            <div class="prediction-card" style="background: linear-gradient(135deg, rgba(239, 68, 68, 0.2), rgba(220, 38, 38, 0.1)); border: 2px solid #ef4444;">
-                                <div class="prediction-icon">❌</div>
-                                <div class="prediction-title">Arrest Probability</div>
-                                <div class="prediction-value">LOW</div>
-                                <div class="prediction-desc">23% likely</div>
-                            </div>
-                            
-                            <div class="prediction-card" style="background: linear-gradient(135deg, rgba(245, 158, 11, 0.2), rgba(217, 119, 6, 0.1)); border: 2px solid #f59e0b;">
-                                <div class="prediction-icon">💰</div>
-                                <div class="prediction-title">Crime Category</div>
-                                <div class="prediction-value">PROPERTY</div>
-                                <div class="prediction-desc">Theft-related offense</div>
-                            </div>
-                        </div>
-                        
-                        <div class="crime-radar">
-                            <h3 style="margin-bottom: 20px; color: var(--primary);">
-                                <i class="fas fa-crosshairs"></i> Risk Assessment Radar
-                            </h3>
-                            <div class="radar-chart">
-                                <div class="radar-line radar-line-1"></div>
-                                <div class="radar-line radar-line-2"></div>
-                                <div class="radar-line radar-line-3"></div>
-                                <div class="radar-point" style="top: 30%; left: 40%;"></div>
-                                <div class="radar-point" style="top: 60%; left: 70%;"></div>
-                                <div class="radar-point" style="top: 80%; left: 30%;"></div>
-                            </div>
-                            
-                            <div class="risk-meter">
-                                <div class="risk-indicator" id="riskIndicator" style="left: 30%;"></div>
-                            </div>
-                            
-                            <div style="display: flex; justify-content: space-between; margin-top: 10px;">
-                                <span style="color: #10b981;">Low Risk</span>
-                                <span style="color: #f59e0b;">Medium Risk</span>
-                                <span style="color: #ef4444;">High Risk</span>
-                            </div>
-                        </div>
-                        
-                        <div class="prediction-details" style="margin-top: 30px; padding: 25px; background: var(--card-bg); border-radius: 15px;">
-                            <h3 style="margin-bottom: 15px; color: var(--primary);">
-                                <i class="fas fa-chart-pie"></i> Crime Insights
-                            </h3>
-                            <div style="display: grid; grid-template-columns: repeat(2, 1fr); gap: 15px;">
-                                <div>
-                                    <div style="font-size: 0.9rem; color: var(--gray);">Similar Cases</div>
-                                    <div style="font-size: 1.2rem; font-weight: 600;">4,892</div>
-                                </div>
-                                <div>
-                                    <div style="font-size: 0.9rem; color: var(--gray);">Avg. Response Time</div>
-                                    <div style="font-size: 1.2rem; font-weight: 600;">18 min</div>
-                                </div>
-                                <div>
-                                    <div style="font-size: 0.9rem; color: var(--gray);">Clearance Rate</div>
-                                    <div style="font-size: 1.2rem; font-weight: 600;">34%</div>
-                                </div>
-                                <div>
-                                    <div style="font-size: 0.9rem; color: var(--gray);">Hotspot Zone</div>
-                                    <div style="font-size: 1.2rem; font-weight: 600;">District 12</div>
-                                </div>
-                            </div>
-                        </div>
-                    </div>
-                </div>
-            </div>
-            
-            <footer>
-                <h3 style="margin-bottom: 20px; color: var(--gray);">
-                    <i class="fas fa-microchip"></i> Powered By Advanced AI Technology
-                </h3>
-                
-                <div class="tech-stack">
-                    <div class="tech-item">
-                        <div class="tech-icon">
-                            <i class="fab fa-python"></i>
-                        </div>
-                        <span>Python 3.11</span>
-                    </div>
-                    <div class="tech-item">
-                        <div class="tech-icon">
-                            <i class="fas fa-robot"></i>
-                        </div>
-                        <span>Scikit-Learn</span>
-                    </div>
-                    <div class="tech-item">
-                        <div class="tech-icon">
-                            <i class="fas fa-project-diagram"></i>
-                        </div>
-                        <span>Random Forest</span>
-                    </div>
-                    <div class="tech-item">
-                        <div class="tech-icon">
-                            <i class="fas fa-flask"></i>
-                        </div>
-                        <span>Flask API</span>
-                    </div>
-                    <div class="tech-item">
-                        <div class="tech-icon">
-                            <i class="fas fa-database"></i>
-                        </div>
-                        <span>Pandas</span>
-                    </div>
-                </div>
-                
-                <p style="margin-top: 30px; color: var(--gray); font-size: 0.9rem;">
-                    <i class="fas fa-shield-alt"></i> CrimeScope AI v2.0 | Predictive Crime Analytics Platform 
-                    | Accuracy: 91.6% | Response Time: < 1s
-                </p>
-                <p style="color: var(--gray); font-size: 0.8rem; margin-top: 10px;">
-                    © 2024 CrimeScope AI. For research and demonstration purposes only.
-                </p>
-            </footer>
-        </div>
-        
-        <script>
-            // Get data from database
-            document.addEventListener("DOMContentLoaded", async function () {
-                try {
-                    const response = await fetch('/getData', {
-                        method: 'GET',
-                        headers: { 'Content-Type': 'application/json' }
-                    });
-                    
-                    const result = await response.json();
-                    console.log('Database: ', result);
+    return static_assets.respond(assets[static_assets.PAGE], request)
 
-                    if (result.success && result.crimeRecords) {
-                        document.getElementById('crime_records').innerText = result.crimeRecords.length.toLocaleString();
-                    }
-                } catch(err) {
-                    console.log('Error fetch data from database: ', err)
-                }
-                
-                // Initialize floating animations
-                document.querySelectorAll('.stat-card').forEach((card, index) => {
-                    card.style.animation = `float ${4 + index}s ease-in-out infinite`;
-                });
-            });
-            
-            // Theme toggle
-            document.getElementById('themeSwitch').addEventListener('click', function() {
-                document.body.classList.toggle('light-theme');
-                localStorage.setItem('theme', document.body.classList.contains('light-theme') ? 'light' : 'dark');
-            });
-            
-            // Load saved theme
-            if (localStorage.getItem('theme') === 'light') {
-                document.body.classList.add('light-theme');
-            }
-            
-            // Dashboard Modal Functions
-            function showDashboardModal() {
-                document.getElementById('dashboardModal').style.display = 'flex';
-            }
-            
-            function closeDashboardModal() {
-                document.getElementById('dashboardModal').style.display = 'none';
-            }
-            
-            function openDashboardWindow() {
-                // Open Power BI URL
-                const powerBiUrl = 'https://app.powerbi.com/view?r=eyJrIjoiODdiNzkxMjktN2FhMy00OGZkLWI0ZTUtOTI3MmFiMTk2NWNlIiwidCI6IjkwMWQ5YTk5LTI3NTgtNGM5ZS1iNWM3LTI2MWM2OTIwZmQzNyIsImMiOjl9';
-                window.open(powerBiUrl, '_blank');
-                
-                // Close the modal
-                closeDashboardModal();
-            }
-            
-            // Form submission
-            document.getElementById('predictionForm').addEventListener('submit', async function(e) {
-                e.preventDefault();
-                
-                // Show loading animation
-                document.getElementById('loading').style.display = 'flex';
-                
-                // Get form data
-                const formData = {};
-                const formElements = this.elements;
-                
-                for (let element of formElements) {
-                    if (element.name && element.type !== 'submit') {
-                        formData[element.name] = element.value.toString();
-                    }
-                }
-                
-                // Auto-set Day/Night
-                const hour = parseInt(formData['HourofDay']);
-                formData['DayorNight'] = (hour >= 6 && hour <= 18) ? 'DAY' : 'NIGHT';
-                
-                console.log('Sending data:', formData);
-                
-                try {
-                    const response = await fetch('/predict', {
-                        method: 'POST',
-                        headers: { 'Content-Type': 'application/json' },
-                        body: JSON.stringify(formData)
-                    });
-                    
-                    const result = await response.json();
-                    console.log('AI Response:', result);
-                    
-                    // Hide loading
-                    document.getElementById('loading').style.display = 'none';
-                    
-                    if (result.success) {
-                        displayAdvancedResults(result, formData);
-                    } else {
-                        showError(result.error);
-                    }
-                } catch (error) {
-                    console.error('Error:', error);
-                    document.getElementById('loading').style.display = 'none';
-                    showError('Network connection failed');
-                }
-            });
-            
-            // Display advanced results
-            function displayAdvancedResults(result, formData) {
-                const predictions = result.predictions;
-                const crimeCategory = predictions.category;
-                const arrestPrediction = predictions.arrest;
-                
-                // Get category info
-                const categoryMap = {
-                    'Drug Crime': { color: '#10b981', icon: '💊', risk: 30 },
-                    'Other Crime': { color: '#6b7280', icon: '📄', risk: 20 },
-                    'Property Crime': { color: '#f59e0b', icon: '💰', risk: 40 },
-                    'Sex Crime': { color: '#8b5cf6', icon: '🔒', risk: 70 },
-                    'Violent Crime': { color: '#ef4444', icon: '⚔️', risk: 90 }
-                };
-                
-                const categoryInfo = categoryMap[crimeCategory] || { color: '#6b7280', icon: '❓', risk: 50 };
-                
-                // Calculate risk based on multiple factors
-                let riskScore = categoryInfo.risk;
-                if (formData['Domestic'] === '1') riskScore += 20;
-                if (formData['DayorNight'] === 'NIGHT') riskScore += 15;
-                if (parseInt(formData['District']) > 20) riskScore += 10;
-                riskScore = Math.min(100, riskScore);
-                
-                // Arrest prediction styling
-                const arrestClass = arrestPrediction === 1 ? 
-                    'background: linear-gradient(135deg, rgba(16, 185, 129, 0.2), rgba(5, 150, 105, 0.1)); border: 2px solid #10b981;' :
-                    'background: linear-gradient(135deg, rgba(239, 68, 68, 0.2), rgba(220, 38, 38, 0.1)); border: 2px solid #ef4444;';
-                
-                const arrestText = arrestPrediction === 1 ? 'HIGH' : 'LOW';
-                const arrestDesc = arrestPrediction === 1 ? '85% probability' : '23% probability';
-                const arrestIcon = arrestPrediction === 1 ? '✅' : '❌';
-                
-                // Update results
-                const resultsHTML = `
-                    <div class="prediction-cards">
-                        <div class="prediction-card" style="${arrestClass}">
-                            <div class="prediction-icon">${arrestIcon}</div>
-                            <div class="prediction-title">Arrest Probability</div>
-                            <div class="prediction-value">${arrestText}</div>
-                            <div class="prediction-desc">${arrestDesc}</div>
-                        </div>
-                        
-                        <div class="prediction-card" style="background: linear-gradient(135deg, ${categoryInfo.color}20, ${categoryInfo.color}10); border: 2px solid ${categoryInfo.color};">
-                            <div class="prediction-icon">${categoryInfo.icon}</div>
-                            <div class="prediction-title">Crime Category</div>
-                            <div class="prediction-value">${crimeCategory.split(' ')[0].toUpperCase()}</div>
-                            <div class="prediction-desc">${crimeCategory}</div>
-                        </div>
-                    </div>
-                    
-                    <div class="crime-radar">
-                        <h3 style="margin-bottom: 20px; color: ${categoryInfo.color};">
-                            <i class="fas fa-crosshairs"></i> Risk Assessment: ${riskScore}%
-                        </h3>
-                        <div class="radar-chart">
-                            <div class="radar-line radar-line-1"></div>
-                            <div class="radar-line radar-line-2"></div>
-                            <div class="radar-line radar-line-3"></div>
-                            <div class="radar-point" style="top: ${30 + riskScore/3}%; left: ${40 + riskScore/5}%; background: ${categoryInfo.color};"></div>
-                            <div class="radar-point" style="top: ${60 - riskScore/4}%; left: ${70 - riskScore/7}%; background: ${categoryInfo.color};"></div>
-                            <div class="radar-point" style="top: ${80 - riskScore/5}%; left: ${30 + riskScore/6}%; background: ${categoryInfo.color};"></div>
-                        </div>
-                        
-                        <div class="risk-meter">
-                            <div class="risk-indicator" id="riskIndicator" style="left: ${riskScore}%; background: ${categoryInfo.color};"></div>
-                        </div>
-                        
-                        <div style="display: flex; justify-content: space-between; margin-top: 10px;">
-                            <span style="color: #10b981;">Low Risk</span>
-                            <span style="color: #f59e0b;">Medium Risk</span>
-                            <span style="color: #ef4444;">High Risk</span>
-                        </div>
-                    </div>
-                    
-                    <div class="prediction-details" style="margin-top: 30px; padding: 25px; background: var(--card-bg); border-radius: 15px; border-left: 4px solid ${categoryInfo.color};">
-                        <h3 style="margin-bottom: 15px; color: ${categoryInfo.color};">
-                            <i class="fas fa-chart-pie"></i> AI-Generated Insights
-                        </h3>
-                        <div style="display: grid; grid-template-columns: repeat(2, 1fr); gap: 15px; margin-bottom: 20px;">
-                            <div>
-                                <div style="font-size: 0.9rem; color: var(--gray);">Historical Similar Cases</div>
-                                <div style="font-size: 1.2rem; font-weight: 600;">${Math.round(89558 * (riskScore/100))}</div>
-                            </div>
-                            <div>
-                                <div style="font-size: 0.9rem; color: var(--gray);">Avg. Police Response</div>
-                                <div style="font-size: 1.2rem; font-weight: 600;">${riskScore > 60 ? '12' : '22'} min</div>
-                            </div>
-                            <div>
-                                <div style="font-size: 0.9rem; color: var(--gray);">Case Clearance Rate</div>
-                                <div style="font-size: 1.2rem; font-weight: 600;">${arrestPrediction === 1 ? '68%' : '34%'}</div>
-                            </div>
-                            <div>
-                                <div style="font-size: 0.9rem; color: var(--gray);">Priority Level</div>
-                                <div style="font-size: 1.2rem; font-weight: 600;">${riskScore > 70 ? 'HIGH' : riskScore > 40 ? 'MEDIUM' : 'LOW'}</div>
-                            </div>
-                        </div>
-                        
-                        <div style="background: rgba(255,255,255,0.05); padding: 15px; border-radius: 10px; margin-top: 15px;">
-                            <div style="font-size: 0.9rem; color: var(--gray); margin-bottom: 5px;">
-                                <i class="fas fa-lightbulb"></i> AI Recommendation:
-                            </div>
-                            <div style="font-size: 0.95rem; color: var(--light);">
-                                ${arrestPrediction === 1 ? 
-                                    '🚨 Immediate response recommended. High probability of suspect apprehension based on location and crime type.' :
-                                    '📋 Standard investigation protocol. Focus on evidence collection and witness statements.'}
-                            </div>
-                        </div>
-                    </div>
-                `;
-                
-                document.getElementById('resultContent').innerHTML = resultsHTML;
-                
-                // Animate the risk indicator
-                setTimeout(() => {
-                    const indicator = document.getElementById('riskIndicator');
-                    if (indicator) {
-                        indicator.style.transition = 'left 2s ease';
-                    }
-                }, 100);
-                
-                // Add floating animation to cards
-                document.querySelectorAll('.prediction-card').forEach((card, index) => {
-                    card.style.animation = `float ${3 + index * 0.5}s ease-in-out infinite`;
-                });
-            }
-            
-            // Show error
-            function showError(message) {
-                document.getElementById('resultContent').innerHTML = `
-                    <div style="text-align: center; padding: 50px;">
-                        <div style="font-size: 4rem; color: #ef4444; margin-bottom: 20px;">
-                            <i class="fas fa-exclamation-triangle"></i>
-                        </div>
-                        <h3 style="color: #ef4444; margin-bottom: 10px;">Analysis Failed</h3>
-                        <p style="color: var(--gray);">${message}</p>
-                        <button onclick="window.location.reload()" style="margin-top: 20px; padding: 12px 30px; background: var(--primary); color: white; border: none; border-radius: 10px; cursor: pointer; font-weight: 600;">
-                            <i class="fas fa-redo"></i> Try Again
-                        </button>
-                    </div>
-                `;
-            }
-            
-            // Load sample data
-            function loadSample(type) {
-                const samples = {
-                    theft: {
-                        'Primary Type': 'THEFT',
-                        'Description': 'OVER $500',
-                        'Location Description': 'STREET',
-                        'Domestic': '0',
-                        'District': '12',
-                        'DayOfWeek': '3',
-                        'HourofDay': '14',
-                        'DayorNight': 'DAY'
-                    },
-                    violent: {
-                        'Primary Type': 'BATTERY',
-                        'Description': 'AGGRAVATED',
-                        'Location Description': 'RESIDENCE',
-                        'Domestic': '1',
-                        'District': '8',
-                        'DayOfWeek': '5',
-                        'HourofDay': '22',
-                        'DayorNight': 'NIGHT'
-                    },
-                    drug: {
-                        'Primary Type': 'NARCOTICS',
-                        'Description': 'POSSESSION',
-                        'Location Description': 'PARKING LOT',
-                        'Domestic': '0',
-                        'District': '15',
-                        'DayOfWeek': '6',
-                        'HourofDay': '23',
-                        'DayorNight': 'NIGHT'
-                    },
-                    burglary: {
-                        'Primary Type': 'BURGLARY',
-                        'Description': 'FORCIBLE ENTRY',
-                        'Location Description': 'RESIDENCE',
-                        'Domestic': '0',
-                        'District': '18',
-                        'DayOfWeek': '1',
-                        'HourofDay': '3',
-                        'DayorNight': 'NIGHT'
-                    }
-                };
-                
-                const sample = samples[type];
-                for (const key in sample) {
-                    const element = document.querySelector(`[name="${key}"]`);
-                    if (element) {
-                        element.value = sample[key];
-                    }
-                }
-                
-                // Auto submit after delay
-                setTimeout(() => {
-                    document.getElementById('predictionForm').dispatchEvent(new Event('submit'));
-                }, 800);
-            }
-            
-            // Close modal if clicked outside
-            document.getElementById('dashboardModal').addEventListener('click', function(e) {
-                if (e.target === this) {
-                    closeDashboardModal();
-                }
-            });
-        </script>
-    </body>
-    </html>
-    '''
+@app.route('/assets/<name>')
+def asset(name):
+    if name not in assets or name == static_assets.PAGE:
+        return jsonify({'success': False, 'error': 'Not found'}), 404
+    return static_assets.respond(assets[name], request)
 
 @app.route('/health')
 def health():
+    # Load balancers should only route to workers that finished warming up
+    if not warmup_state['ready']:
+        return jsonify({
+            'status': 'warming',
+            'ready': False,
+            'timestamp': datetime.now().isoformat()
+        }), 503
     return jsonify({
         'status': 'healthy',
+        'ready': True,
         'timestamp': datetime.now().isoformat(),
         'model': 'CrimeScope AI v2.0',
         'accuracy': '91.6%',
-        'features': 8
+        'features': 8,
+        'warmup': warmup_state['report']
     })
 
 @app.route('/getData', methods=['GET'])
 def getData():
     try:
-        conn = sqlite3.connect('crime_data.db')
+        # Bulk consumers can ask for an Arrow IPC stream instead of JSON rows
+        best = request.accept_mimetypes.best_match(['application/json', analytics_store.ARROW_STREAM_TYPE])
+        if request.args.get('format') == 'arrow' or best == analytics_store.ARROW_STREAM_TYPE:
+            return Response(analytics_store.arrow_stream(DB_PATH),
+                            mimetype=analytics_store.ARROW_STREAM_TYPE)
+
+        conn = sqlite3.connect(DB_PATH)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -1590,6 +209,204 @@ def getData():
             'suggestion': ''
         }), 400
 
+@app.route('/analytics/summary', methods=['GET'])
+def analytics_summary():
+    """Incident counts grouped by one column, read from the columnar store"""
+    try:
+        by = request.args.get('by', 'Crime Category')
+        filters = {key: request.args.getlist(key) for key in request.args if key != 'by'}
+        response = {'success': True}
+        response.update(analytics_store.summarize(by, filters))
+        return jsonify(response)
+
+    except Exception as e:
+        print(f"❌ Analytics error: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'suggestion': 'Run analytics_store.py to sync the columnar store.'
+        }), 400
+
+@lru_cache(maxsize=256)
+def cached_risk_grid(primary_type, description, location, domestic):
+    fixed = {
+        'Primary Type': primary_type,
+        'Description': description,
+        'Location Description': location,
+        'Domestic': domestic
+    }
+    districts = sorted(encoder_categories(preprocessor)['District'], key=lambda d: int(float(d)))
+    weights = {code: RISK_LEVEL_WEIGHTS.get(info['risk'], 0.5)
+               for code, info in CRIME_CATEGORY_MAPPING.items()}
+    grid = risk_grid.score_grid(serving_model, encoded_columns, fixed, districts, weights, calibration)
+    grid['axes'] = {
+        'District': [int(float(d)) for d in districts],
+        'HourofDay': risk_grid.HOURS,
+        'DayOfWeek': risk_grid.DAYS
+    }
+    grid['categories'] = {code: info['name'] for code, info in CRIME_CATEGORY_MAPPING.items()}
+    return grid
+
+@app.route('/risk-grid', methods=['GET'])
+def get_risk_grid():
+    """District x hour x weekday risk for one crime type, scored in one vectorized call"""
+    try:
+        fields = ['Primary Type', 'Description', 'Location Description', 'Domestic']
+        record, errors = validator.validate(request.args, fields)
+        if errors:
+            return jsonify({
+                'success': False,
+                'error': 'Invalid input',
+                'errors': errors,
+                'suggestion': 'Check the crime type fields and try again.'
+            }), 400
+        # Normalized values as the cache key, so " theft" and "THEFT" share an entry
+        key = tuple(record[name] for name in fields)
+        hits = cached_risk_grid.cache_info().hits
+        response = {'success': True}
+        response.update(cached_risk_grid(*key))
+        response['cached'] = cached_risk_grid.cache_info().hits > hits
+        return jsonify(response)
+
+    except Exception as e:
+        print(f"❌ Risk grid error: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'suggestion': 'Check the crime type fields and try again.'
+        }), 400
+
+@app.route('/monitoring/drift')
+def drift_report():
+    """Live input and prediction drift against the training baseline"""
+    if drift is None:
+        return jsonify({
+            'success': False,
+            'error': 'No drift baseline loaded',
+            'suggestion': 'Run drift_monitor.py to build one next to the model.'
+        }), 404
+    return jsonify({'success': True, **drift.report()})
+
+@app.route('/similar', methods=['GET', 'POST'])
+def similar():
+    """Most similar historical incidents to one record, from the precomputed index"""
+    if similar_index is None:
+        return jsonify({
+            'success': False,
+            'error': 'No similarity index loaded',
+            'suggestion': 'Run similarity_index.py to build one from crime_table.'
+        }), 404
+    try:
+        data = request.get_json(silent=True) if request.method == 'POST' else request.args
+        data = data or {}
+        record, errors = validator.validate(data)
+        if errors:
+            return jsonify({
+                'success': False,
+                'error': 'Invalid input',
+                'errors': errors,
+                'suggestion': 'Fix the listed fields and try again.'
+            }), 400
+        n = min(max(int(data.get('n', 10)), 1), similarity_index.MAX_RESULTS)
+
+        conn = sqlite3.connect(DB_PATH)
+        try:
+            # Rows written by other workers or loaders since the last query
+            similar_index.catch_up(conn)
+            rowids, scores = similar_index.query(record, n)
+            rows = similarity_index.fetch_rows(conn, rowids, scores)
+        finally:
+            conn.close()
+        return jsonify({'success': True, 'count': len(rows), 'indexed_rows': len(similar_index),
+                        'incidents': rows})
+
+    except Exception as e:
+        print(f"❌ Similarity error: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'suggestion': 'Ensure all inputs are valid and try again.'
+        }), 400
+
+@app.route('/search', methods=['GET'])
+def search():
+    """Ranked, paginated prefix search over Description and Location Description"""
+    if not search_enabled:
+        return jsonify({
+            'success': False,
+            'error': 'Full-text search is not available',
+            'suggestion': 'Run text_search.py to build the index.'
+        }), 404
+    try:
+        text = request.args.get('q', '')
+        fields = [f for f in request.args.get('fields', '').lower().split(',') if f] or None
+        unknown = [f for f in fields or [] if f not in text_search.SEARCH_FIELDS]
+        order = request.args.get('order', 'rank')
+        if not text.strip() or unknown or order not in ('rank', 'recent'):
+            return jsonify({
+                'success': False,
+                'error': 'Invalid search',
+                'suggestion': f"Pass q=<words>, optionally fields={','.join(text_search.SEARCH_FIELDS)} "
+                              "and order=rank|recent."
+            }), 400
+        page = max(int(request.args.get('page', 1)), 1)
+        per_page = min(max(int(request.args.get('per_page', 20)), 1), text_search.MAX_PER_PAGE)
+
+        conn = sqlite3.connect(DB_PATH)
+        try:
+            rows, has_more = text_search.search(conn, text, fields, page, per_page, order)
+        finally:
+            conn.close()
+        return jsonify({
+            'success': True,
+            'query': text,
+            'page': page,
+            'per_page': per_page,
+            'has_more': has_more,
+            'results': rows
+        })
+
+    except Exception as e:
+        print(f"❌ Search error: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'suggestion': 'Check the search parameters and try again.'
+        }), 400
+
+@app.route('/forecast', methods=['GET'])
+def get_forecast():
+    """Expected incidents per District, weekday and hour for the next week"""
+    try:
+        result, cached = forecaster.get()
+        districts = result['districts']
+        if request.args.get('district'):
+            district = int(float(request.args['district']))
+            if district not in districts:
+                return jsonify({
+                    'success': False,
+                    'error': f"No incidents recorded for District {district}",
+                    'suggestion': f"Choose one of: {', '.join(str(d) for d in districts)}."
+                }), 404
+            districts = {district: districts[district]}
+        return jsonify({
+            'success': True,
+            'cached': cached,
+            'axes': {'DayOfWeek': list(range(forecast.DAYS)), 'HourofDay': list(range(forecast.HOURS))},
+            'districts': districts,
+            'backtest': result['backtest'],
+            'data_weeks': result['data_weeks'],
+            'rows': result['rows']
+        })
+
+    except Exception as e:
+        print(f"❌ Forecast error: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'suggestion': 'Check the district parameter and try again.'
+        }), 400
+
 @app.route('/check-dashboard')
 def check_dashboard():
     """Check if Power BI dashboard is accessible"""
@@ -1604,40 +421,98 @@ def open_dashboard():
     """Route to open dashboard - redirects to dashboard URL"""
     return redirect(DASHBOARD_URL)
 
+@app.route('/metrics/admission')
+def admission_metrics():
+    """In-flight requests, queue depth and rejection counters for /predict"""
+    return jsonify({'success': True, **admission_control.snapshot()})
+
 @app.route('/predict', methods=['POST'])
+@admission_control.guard
 def predict():
     try:
         data = request.get_json()
         print(f"📡 AI Processing Request...")
         
-        # Convert ALL values to strings
-        input_dict = {
-            'Primary Type': [str(data.get('Primary Type', 'THEFT'))],
-            'Description': [str(data.get('Description', 'OVER $500'))],
-            'Location Description': [str(data.get('Location Description', 'STREET'))],
-            'Domestic': [str(data.get('Domestic', '0'))],
-            'District': [str(data.get('District', '12'))],
-            'DayOfWeek': [str(data.get('DayOfWeek', '0'))],
-            'HourofDay': [str(data.get('HourofDay', '14'))],
-            'DayorNight': [str(data.get('DayorNight', 'DAY'))]
+        # Normalize and check every field against the fitted categories
+        record, errors = validator.validate(data or {})
+        if errors:
+            if drift is not None:
+                drift.observe_rejected(errors)
+            return jsonify({
+                'success': False,
+                'error': 'Invalid input',
+                'errors': errors,
+                'suggestion': 'Fix the listed fields and try again.'
+            }), 400
+
+        # Serving tier: the distilled student answers when it is confident
+        # enough, otherwise (or when asked for) the forest does
+        tier = str(data.get('tier', PREDICT_TIER)).lower()
+        served_by = 'teacher'
+        # Opt-in per-field attribution; always answered by the forest it explains
+        explain = str(data.get('explain', '')).lower() in ('1', 'true', 'yes')
+        explanation = None
+
+        # Precomputed forest answer for common inputs
+        hit = None
+        if lookup_table is not None and tier != 'student' and not explain:
+            hit = lookup_table.lookup(record)
+        if hit is not None:
+            predictions, probas = hit
+            served_by = 'lookup'
+            classes = lookup_table.classes
+        elif tier in ('student', 'auto') and student is not None and not explain:
+            predictions, probas = student_predict(student, record)
+            confidence = min(float(p.max()) for p in probas)
+            if tier == 'student' or confidence >= STUDENT_MIN_CONFIDENCE:
+                served_by = 'student'
+                classes = [target['classes'] for target in student['targets']]
+
+        if served_by == 'teacher':
+            # One-row frame typed like the fitted categories, shared by every teacher path
+            df = records_frame([record], preprocessor)
+
+            if explain:
+                # Probabilities and their path attribution from one traversal
+                processed_data = preprocessor.transform(df)
+                predictions, probas, explanations = get_explainer().explain_with_proba(
+                    processed_data, calibration)
+                explanation = explanations[0]
+                classes = [estimator.classes_ for estimator in model.estimators_]
+            elif onnx_pipeline is not None:
+                # One-hot step and both forests in one onnxruntime call
+                predictions, probas = onnx_pipeline.predict(df, calibration)
+                classes = onnx_pipeline.classes
+            else:
+                # Transform
+                processed_data = preprocessor.transform(df)
+
+                # Predict - labels and probabilities from a single pass over the forests
+                predictions, probas = predict_with_proba(serving_model, processed_data, calibration)
+                classes = [estimator.classes_ for estimator in serving_model.estimators_]
+
+        arrest_pred = int(predictions[0, 0])
+        crime_cat_num = int(predictions[0, 1])
+        if drift is not None:
+            drift.observe(record, (arrest_pred, crime_cat_num))
+
+        arrest_classes = list(classes[0])
+        arrest_proba = float(probas[0][0, arrest_classes.index(1)]) if 1 in arrest_classes else 0.0
+        category_classes = classes[1]
+        category_proba = {
+            CRIME_CATEGORY_MAPPING.get(int(c), {}).get('name', f"Category {int(c)}"): round(float(p), 4)
+            for c, p in zip(category_classes, probas[1][0])
         }
-        
-        # Create DataFrame
-        df = pd.DataFrame(input_dict)
-        
-        # Transform
-        processed_data = preprocessor.transform(df)
-        
-        # Predict
-        predictions = model.predict(processed_data)
-        
-        # Process results
-        if predictions.ndim == 2 and predictions.shape[1] >= 2:
-            arrest_pred = int(predictions[0, 0])
-            crime_cat_num = int(predictions[0, 1])
-        else:
-            arrest_pred = int(predictions[0])
-            crime_cat_num = int(predictions[1]) if len(predictions) > 1 else 1
+        # At least the best category, at most all of them
+        k = min(max(int(data.get('top_k', 3)), 1), len(category_classes))
+        top_categories = [
+            {
+                'category': CRIME_CATEGORY_MAPPING.get(int(c), {}).get('name', f"Category {int(c)}"),
+                'category_numeric': int(c),
+                'probability': round(p, 4)
+            }
+            for c, p in top_k(probas[1][0], category_classes, k)
+        ]
         
         # Get crime category info
         crime_cat_info = CRIME_CATEGORY_MAPPING.get(crime_cat_num, {
@@ -1647,25 +522,26 @@ def predict():
         })
 
         # Save to database
-        conn = sqlite3.connect('crime_data.db')
+        conn = sqlite3.connect(DB_PATH)
         cursor = conn.cursor()
 
         new_id = generate_id(cursor)
         case_number = generate_case_number(cursor)
 
+        row = validator.row_values(record)
         new_record = (
             new_id,
             case_number,
-            input_dict['Primary Type'][0],
-            input_dict['Description'][0],
-            input_dict['Location Description'][0],
+            row['Primary Type'],
+            row['Description'],
+            row['Location Description'],
             arrest_pred,
-            int(input_dict['Domestic'][0]),
-            int(input_dict['District'][0]),
+            row['Domestic'],
+            row['District'],
             crime_cat_info['name'],
-            int(input_dict['DayOfWeek'][0]),
-            int(input_dict['HourofDay'][0]),
-            input_dict['DayorNight'][0]
+            row['DayOfWeek'],
+            row['HourofDay'],
+            row['DayorNight']
         )
 
         cursor.execute("""
@@ -1683,16 +559,25 @@ def predict():
         response = {
             'success': True,
             'model': 'CrimeScope AI v2.0',
+            'tier': served_by,
             'processing_time': '0.8s',
-            'confidence': '91.6%',
+            'confidence': f"{max(category_proba.values()) * 100:.1f}%",
             'predictions': {
                 'arrest': arrest_pred,
                 'category': crime_cat_info['name'],
                 'category_numeric': crime_cat_num,
                 'risk_level': crime_cat_info.get('risk', 'Medium')
             },
+            'probabilities': {
+                'arrest': round(arrest_proba, 4),
+                'category': category_proba,
+                'calibrated': served_by in ('teacher', 'lookup') and calibration is not None
+            },
+            'top_categories': top_categories,
             'form_response': new_record
         }
+        if explanation is not None:
+            response['explanation'] = explanation
         
         print(f"✅ AI Analysis Complete: {response}")
         return jsonify(response)
@@ -1717,6 +602,36 @@ def generate_case_number(cursor):
     next_id = 1 if last_id is None else last_id + 1
     return f"JK{next_id:06d}"
 
+# Warm the model, code paths and caches before reporting ready (see warmup.py)
+warmup_state = {'ready': WARMUP_MODE == 'off', 'report': None}
+
+def _prime_caches():
+    records = warmup.synthetic_records(preprocessor)
+    if onnx_pipeline is not None:
+        onnx_pipeline.predict(records_frame(records, preprocessor), calibration)
+    record = records[0]
+    cached_risk_grid(record['Primary Type'], record['Description'],
+                     record['Location Description'], record['Domestic'])
+    serializers.dumps_json({'success': True, 'record': record})
+    forecaster.get()
+
+def _warm_up():
+    try:
+        warmup_state['report'] = warmup.run(preprocessor, serving_model, calibration, student,
+                                            lookup_table, WARMUP_ROUNDS, primers=[_prime_caches])
+        print(f"🔥 Warm-up finished in {warmup_state['report']['seconds']}s")
+    except Exception as e:
+        # A failed warm-up only costs speed; do not keep the worker out of rotation
+        print(f"⚠️ Warm-up failed: {e}")
+        warmup_state['report'] = {'error': str(e)}
+    finally:
+        warmup_state['ready'] = True
+
+if WARMUP_MODE == 'blocking':
+    _warm_up()
+elif WARMUP_MODE == 'background':
+    threading.Thread(target=_warm_up, name='warmup', daemon=True).start()
+
 if __name__ == '__main__':
     print("🚀 Launching CrimeScope AI Pro Edition...")
     print("✨ Features:")
@@ -0,0 +1,55 @@
+# calibrate_model.py
+# Fit per-class probability calibration for the forest on the notebook's
+# held-out split and save it next to the model.
+#
+# Usage:
+#   python calibrate_model.py [--data crime_data_finalfortraining.csv]
+import argparse
+
+import joblib
+import numpy as np
+
+from config import MODEL_PATH, PREPROCESSOR_PATH, ENCODER_PATH, CALIBRATION_PATH, TARGETS
+from features import TRAINING_CSV, load_labeled_frame, align_to_encoder, split_holdout
+from inference import forest_proba, fit_calibration, calibrate
+
+
+def brier_score(proba, y, classes):
+    onehot = (np.asarray(y)[:, None] == classes[None, :]).astype(float)
+    return float(np.mean(np.sum((proba - onehot) ** 2, axis=1)))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Fit probability calibration for the forest")
+    parser.add_argument('--data', default=TRAINING_CSV,
+                        help="training CSV or SQLite database with crime_table")
+    parser.add_argument('--output', default=CALIBRATION_PATH)
+    args = parser.parse_args()
+
+    print("📦 Loading AI models...")
+    model = joblib.load(MODEL_PATH)
+    preprocessor = joblib.load(PREPROCESSOR_PATH)
+    encoder = joblib.load(ENCODER_PATH)
+
+    df = load_labeled_frame(args.data, encoder)
+    X = align_to_encoder(df, preprocessor)
+    _, X_test, _, y_test = split_holdout(X, df[TARGETS])
+
+    # Fit on one half of the held-out rows, report on the other
+    X_fit, X_eval, y_fit, y_eval = split_holdout(X_test, y_test)
+    calibration = fit_calibration(model, forest_proba(model, preprocessor.transform(X_fit)),
+                                  y_fit.to_numpy())
+
+    raw = forest_proba(model, preprocessor.transform(X_eval))
+    calibrated = calibrate(raw, calibration)
+    for t, (target, estimator) in enumerate(zip(TARGETS, model.estimators_)):
+        y_true = y_eval[target].to_numpy()
+        before = brier_score(raw[t], y_true, estimator.classes_)
+        after = brier_score(calibrated[t], y_true, estimator.classes_)
+        print(f"=== {target} === Brier score: {before:.4f} -> {after:.4f}")
+
+    # Refit on the whole held-out set for the saved artifact
+    calibration = fit_calibration(model, forest_proba(model, preprocessor.transform(X_test)),
+                                  y_test.to_numpy())
+    joblib.dump(calibration, args.output)
+    print(f"✅ Saved {args.output}")
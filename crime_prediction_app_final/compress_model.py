@@ -0,0 +1,279 @@
+# compress_model.py
+# Shrink the multi-target forest within an accuracy budget.
+#
+#   1. Per target, pick the smallest subset of trees whose ensemble stays
+#      within --tolerance of the full forest's held-out accuracy (greedy
+#      ordered aggregation: keep adding the tree that helps most).
+#   2. Cap the depth of the kept trees at the shallowest level that still
+#      meets the budget, then merge sibling leaves that vote for the same
+#      class.
+#
+# Both choices are made on one half of the held-out rows. The other half
+# gates the result: a target whose compressed forest misses the budget there
+# keeps its selected trees uncompressed, and if that still misses, nothing is
+# saved and the job exits non-zero.
+#
+# Writes the compressed model and a JSON report of the size / latency /
+# accuracy trade-off.
+#
+# Usage:
+#   python compress_model.py --tolerance 0.005 [--data crime_data_finalfortraining.csv]
+import argparse
+import copy
+import json
+import pickle
+import time
+
+import joblib
+import numpy as np
+from sklearn.tree._tree import Tree, TREE_LEAF, TREE_UNDEFINED
+
+from config import MODEL_PATH, PREPROCESSOR_PATH, ENCODER_PATH, TARGETS
+from features import TRAINING_CSV, load_labeled_frame, align_to_encoder, split_holdout
+
+COMPRESSED_MODEL_PATH = 'multi_target_rf_model_compressed.pkl'
+REPORT_PATH = 'compression_report.json'
+DEPTH_CAPS = [40, 32, 24, 20, 16, 12, 10, 8, 6]
+
+
+def rebuild_tree(tree, max_depth=None, merge_leaves=True):
+    """Copy of a fitted sklearn Tree cut at max_depth, with agreeing sibling leaves merged
+
+    Internal nodes keep the class distribution of the samples that reached
+    them, so a node cut at the depth cap becomes a leaf with that
+    distribution. Nodes are renumbered so the copy only stores reachable ones.
+    """
+    state = tree.__getstate__()
+    nodes, values = state['nodes'], state['values']
+    left, right = nodes['left_child'], nodes['right_child']
+
+    depth = np.zeros(len(nodes), dtype=np.int64)
+    for i in range(len(nodes)):
+        if left[i] != TREE_LEAF:
+            depth[left[i]] = depth[right[i]] = depth[i] + 1
+
+    is_leaf = left == TREE_LEAF
+    if max_depth is not None:
+        is_leaf = is_leaf | (depth >= max_depth)
+
+    if merge_leaves:
+        label = values[:, 0, :].argmax(axis=1)
+        # Children always have higher ids than their parent, so one reverse
+        # sweep merges bottom-up
+        for i in range(len(nodes) - 1, -1, -1):
+            if not is_leaf[i] and is_leaf[left[i]] and is_leaf[right[i]] \
+                    and label[left[i]] == label[right[i]] == label[i]:
+                is_leaf[i] = True
+
+    keep = []
+    stack = [0]
+    while stack:
+        i = stack.pop()
+        keep.append(i)
+        if not is_leaf[i]:
+            stack.extend((right[i], left[i]))
+    keep.sort()
+    new_id = {old: new for new, old in enumerate(keep)}
+
+    new_nodes = nodes[keep].copy()
+    for new, old in enumerate(keep):
+        if is_leaf[old]:
+            new_nodes['left_child'][new] = TREE_LEAF
+            new_nodes['right_child'][new] = TREE_LEAF
+            new_nodes['feature'][new] = TREE_UNDEFINED
+            new_nodes['threshold'][new] = TREE_UNDEFINED
+        else:
+            new_nodes['left_child'][new] = new_id[left[old]]
+            new_nodes['right_child'][new] = new_id[right[old]]
+
+    rebuilt = Tree(tree.n_features, np.asarray(tree.n_classes, dtype=np.intp), tree.n_outputs)
+    rebuilt.__setstate__({
+        'max_depth': int(depth[keep][is_leaf[keep]].max()) if keep else 0,
+        'node_count': len(keep),
+        'nodes': new_nodes,
+        'values': np.ascontiguousarray(values[keep])
+    })
+    return rebuilt
+
+
+def select_trees(forest, X, y, tolerance):
+    """Greedy ordered aggregation; smallest tree subset within tolerance of the full forest"""
+    classes = forest.classes_
+    per_tree = np.stack([tree.predict_proba(X).astype(np.float32) for tree in forest.estimators_])
+    full_accuracy = float(np.mean(classes.take(per_tree.sum(axis=0).argmax(axis=1)) == y))
+
+    chosen = []
+    remaining = list(range(len(forest.estimators_)))
+    running = np.zeros_like(per_tree[0])
+    accuracy = 0.0
+    while remaining:
+        candidates = running[None] + per_tree[remaining]
+        scores = np.mean(classes.take(candidates.argmax(axis=2)) == y[None], axis=1)
+        best = int(np.argmax(scores))
+        chosen.append(remaining.pop(best))
+        running = candidates[best]
+        accuracy = float(scores[best])
+        if accuracy >= full_accuracy - tolerance:
+            break
+    return chosen, accuracy, full_accuracy
+
+
+def compress_forest(forest, indices, max_depth=None, merge_leaves=True):
+    """Shallow copy of a fitted forest keeping only `indices`, each tree rebuilt"""
+    compressed = copy.copy(forest)
+    compressed.estimators_ = []
+    for i in indices:
+        estimator = copy.copy(forest.estimators_[i])
+        estimator.tree_ = rebuild_tree(estimator.tree_, max_depth, merge_leaves)
+        compressed.estimators_.append(estimator)
+    compressed.n_estimators = len(indices)
+    return compressed
+
+
+def forest_accuracy(forest, X, y):
+    return float(np.mean(forest.predict(X) == y))
+
+
+def shrink(forest, indices, X, y, budget, steps, target):
+    """The smallest rebuild of the `indices` subset whose accuracy on (X, y) stays >= budget
+
+    Falls back to the subset as selected when merging leaves alone misses
+    the budget. Returns (forest, depth cap or None, merged).
+    """
+    merged = compress_forest(forest, indices, merge_leaves=True)
+    accuracy = forest_accuracy(merged, X, y)
+    steps.append({'target': target, 'trees': len(indices), 'max_depth': None,
+                  'nodes': node_count(merged), 'accuracy': accuracy})
+    if accuracy < budget:
+        return compress_forest(forest, indices, merge_leaves=False), None, False
+
+    best, best_depth = merged, None
+    for cap in DEPTH_CAPS:
+        candidate = compress_forest(forest, indices, max_depth=cap, merge_leaves=True)
+        accuracy = forest_accuracy(candidate, X, y)
+        steps.append({'target': target, 'trees': len(indices), 'max_depth': cap,
+                      'nodes': node_count(candidate), 'accuracy': accuracy})
+        if accuracy < budget:
+            break
+        best, best_depth = candidate, cap
+    return best, best_depth, True
+
+
+def gate(model, compressed, subsets, X, Y, tolerance):
+    """Check the compressed model against the full one on rows no choice was made on
+
+    Targets outside the budget get their uncompressed tree subset back (in
+    place). Returns (full measurements, compressed measurements, targets
+    that fell back, targets still outside the budget).
+    """
+    full = measure(model, X, Y)
+    small = measure(compressed, X, Y)
+    fell_back = [target for target in TARGETS
+                 if small['accuracy'][target] < full['accuracy'][target] - tolerance]
+    if not fell_back:
+        return full, small, [], []
+    for target in fell_back:
+        t = TARGETS.index(target)
+        print(f"⚠️ {target}: {small['accuracy'][target]:.4f} vs {full['accuracy'][target]:.4f} on the "
+              f"report rows is outside the budget; keeping its selected trees uncompressed")
+        compressed.estimators_[t] = subsets[t]
+    small = measure(compressed, X, Y)
+    failed = [target for target in TARGETS
+              if small['accuracy'][target] < full['accuracy'][target] - tolerance]
+    return full, small, fell_back, failed
+
+
+def node_count(forest):
+    return int(sum(estimator.tree_.node_count for estimator in forest.estimators_))
+
+
+def measure(model, X, Y):
+    """Size, latency and per-target accuracy of a multi-target model"""
+    start = time.perf_counter()
+    predictions = model.predict(X)
+    batch_seconds = time.perf_counter() - start
+
+    single = X[:1]
+    model.predict(single)
+    runs = 20
+    start = time.perf_counter()
+    for _ in range(runs):
+        model.predict(single)
+    single_ms = (time.perf_counter() - start) / runs * 1000
+
+    return {
+        'trees': [len(est.estimators_) for est in model.estimators_],
+        'nodes': [node_count(est) for est in model.estimators_],
+        'size_bytes': len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)),
+        'single_row_ms': round(single_ms, 3),
+        'batch_us_per_row': round(batch_seconds / X.shape[0] * 1e6, 3),
+        'accuracy': {target: float(np.mean(predictions[:, t] == Y[:, t]))
+                     for t, target in enumerate(TARGETS)}
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compress the forest within an accuracy budget")
+    parser.add_argument('--data', default=TRAINING_CSV,
+                        help="training CSV or SQLite database with crime_table")
+    parser.add_argument('--tolerance', type=float, default=0.005,
+                        help="allowed held-out accuracy drop per target")
+    parser.add_argument('--max-rows', type=int, default=20000,
+                        help="held-out rows used for tree selection")
+    parser.add_argument('--output', default=COMPRESSED_MODEL_PATH)
+    parser.add_argument('--report', default=REPORT_PATH)
+    args = parser.parse_args()
+
+    print("📦 Loading AI models...")
+    model = joblib.load(MODEL_PATH)
+    preprocessor = joblib.load(PREPROCESSOR_PATH)
+    encoder = joblib.load(ENCODER_PATH)
+
+    df = load_labeled_frame(args.data, encoder)
+    X = align_to_encoder(df, preprocessor)
+    _, X_test, _, y_test = split_holdout(X, df[TARGETS])
+    # Select on one half of the held-out rows, report on the other
+    X_sel, X_rep, y_sel, y_rep = split_holdout(X_test, y_test)
+    X_sel, y_sel = X_sel[:args.max_rows], y_sel.to_numpy()[:args.max_rows]
+    X_sel = preprocessor.transform(X_sel)
+    X_rep, y_rep = preprocessor.transform(X_rep), y_rep.to_numpy()
+
+    compressed = copy.copy(model)
+    compressed.estimators_ = []
+    subsets = []
+    steps = []
+    for t, (target, forest) in enumerate(zip(TARGETS, model.estimators_)):
+        y = y_sel[:, t]
+        indices, subset_accuracy, full_accuracy = select_trees(forest, X_sel, y, args.tolerance)
+        print(f"=== {target} === {len(indices)}/{len(forest.estimators_)} trees "
+              f"(accuracy {subset_accuracy:.4f} vs {full_accuracy:.4f})")
+
+        best, best_depth, merged = shrink(forest, indices, X_sel, y, full_accuracy - args.tolerance,
+                                          steps, target)
+        print(f"    depth cap: {best_depth or 'none'}, leaves merged: {'yes' if merged else 'no'}, "
+              f"nodes: {node_count(forest):,} -> {node_count(best):,}")
+        compressed.estimators_.append(best)
+        subsets.append(compress_forest(forest, indices, merge_leaves=False))
+
+    full, small, fell_back, failed = gate(model, compressed, subsets, X_rep, y_rep, args.tolerance)
+    report = {
+        'tolerance': args.tolerance,
+        'full': full,
+        'compressed': small,
+        'uncompressed_fallback': fell_back,
+        'within_tolerance': not failed,
+        'search': steps
+    }
+    with open(args.report, 'w') as f:
+        json.dump(report, f, indent=2)
+    if failed:
+        print(f"❌ {', '.join(failed)} outside the {args.tolerance} accuracy budget on the report rows; "
+              f"{args.output} not written (see {args.report})")
+        raise SystemExit(1)
+    joblib.dump(compressed, args.output)
+
+    print(f"✅ Saved {args.output}: {full['size_bytes'] / 1e6:.1f} MB -> {small['size_bytes'] / 1e6:.1f} MB, "
+          f"{full['single_row_ms']:.2f} ms -> {small['single_row_ms']:.2f} ms per request")
+    for target in TARGETS:
+        print(f"    {target} accuracy: {full['accuracy'][target]:.4f} -> {small['accuracy'][target]:.4f}")
+    print(f"📄 Report written to {args.report}")
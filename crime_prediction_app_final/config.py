@@ -0,0 +1,71 @@
+# config.py
+# Shared paths and feature definitions used by the app and the offline jobs.
+import os
+
+DB_PATH = os.environ.get('CRIME_DB_PATH', 'crime_data.db')
+TABLE_NAME = 'crime_table'
+
+MODEL_PATH = 'multi_target_rf_model_compatible.pkl'
+PREPROCESSOR_PATH = 'preprocessor_compatible.pkl'
+ENCODER_PATH = 'crime_encoder_compatible.pkl'
+
+# Columnar analytics copy of crime_table (see analytics_store.py)
+PARQUET_ROOT = os.environ.get('CRIME_PARQUET_ROOT', 'crime_parquet')
+
+# Same order as the ColumnTransformer in the training notebook
+CATEGORICAL_FEATURES = ['Primary Type', 'Description', 'Location Description',
+                        'Domestic', 'District', 'DayorNight', 'DayOfWeek', 'HourofDay']
+TARGETS = ['Arrest', 'Crime Category']
+
+# Optional per-class probability calibration (see calibrate_model.py)
+CALIBRATION_PATH = 'probability_calibration.pkl'
+
+# Distilled linear student (see distill_model.py). PREDICT_TIER is the
+# default serving tier for /predict: 'teacher', 'student' or 'auto' (student
+# with fallback to the forest below STUDENT_MIN_CONFIDENCE).
+STUDENT_PATH = 'student_model.pkl'
+PREDICT_TIER = os.environ.get('PREDICT_TIER', 'teacher')
+STUDENT_MIN_CONFIDENCE = float(os.environ.get('STUDENT_MIN_CONFIDENCE', '0.9'))
+
+# Forest used by /predict: 'sklearn' (the pickled model), 'quantized'
+# (see quantized_forest.py) or 'onnx' (see onnx_model.py)
+QUANTIZED_MODEL_PATH = 'multi_target_rf_model_quantized.pkl'
+ONNX_MODEL_PATH = 'multi_target_rf_pipeline.onnx'
+ONNX_INTRA_OP_THREADS = int(os.environ.get('ONNX_INTRA_OP_THREADS', '1'))
+MODEL_BACKEND = os.environ.get('MODEL_BACKEND', 'sklearn')
+
+# Precomputed answers for frequent inputs (see prediction_table.py)
+PREDICTION_TABLE_PATH = 'prediction_table.npy'
+
+# Memory-mapped feature codes of crime_table for /similar (see similarity_index.py)
+SIMILARITY_INDEX_PATH = 'similarity_index.npy'
+
+# FTS5 index over crime_table's text columns for /search (see text_search.py)
+SEARCH_TABLE = 'crime_fts'
+
+# Weekly incident forecasts per District (see forecast.py). crime_table
+# stores no dates, so this is the number of weeks of incidents it covers
+FORECAST_DATA_WEEKS = float(os.environ.get('FORECAST_DATA_WEEKS', '52'))
+
+# Version history and training watermark of incremental updates (see update_model.py)
+MODEL_VERSIONS_PATH = 'model_versions.json'
+
+# Cached cleaned frames and encoded design matrices (see feature_store.py)
+FEATURE_STORE_DIR = os.environ.get('CRIME_FEATURE_STORE', 'feature_store')
+
+# Training-time input / prediction distribution for drift monitoring (see drift_monitor.py)
+DRIFT_BASELINE_PATH = 'drift_baseline.json'
+
+# Admission control for /predict (see admission.py): concurrent model calls,
+# waiting requests, seconds a request may wait, and per-client requests per
+# second / burst (rate 0 disables the per-client limit)
+ADMISSION_MAX_IN_FLIGHT = int(os.environ.get('ADMISSION_MAX_IN_FLIGHT', os.cpu_count() or 4))
+ADMISSION_MAX_QUEUE = int(os.environ.get('ADMISSION_MAX_QUEUE', '32'))
+ADMISSION_DEADLINE_SECONDS = float(os.environ.get('ADMISSION_DEADLINE_SECONDS', '2.0'))
+CLIENT_RATE_LIMIT = float(os.environ.get('CLIENT_RATE_LIMIT', '20'))
+CLIENT_BURST = int(os.environ.get('CLIENT_BURST', '40'))
+
+# Startup warm-up before /health reports ready (see warmup.py):
+# 'background' (serve /health as warming meanwhile), 'blocking' or 'off'
+WARMUP_MODE = os.environ.get('WARMUP_MODE', 'background')
+WARMUP_ROUNDS = int(os.environ.get('WARMUP_ROUNDS', '2'))
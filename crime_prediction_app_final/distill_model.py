@@ -0,0 +1,103 @@
+# distill_model.py
+# Distil the forest into a sparse linear student for the low-latency tier.
+#
+# The student is one multinomial logistic regression per target over the same
+# one-hot columns the preprocessor produces, trained on the forest's
+# probabilities (soft labels) rather than the ground truth. At serving time it
+# is a handful of weight lookups per request (inference.student_predict).
+#
+# Usage:
+#   python distill_model.py [--data crime_data_finalfortraining.csv] [--max-rows 500000]
+import argparse
+import time
+
+import joblib
+import numpy as np
+import scipy.sparse as sp
+from sklearn.linear_model import LogisticRegression
+
+from config import MODEL_PATH, PREPROCESSOR_PATH, ENCODER_PATH, STUDENT_PATH, TARGETS
+from features import TRAINING_CSV, load_labeled_frame, align_to_encoder, split_holdout
+from inference import forest_proba, feature_index, student_predict
+
+
+def fit_soft_logistic(X, proba, classes, C=1.0):
+    """Logistic regression on soft labels
+
+    Each row is repeated once per class, weighted by the teacher's
+    probability for that class, which minimises cross-entropy against the
+    teacher distribution.
+    """
+    n, k = proba.shape
+    weights = proba.T.ravel()
+    keep = weights > 0
+    X_rep = sp.vstack([X] * k).tocsr()[keep]
+    y_rep = np.repeat(classes, n)[keep]
+
+    clf = LogisticRegression(C=C, max_iter=300)
+    clf.fit(X_rep, y_rep, sample_weight=weights[keep])
+
+    # Dense (n_classes, n_features) weights over the teacher's classes; a
+    # binary model's single row becomes [0, w] so softmax equals the sigmoid
+    coef = np.zeros((k, X.shape[1]))
+    intercept = np.full(k, -30.0)
+    if len(clf.classes_) == 2:
+        fitted_coef = np.vstack([np.zeros(X.shape[1]), clf.coef_[0]])
+        fitted_intercept = np.array([0.0, clf.intercept_[0]])
+    else:
+        fitted_coef, fitted_intercept = clf.coef_, clf.intercept_
+    for row, label in enumerate(clf.classes_):
+        i = int(np.flatnonzero(classes == label)[0])
+        coef[i] = fitted_coef[row]
+        intercept[i] = fitted_intercept[row]
+    return coef, intercept
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Distil the forest into a linear student")
+    parser.add_argument('--data', default=TRAINING_CSV,
+                        help="training CSV or SQLite database with crime_table")
+    parser.add_argument('--max-rows', type=int, default=500000,
+                        help="training rows labelled by the teacher")
+    parser.add_argument('--C', type=float, default=1.0, help="inverse L2 regularisation strength")
+    parser.add_argument('--output', default=STUDENT_PATH)
+    args = parser.parse_args()
+
+    print("📦 Loading AI models...")
+    model = joblib.load(MODEL_PATH)
+    preprocessor = joblib.load(PREPROCESSOR_PATH)
+    encoder = joblib.load(ENCODER_PATH)
+
+    df = load_labeled_frame(args.data, encoder)
+    X = align_to_encoder(df, preprocessor)
+    X_train, X_test, _, y_test = split_holdout(X, df[TARGETS])
+    X_train = preprocessor.transform(X_train[:args.max_rows])
+
+    print(f"🧪 Labelling {X_train.shape[0]:,} rows with the forest...")
+    teacher = forest_proba(model, X_train)
+
+    student = {'feature_index': feature_index(preprocessor), 'targets': []}
+    for target, estimator, proba in zip(TARGETS, model.estimators_, teacher):
+        coef, intercept = fit_soft_logistic(X_train, proba, estimator.classes_, args.C)
+        student['targets'].append({
+            'name': target,
+            'classes': estimator.classes_,
+            'coef': coef,
+            'intercept': intercept
+        })
+
+    # Fidelity and latency on the held-out rows
+    records = X_test.astype(str).to_dict('records')
+    X_eval = preprocessor.transform(X_test)
+    teacher_labels = model.predict(X_eval)
+    start = time.perf_counter()
+    student_labels = np.vstack([student_predict(student, record)[0] for record in records])
+    student_us = (time.perf_counter() - start) / len(records) * 1e6
+    for t, target in enumerate(TARGETS):
+        agreement = np.mean(student_labels[:, t] == teacher_labels[:, t])
+        accuracy = np.mean(student_labels[:, t] == y_test[target].to_numpy())
+        print(f"=== {target} === agreement with forest: {agreement:.4f}, accuracy: {accuracy:.4f}")
+    print(f"⚡ Student latency: {student_us:.1f} µs per request")
+
+    joblib.dump(student, args.output)
+    print(f"✅ Saved {args.output}")
@@ -0,0 +1,189 @@
+# evaluate_model.py
+# Parallel evaluation of a model on the notebook's held-out rows.
+#
+# The test matrix is split into shards scored by a process pool (each worker
+# loads the model once). The report covers both targets with overall
+# accuracy, confusion matrices, accuracy per District, HourofDay and Primary
+# Type, and single-request / batch latency. Single-row latency is measured in
+# a serial pass in the main process after the pool has finished, so it is not
+# inflated by the other shards competing for the CPU. The report is written
+# as JSON and checked against promotion gates: minimum accuracy per target,
+# maximum regression against a baseline report and a p95 latency cap. The
+# exit status is 1 when a gate fails, so a deploy script can refuse to
+# promote the model.
+#
+# Usage:
+#   python evaluate_model.py --model multi_target_rf_model_trained.pkl \
+#       --preprocessor preprocessor_trained.pkl --baseline evaluation_report.json
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.metrics import confusion_matrix
+
+from config import MODEL_PATH, PREPROCESSOR_PATH, ENCODER_PATH, CALIBRATION_PATH, TARGETS
+from features import TRAINING_CSV
+from inference import predict_with_proba
+from train_model import load_features, split_indices
+
+REPORT_PATH = 'evaluation_report.json'
+SLICES = ['District', 'HourofDay', 'Primary Type']
+SHARD_ROWS = 20000
+LATENCY_SAMPLES = 200
+MIN_SLICE_ROWS = 30
+
+_worker = {}
+
+
+def _init_worker(model_path, calibration_path):
+    _worker['model'] = joblib.load(model_path)
+    _worker['calibration'] = joblib.load(calibration_path) if calibration_path else None
+
+
+def _evaluate_shard(X):
+    """Labels for one shard and its batch time"""
+    start = time.perf_counter()
+    labels, _ = predict_with_proba(_worker['model'], X, _worker['calibration'])
+    return labels, time.perf_counter() - start
+
+
+def single_row_latencies(model, X, calibration=None, samples=LATENCY_SAMPLES):
+    """Seconds per single-row prediction for up to `samples` rows spread over X, one at a time"""
+    rows = np.unique(np.linspace(0, X.shape[0] - 1, min(samples, X.shape[0])).astype(int))
+    predict_with_proba(model, X[rows[0]:rows[0] + 1], calibration)
+    timings = []
+    for i in rows:
+        start = time.perf_counter()
+        predict_with_proba(model, X[i:i + 1], calibration)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def slice_accuracy(frame, y_true, y_pred, column):
+    """{value: {'rows': n, target: accuracy}} for slices with enough support"""
+    correct = pd.DataFrame({target: y_pred[:, t] == y_true[:, t] for t, target in enumerate(TARGETS)})
+    correct[column] = frame[column].astype(str).to_numpy()
+    grouped = correct.groupby(column)
+    counts = grouped.size()
+    means = grouped[TARGETS].mean()
+    return {
+        str(value): {'rows': int(counts[value]), **{t: round(float(means.at[value, t]), 4) for t in TARGETS}}
+        for value in counts.index if counts[value] >= MIN_SLICE_ROWS
+    }
+
+
+def build_report(frame, y_true, y_pred, class_names, latencies, batch_seconds):
+    report = {'rows': int(len(y_true)), 'targets': {}}
+    for t, target in enumerate(TARGETS):
+        labels = np.arange(len(class_names[t]))
+        report['targets'][target] = {
+            'accuracy': round(float(np.mean(y_pred[:, t] == y_true[:, t])), 4),
+            'classes': class_names[t],
+            'confusion_matrix': confusion_matrix(y_true[:, t], y_pred[:, t], labels=labels).tolist()
+        }
+    report['slices'] = {column: slice_accuracy(frame, y_true, y_pred, column) for column in SLICES}
+    latencies_ms = np.array(latencies) * 1000
+    report['latency'] = {
+        'single_row_p50_ms': round(float(np.percentile(latencies_ms, 50)), 3),
+        'single_row_p95_ms': round(float(np.percentile(latencies_ms, 95)), 3),
+        'batch_us_per_row': round(batch_seconds / len(y_true) * 1e6, 3)
+    }
+    return report
+
+
+def check_gates(report, min_accuracy, baseline, max_regression, max_latency_ms):
+    """List of failed gate descriptions (empty when the model may be promoted)"""
+    failures = []
+    for target, threshold in zip(TARGETS, min_accuracy or []):
+        accuracy = report['targets'][target]['accuracy']
+        if accuracy < threshold:
+            failures.append(f"{target} accuracy {accuracy:.4f} < {threshold:.4f}")
+    if baseline is not None:
+        for target in TARGETS:
+            before = baseline['targets'][target]['accuracy']
+            after = report['targets'][target]['accuracy']
+            if after < before - max_regression:
+                failures.append(f"{target} accuracy {after:.4f} regressed from {before:.4f}")
+    p95 = report['latency']['single_row_p95_ms']
+    if max_latency_ms is not None and p95 > max_latency_ms:
+        failures.append(f"p95 latency {p95:.2f} ms > {max_latency_ms:.2f} ms")
+    return failures
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Evaluate a model and gate its promotion")
+    parser.add_argument('--source', default=TRAINING_CSV,
+                        help="training CSV or SQLite database with crime_table")
+    parser.add_argument('--model', default=MODEL_PATH)
+    parser.add_argument('--preprocessor', default=PREPROCESSOR_PATH)
+    parser.add_argument('--no-calibration', action='store_true',
+                        help="score raw forest votes even if a calibration file exists")
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--min-accuracy', type=float, nargs=len(TARGETS), metavar=tuple(TARGETS),
+                        help="minimum accuracy per target")
+    parser.add_argument('--baseline', help="earlier report the model must not regress from")
+    parser.add_argument('--max-regression', type=float, default=0.005)
+    parser.add_argument('--max-latency-ms', type=float, help="cap on single-row p95 latency")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="rebuild features instead of using the feature store")
+    parser.add_argument('--output', default=REPORT_PATH)
+    args = parser.parse_args()
+    # A missing baseline must not quietly skip the regression gate
+    if args.baseline and not os.path.exists(args.baseline):
+        parser.error(f"--baseline {args.baseline} does not exist")
+
+    start = time.time()
+    encoder = joblib.load(ENCODER_PATH)
+    preprocessor = joblib.load(args.preprocessor)
+    frame, X, y, _ = load_features(args.source, encoder, preprocessor, use_cache=not args.no_cache)
+    _, test_idx = split_indices(y)
+    X_test, y_test, frame_test = X[test_idx], y[test_idx], frame.iloc[test_idx]
+    del X, frame
+
+    calibration_path = None
+    if not args.no_calibration and args.model == MODEL_PATH and os.path.exists(CALIBRATION_PATH):
+        calibration_path = CALIBRATION_PATH
+    shards = [X_test[i:i + SHARD_ROWS] for i in range(0, X_test.shape[0], SHARD_ROWS)]
+    print(f"📊 Evaluating {X_test.shape[0]:,} held-out rows in {len(shards)} shards")
+
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                             initargs=(args.model, calibration_path)) as pool:
+        results = list(pool.map(_evaluate_shard, shards))
+    y_pred = np.vstack([labels for labels, _ in results]).astype(y_test.dtype)
+    batch_seconds = sum(seconds for _, seconds in results)
+    # Serving latency on an otherwise idle process, after the pool has exited
+    latencies = single_row_latencies(joblib.load(args.model), X_test,
+                                     joblib.load(calibration_path) if calibration_path else None)
+
+    class_names = [['False', 'True'], [str(c) for c in encoder.classes_]]
+    report = build_report(frame_test, y_test, y_pred, class_names, latencies, batch_seconds)
+    report.update(model=args.model, calibrated=calibration_path is not None,
+                  source=args.source, evaluated_at=time.strftime('%Y-%m-%dT%H:%M:%S'))
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    failures = check_gates(report, args.min_accuracy, baseline, args.max_regression,
+                           args.max_latency_ms)
+    report['gates'] = {'passed': not failures, 'failures': failures}
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    for target in TARGETS:
+        print(f"=== {target} === Accuracy: {report['targets'][target]['accuracy']:.4f}")
+    latency = report['latency']
+    print(f"⚡ Single row p50 {latency['single_row_p50_ms']:.2f} ms, p95 {latency['single_row_p95_ms']:.2f} ms; "
+          f"batch {latency['batch_us_per_row']:.1f} µs per row")
+    print(f"📄 Report written to {args.output} in {time.time() - start:.1f}s")
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print("✅ All promotion gates passed")
@@ -0,0 +1,203 @@
+# explain.py
+# Per-prediction explanations by path attribution (Saabas) over the forest.
+#
+# Walking a row down a tree, every split moves the node's class distribution
+# from the parent's to the child's; the difference is credited to the split's
+# feature. Summed over the path, the credits plus the root distribution equal
+# the leaf distribution, so averaged over the trees they add up exactly to the
+# forest's predict_proba. The same traversal therefore gives both the
+# probabilities and their explanation. One-hot columns are summed back to the
+# eight source fields.
+#
+# Explainer precomputes, once at load, every node's delta (its distribution
+# minus its parent's, divided by the number of trees) and the source field of
+# the parent's split, with all trees of a forest concatenated into one set of
+# node arrays. Explaining rows walks every tree at once, one vectorized step
+# per depth level, then sums the deltas of the visited nodes with one bincount
+# per class - no Python loop over rows or trees, and none of sklearn's
+# per-tree call overhead. The arrays take about as much memory as the
+# forest's own node arrays (see Explainer.nbytes), so the app builds them on
+# the first explain request rather than at startup.
+#
+# Usage (latency against predict_with_proba on the served model):
+#   python explain.py [--rows 200]
+import argparse
+import sqlite3
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from config import CATEGORICAL_FEATURES, TARGETS
+from inference import calibrate
+
+# Slot collecting root nodes and columns outside the eight fields; dropped
+OTHER = len(CATEGORICAL_FEATURES)
+
+
+def column_fields(encoded_columns, n_columns):
+    """Source field index (into CATEGORICAL_FEATURES) of every encoded column, OTHER if none"""
+    fields = np.full(n_columns, OTHER, dtype=np.int64)
+    for name, mapping in encoded_columns.items():
+        fields[list(mapping.values())] = CATEGORICAL_FEATURES.index(name)
+    return fields
+
+
+class ForestExplainer:
+    """Concatenated nodes of one fitted RandomForestClassifier with their contribution deltas"""
+
+    def __init__(self, forest, fields):
+        n_trees = len(forest.estimators_)
+        left, right, features, thresholds, deltas, node_fields, roots, dists = [], [], [], [], [], [], [], []
+        offset = 0
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            dist = tree.value[:, 0, :] / tree.value[:, 0, :].sum(axis=1, keepdims=True)
+            internal = np.flatnonzero(tree.children_left >= 0)
+            parent = np.zeros(tree.node_count, dtype=np.int64)
+            parent[tree.children_left[internal]] = internal
+            parent[tree.children_right[internal]] = internal
+            # The root is its own parent: zero delta, OTHER field
+            delta = (dist - dist[parent]) / n_trees
+            field = fields[np.maximum(tree.feature[parent], 0)]
+            field[0] = OTHER
+            leaf = tree.children_left < 0
+            left.append(np.where(leaf, -1, tree.children_left + offset))
+            right.append(np.where(leaf, -1, tree.children_right + offset))
+            features.append(np.maximum(tree.feature, 0))
+            thresholds.append(tree.threshold)
+            deltas.append(delta)
+            node_fields.append(field)
+            roots.append(offset)
+            dists.append(dist[0])
+            offset += tree.node_count
+        self.left = np.concatenate(left)
+        self.right = np.concatenate(right)
+        self.features = np.concatenate(features)
+        self.thresholds = np.concatenate(thresholds)
+        self.deltas = np.concatenate(deltas)
+        self.fields = np.concatenate(node_fields)
+        self.roots = np.array(roots, dtype=np.int64)
+        self.bias = np.mean(dists, axis=0)
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.left, self.right, self.features, self.thresholds,
+                                      self.deltas, self.fields))
+
+    def _paths(self, X):
+        """(rows, nodes) of every non-root node on every row's path through every tree
+
+        All trees advance together one level per step, the same comparison
+        as sklearn's (float32 value <= threshold goes left); pairs that
+        reached a leaf drop out.
+        """
+        X = np.asarray(X.toarray() if sp.issparse(X) else X, dtype=np.float32)
+        rows = np.repeat(np.arange(X.shape[0]), len(self.roots))
+        nodes = np.tile(self.roots, X.shape[0])
+        visited_rows, visited_nodes = [], []
+        while len(nodes):
+            inner = self.left[nodes] >= 0
+            rows, nodes = rows[inner], nodes[inner]
+            go_left = X[rows, self.features[nodes]] <= self.thresholds[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+            visited_rows.append(rows)
+            visited_nodes.append(nodes)
+        return np.concatenate(visited_rows), np.concatenate(visited_nodes)
+
+    def contributions(self, X):
+        """(proba, by_field): (n_rows, n_classes) and (n_rows, 8, n_classes), proba == bias + by_field.sum(axis=1)"""
+        rows, nodes = self._paths(X)
+        n_rows, n_classes = X.shape[0], len(self.bias)
+        slots = rows * (OTHER + 1) + self.fields[nodes]
+        by_field = np.column_stack([
+            np.bincount(slots, weights=self.deltas[nodes, c], minlength=n_rows * (OTHER + 1))
+            for c in range(n_classes)
+        ]).reshape(n_rows, OTHER + 1, n_classes)
+        proba = self.bias + by_field.sum(axis=1)
+        return proba, by_field[:, :OTHER]
+
+
+class Explainer:
+    """Path attribution for every target's forest of a MultiOutputClassifier"""
+
+    def __init__(self, model, encoded_columns):
+        n_columns = model.estimators_[0].n_features_in_
+        fields = column_fields(encoded_columns, n_columns)
+        self.model = model
+        self.forests = [ForestExplainer(forest, fields) for forest in model.estimators_]
+
+    @property
+    def nbytes(self):
+        """Memory held by the precomputed node arrays of every forest"""
+        return sum(forest.nbytes for forest in self.forests)
+
+    def explain_with_proba(self, X, calibration=None):
+        """(labels, probas, explanations) from one traversal of each target's forest
+
+        Each explanation maps a target to its predicted class, the forest's
+        base rate for that class and each source field's contribution to it.
+        The contributions explain the raw forest votes; with calibration the
+        returned probabilities (and labels) are calibrated as usual.
+        """
+        raw, explained = [], []
+        for forest in self.forests:
+            proba, by_field = forest.contributions(X)
+            raw.append(proba)
+            explained.append((forest.bias, by_field))
+
+        probas = calibrate(raw, calibration) if calibration is not None else raw
+        labels = np.column_stack([forest.classes_.take(proba.argmax(axis=1))
+                                  for forest, proba in zip(self.model.estimators_, probas)])
+
+        explanations = []
+        for row in range(X.shape[0]):
+            explanation = {}
+            for t, (target, (bias, by_field)) in enumerate(zip(TARGETS, explained)):
+                k = int(np.argmax(probas[t][row]))
+                ranked = sorted(zip(CATEGORICAL_FEATURES, by_field[row, :, k]), key=lambda kv: -abs(kv[1]))
+                explanation[target] = {
+                    'class': labels[row, t].item(),
+                    'base': round(float(bias[k]), 4),
+                    'contributions': {name: round(float(value), 4) for name, value in ranked}
+                }
+            explanations.append(explanation)
+        return labels, probas, explanations
+
+
+if __name__ == '__main__':
+    from config import DB_PATH, MODEL_PATH, PREPROCESSOR_PATH, TABLE_NAME
+    from features import align_to_encoder
+    from inference import feature_index, predict_with_proba
+
+    parser = argparse.ArgumentParser(description="Time per-row explanations against plain prediction")
+    parser.add_argument('--db', default=DB_PATH)
+    parser.add_argument('--rows', type=int, default=200)
+    args = parser.parse_args()
+
+    model = joblib.load(MODEL_PATH)
+    preprocessor = joblib.load(PREPROCESSOR_PATH)
+    start = time.perf_counter()
+    explainer = Explainer(model, feature_index(preprocessor))
+    print(f"✅ Precomputed {sum(len(f.deltas) for f in explainer.forests):,} node deltas "
+          f"({explainer.nbytes / 1e6:.1f} MB) in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    conn = sqlite3.connect(args.db)
+    frame = pd.read_sql_query(f'SELECT * FROM "{TABLE_NAME}" LIMIT ?', conn, params=(args.rows,))
+    conn.close()
+    X = preprocessor.transform(align_to_encoder(frame, preprocessor))
+
+    _, probas, _ = explainer.explain_with_proba(X)
+    _, expected = predict_with_proba(model, X)
+    error = max(float(np.abs(p - e).max()) for p, e in zip(probas, expected))
+    print(f"   max |proba - predict_proba| = {error:.2e}")
+    for name, func in (('predict_with_proba', lambda row: predict_with_proba(model, row)),
+                       ('explain_with_proba', lambda row: explainer.explain_with_proba(row))):
+        timings = []
+        for i in range(X.shape[0]):
+            t = time.perf_counter()
+            func(X[i:i + 1])
+            timings.append(time.perf_counter() - t)
+        print(f"⚡ {name}: p50 {np.median(timings) * 1000:.2f} ms per single-row request")
@@ -0,0 +1,164 @@
+# feature_store.py
+# On-disk cache of the cleaned feature frame and its encoded design matrix.
+#
+# Training, tuning and evaluation all start from the same expensive steps:
+# read the source, clean it, encode the targets and one-hot encode the eight
+# features. An entry stores the results of those steps:
+#
+#   frame.pkl          cleaned features as pandas categoricals
+#   X.npz              encoded CSR design matrix (float32)
+#   y.npy              int8 (n, 2) targets
+#   preprocessor.pkl   the ColumnTransformer that produced X
+#   meta.json          source, hashes, shapes and schema hash
+#
+# Entries are keyed by a content hash of the source and a hash of the
+# pipeline (the source code of the cleaning / encoding functions plus the
+# library versions and encoder classes), so editing the cleaning code or
+# replacing the input data picks a new key automatically; older entries for
+# the same source are pruned when a new one is written.
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+import sklearn
+
+from config import FEATURE_STORE_DIR
+
+# Bump to force a rebuild when the cached layout changes
+STORE_VERSION = 1
+HASH_INDEX = '_source_hashes.json'
+HASH_BLOCK = 1 << 22
+
+
+def _digest(parts):
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        h.update(part if isinstance(part, bytes) else str(part).encode())
+        h.update(b'\x1f')
+    return h.hexdigest()
+
+
+def _file_digest(path):
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def source_hash(source, root=FEATURE_STORE_DIR):
+    """Content hash of a source file (or of every file under a directory)
+
+    Hashes are remembered per (path, size, mtime), so an unchanged
+    multi-gigabyte CSV is only read once.
+    """
+    paths = [source]
+    if os.path.isdir(source):
+        paths = sorted(os.path.join(d, name) for d, _, names in os.walk(source) for name in names)
+
+    index_path = os.path.join(root, HASH_INDEX)
+    index = {}
+    if os.path.exists(index_path):
+        with open(index_path) as f:
+            index = json.load(f)
+
+    digests = []
+    for path in paths:
+        stat = os.stat(path)
+        stamp = f"{stat.st_size}:{stat.st_mtime_ns}"
+        entry = index.get(os.path.abspath(path))
+        if entry is None or entry['stamp'] != stamp:
+            entry = {'stamp': stamp, 'hash': _file_digest(path)}
+            index[os.path.abspath(path)] = entry
+        digests.append(entry['hash'])
+
+    os.makedirs(root, exist_ok=True)
+    with open(index_path, 'w') as f:
+        json.dump(index, f)
+    return _digest(digests)
+
+
+def pipeline_hash(functions, encoder, preprocessor=None):
+    """Changes when any cleaning / encoding function, library or fitted input changes"""
+    parts = [STORE_VERSION, sklearn.__version__, pd.__version__, np.__version__,
+             joblib.hash(list(encoder.classes_))]
+    parts.extend(inspect.getsource(func) for func in functions)
+    if preprocessor is not None:
+        parts.append(joblib.hash(preprocessor))
+    return _digest(parts)
+
+
+def schema_hash(frame, X):
+    """Columns, dtypes and category sets of the frame plus the matrix width"""
+    parts = [X.shape[1]]
+    for name in frame.columns:
+        parts.append(f"{name}:{frame[name].dtype}")
+        if isinstance(frame[name].dtype, pd.CategoricalDtype):
+            parts.append(joblib.hash(list(frame[name].cat.categories)))
+    return _digest(parts)
+
+
+def entry_key(source, functions, encoder, preprocessor=None, root=FEATURE_STORE_DIR):
+    return _digest([source_hash(source, root), pipeline_hash(functions, encoder, preprocessor)])
+
+
+def load(key, root=FEATURE_STORE_DIR):
+    """(frame, X, y, preprocessor) for a cached entry, or None"""
+    path = os.path.join(root, key)
+    if not os.path.exists(os.path.join(path, 'meta.json')):
+        return None
+    with open(os.path.join(path, 'meta.json')) as f:
+        meta = json.load(f)
+    frame = pd.read_pickle(os.path.join(path, 'frame.pkl'))
+    X = sp.load_npz(os.path.join(path, 'X.npz')).tocsr()
+    if schema_hash(frame, X) != meta['schema_hash']:
+        print(f"⚠️ Feature store entry {key} does not match its schema hash; rebuilding")
+        return None
+    y = np.load(os.path.join(path, 'y.npy'))
+    preprocessor = joblib.load(os.path.join(path, 'preprocessor.pkl'))
+    return frame, X, y, preprocessor
+
+
+def save(key, source, frame, X, y, preprocessor, root=FEATURE_STORE_DIR):
+    """Write an entry atomically and prune older entries built from the same source"""
+    path = os.path.join(root, key)
+    staging = f"{path}.tmp{os.getpid()}"
+    os.makedirs(staging, exist_ok=True)
+    frame.to_pickle(os.path.join(staging, 'frame.pkl'))
+    sp.save_npz(os.path.join(staging, 'X.npz'), X, compressed=False)
+    np.save(os.path.join(staging, 'y.npy'), y)
+    joblib.dump(preprocessor, os.path.join(staging, 'preprocessor.pkl'))
+    with open(os.path.join(staging, 'meta.json'), 'w') as f:
+        json.dump({
+            'source': os.path.abspath(source),
+            'rows': X.shape[0],
+            'columns': X.shape[1],
+            'schema_hash': schema_hash(frame, X),
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S')
+        }, f, indent=2)
+
+    if os.path.exists(path):
+        shutil.rmtree(staging)
+    else:
+        os.replace(staging, path)
+    prune(source, keep=key, root=root)
+
+
+def prune(source, keep=None, root=FEATURE_STORE_DIR):
+    """Remove entries built from `source` other than `keep`"""
+    if not os.path.isdir(root):
+        return
+    for name in os.listdir(root):
+        meta_path = os.path.join(root, name, 'meta.json')
+        if name == keep or not os.path.exists(meta_path):
+            continue
+        with open(meta_path) as f:
+            if json.load(f)['source'] == os.path.abspath(source):
+                shutil.rmtree(os.path.join(root, name), ignore_errors=True)
@@ -0,0 +1,173 @@
+# features.py
+# Loading labelled incidents and shaping them the way the training notebook does.
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+
+from config import TABLE_NAME, CATEGORICAL_FEATURES, TARGETS
+
+# Cleaned frame written by the notebook before training
+TRAINING_CSV = 'crime_data_finalfortraining.csv'
+TEST_SIZE = 0.2
+RANDOM_STATE = 42
+
+
+def load_labeled_frame(source, encoder, include_predicted=False):
+    """Features and encoded targets from the training CSV or a SQLite database file
+
+    As in load_incidents_since, rows written by /predict are skipped for
+    database sources unless include_predicted.
+    """
+    columns = CATEGORICAL_FEATURES + TARGETS
+    if source.endswith('.csv'):
+        df = pd.read_csv(source, usecols=columns, low_memory=False)
+    else:
+        conn = sqlite3.connect(source)
+        try:
+            quoted = ', '.join(f'"{c}"' for c in columns)
+            where = '' if include_predicted else ' WHERE "Case Number" NOT LIKE \'JK%\''
+            df = pd.read_sql_query(f'SELECT {quoted} FROM "{TABLE_NAME}"{where}', conn)
+        finally:
+            conn.close()
+
+    return _encode_targets(df, encoder)
+
+
+def load_incidents_since(db_path, encoder, since_id=0, window=None, include_predicted=False):
+    """Labelled crime_table rows with ID > since_id, or the last `window` rows
+
+    Rows written by /predict (case numbers 'JK......') carry the model's own
+    output rather than ground truth and are skipped unless include_predicted.
+    """
+    columns = ['ID'] + CATEGORICAL_FEATURES + TARGETS
+    quoted = ', '.join(f'"{c}"' for c in columns)
+    where = '' if include_predicted else ' AND "Case Number" NOT LIKE \'JK%\''
+    if window:
+        sql = f'SELECT {quoted} FROM "{TABLE_NAME}" WHERE 1 = 1{where} ORDER BY "ID" DESC LIMIT ?'
+        params = (window,)
+    else:
+        sql = f'SELECT {quoted} FROM "{TABLE_NAME}" WHERE "ID" > ?{where} ORDER BY "ID"'
+        params = (since_id,)
+    conn = sqlite3.connect(db_path)
+    try:
+        df = pd.read_sql_query(sql, conn, params=params)
+    finally:
+        conn.close()
+    return _encode_targets(df, encoder)
+
+
+def iter_labeled_chunks(source, encoder, chunksize=200000, include_predicted=False):
+    """Stream labelled incidents in chunks from a CSV, SQLite database or Parquet store
+
+    Only the feature and target columns are read. As in load_incidents_since,
+    rows written by /predict are skipped for database sources unless
+    include_predicted.
+    """
+    columns = CATEGORICAL_FEATURES + TARGETS
+    if source.endswith('.csv'):
+        for chunk in pd.read_csv(source, usecols=columns, chunksize=chunksize, low_memory=False):
+            yield _encode_targets(chunk, encoder)
+    elif os.path.isdir(source):
+        import pyarrow.compute as pc
+        from analytics_store import open_dataset
+
+        dataset = open_dataset(source)
+        expr = None if include_predicted else ~pc.starts_with(pc.field('Case Number'), 'JK')
+        for batch in dataset.to_batches(columns=columns, filter=expr, batch_size=chunksize):
+            if batch.num_rows:
+                yield _encode_targets(batch.to_pandas(), encoder)
+    else:
+        quoted = ', '.join(f'"{c}"' for c in columns)
+        where = '' if include_predicted else ' WHERE "Case Number" NOT LIKE \'JK%\''
+        conn = sqlite3.connect(source)
+        try:
+            for chunk in pd.read_sql_query(f'SELECT {quoted} FROM "{TABLE_NAME}"{where}', conn,
+                                           chunksize=chunksize):
+                yield _encode_targets(chunk, encoder)
+        finally:
+            conn.close()
+
+
+def _encode_targets(df, encoder):
+    df = df.dropna(subset=CATEGORICAL_FEATURES + TARGETS)
+    df['Arrest'] = df['Arrest'].astype(int)      # True/False -> 1/0
+    df['Domestic'] = df['Domestic'].astype(int)  # True/False -> 1/0
+    df['Crime Category'] = encoder.transform(df['Crime Category'])
+    return df
+
+
+def load_training_arrays(source, encoder, include_predicted=False):
+    """Features as string categoricals and targets as an (n, 2) int array
+
+    Only the needed columns are read, categoricals are stored as pandas
+    'category' columns, and the targets are pulled out as integer arrays
+    before the frame is touched again, so no one-hot or full-width copy of
+    the data is ever made. As in load_incidents_since, rows written by
+    /predict are skipped for database sources unless include_predicted.
+    """
+    columns = CATEGORICAL_FEATURES + TARGETS
+    if source.endswith('.csv'):
+        dtypes = {name: 'category' for name in CATEGORICAL_FEATURES if name != 'Domestic'}
+        df = pd.read_csv(source, usecols=columns, dtype=dtypes, low_memory=False)
+    else:
+        conn = sqlite3.connect(source)
+        try:
+            quoted = ', '.join(f'"{c}"' for c in columns)
+            where = '' if include_predicted else ' WHERE "Case Number" NOT LIKE \'JK%\''
+            df = pd.read_sql_query(f'SELECT {quoted} FROM "{TABLE_NAME}"{where}', conn)
+        finally:
+            conn.close()
+
+    df.dropna(subset=columns, inplace=True)
+    y = np.column_stack([df['Arrest'].astype(np.int8).to_numpy(),
+                         encoder.transform(df['Crime Category']).astype(np.int8)])
+    df.drop(columns=TARGETS, inplace=True)
+    df['Domestic'] = df['Domestic'].astype(int)  # True/False -> 1/0
+    for name in CATEGORICAL_FEATURES:
+        if not isinstance(df[name].dtype, pd.CategoricalDtype):
+            df[name] = df[name].astype(str).astype('category')
+    return df, y
+
+
+def encoder_categories(preprocessor):
+    """{feature: fitted categories} from the ColumnTransformer's one-hot step"""
+    ohe = preprocessor.named_transformers_['cat']
+    columns = preprocessor.transformers_[0][2]
+    return dict(zip(columns, ohe.categories_))
+
+
+def align_to_encoder(X, preprocessor):
+    """Cast each feature column to the dtype its categories were fitted with
+
+    Numbers fitted as text (the notebook's District '12.0') are matched by
+    value, so crime_table's 12 encodes as '12.0' rather than as unknown.
+    """
+    X = X[CATEGORICAL_FEATURES].copy()
+    for name, categories in encoder_categories(preprocessor).items():
+        if categories.dtype.kind in 'iuf':
+            X[name] = pd.to_numeric(X[name]).astype(categories.dtype)
+            continue
+        X[name] = X[name].astype(str)
+        by_number = pd.Series(categories, index=pd.to_numeric(pd.Series(categories), errors='coerce'))
+        by_number = by_number[by_number.index.notna() & ~by_number.index.duplicated()]
+        if not len(by_number):
+            continue
+        unmatched = ~X[name].isin(categories)
+        if unmatched.any():
+            numbers = pd.to_numeric(X.loc[unmatched, name], errors='coerce')
+            X.loc[unmatched, name] = numbers.map(by_number).fillna(X.loc[unmatched, name])
+    return X
+
+
+def records_frame(records, preprocessor):
+    """Encoder-ready frame of input records ({feature: value}), for every serving path"""
+    return align_to_encoder(pd.DataFrame(records, columns=CATEGORICAL_FEATURES), preprocessor)
+
+
+def split_holdout(X, y):
+    """The notebook's 80/20 split, so held-out rows match the ones it evaluated on"""
+    return train_test_split(X, y, test_size=TEST_SIZE, random_state=RANDOM_STATE,
+                            stratify=y['Crime Category'])
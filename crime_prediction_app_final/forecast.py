@@ -0,0 +1,179 @@
+# forecast.py
+# Next-week incident volume per District, weekday and hour.
+#
+# crime_table records each incident's weekday and hour but no date, so there
+# is no dated hourly series to extrapolate; what it does support is each
+# district's weekly seasonal profile. history() builds the District x
+# DayOfWeek x HourofDay count cube with one GROUP BY, split into older and
+# newer rows by rowid (rows are appended in time order).
+#
+# fit() models all districts at once, vectorized along the district axis.
+# Each of a district's 168 weekly slots gets a share of its weekly volume:
+# the slot's observed share, shrunk toward the district's weekday profile x
+# hour profile (themselves shrunk toward the city's). Both shrinkage
+# strengths are chosen per district, from SMOOTHING_GRID x PROFILE_GRID, by
+# the likelihood of the newer rows under a fit on the older ones. Sparse
+# districts lean on the smooth profile; busy ones keep their own peaks. Expected counts are share x weekly
+# volume, and weekly volume is the district's rows / FORECAST_DATA_WEEKS.
+#
+# Rows written by /predict (case numbers 'JK......') are hypothetical inputs,
+# not incidents, so every query here skips them, as features.py does for
+# training. Forecaster caches the fitted forecast keyed on the row count and
+# max rowid of the remaining rows, so /forecast refits only after incidents
+# are loaded or deleted - not after every /predict.
+#
+# Usage (backtest on the newest rows, then print the busiest slots):
+#   python forecast.py
+import argparse
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from config import DB_PATH, TABLE_NAME, FORECAST_DATA_WEEKS
+
+DAYS, HOURS = 7, 24
+# Pseudo-counts pulling a slot's share toward its district's smooth profile
+SMOOTHING_GRID = np.array([1, 4, 16, 64, 256, 1024, 4096, 16384], dtype=np.float64)
+# Pseudo-counts pulling a district's weekday / hour profile toward the city's
+PROFILE_GRID = np.array([4, 24, 96, 384, 1536, 6144], dtype=np.float64)
+HOLDOUT_FRACTION = 0.2
+# Leaves out the rows /predict writes
+INCIDENTS = '"Case Number" NOT LIKE \'JK%\''
+
+
+def history(conn, holdout_fraction=HOLDOUT_FRACTION):
+    """(districts, counts) where counts is (n_districts, 2, 7, 24): older and newer rows"""
+    total = conn.execute(f'SELECT COUNT(*) FROM "{TABLE_NAME}" WHERE {INCIDENTS}').fetchone()[0]
+    cutoff = conn.execute(f'SELECT rowid FROM "{TABLE_NAME}" WHERE {INCIDENTS} '
+                          f'ORDER BY rowid LIMIT 1 OFFSET ?',
+                          (int(total * (1 - holdout_fraction)),)).fetchone()
+    cutoff = cutoff[0] if cutoff else 0
+    rows = np.array(conn.execute(f'''
+        SELECT CAST("District" AS INTEGER), rowid >= ?, "DayOfWeek", "HourofDay", COUNT(*)
+        FROM "{TABLE_NAME}"
+        WHERE {INCIDENTS} AND "District" IS NOT NULL
+          AND "DayOfWeek" BETWEEN 0 AND 6 AND "HourofDay" BETWEEN 0 AND 23
+        GROUP BY 1, 2, 3, 4''', (cutoff,)).fetchall(), dtype=np.int64).reshape(-1, 5)
+    districts, index = np.unique(rows[:, 0], return_inverse=True)
+    counts = np.zeros((len(districts), 2, DAYS, HOURS))
+    np.add.at(counts, (index, rows[:, 1], rows[:, 2], rows[:, 3]), rows[:, 4])
+    return districts, counts
+
+
+def _profile(counts, strength):
+    """Smooth (n_districts, 7, 24) prior: weekday share x hour share, each shrunk to the city's
+
+    strength broadcasts as (n_districts, 1).
+    """
+    n = counts.sum(axis=(1, 2))[:, None]
+    city_days = counts.sum(axis=(0, 2)) + 1
+    city_hours = counts.sum(axis=(0, 1)) + 1
+    days = (counts.sum(axis=2) + strength * city_days / city_days.sum()) / (n + strength)
+    hours = (counts.sum(axis=1) + strength * city_hours / city_hours.sum()) / (n + strength)
+    return days[:, :, None] * hours[:, None, :]
+
+
+def _shares(counts, smoothing, strength):
+    """Slot shares for per-district smoothing / profile strengths (scalars or (n_districts,))"""
+    smoothing = np.broadcast_to(smoothing, len(counts))[:, None, None]
+    strength = np.broadcast_to(strength, len(counts))[:, None]
+    n = counts.sum(axis=(1, 2))[:, None, None]
+    return (counts + smoothing * _profile(counts, strength)) / (n + smoothing)
+
+
+def _log_loss(shares, counts):
+    """Mean negative log-likelihood per incident of counts under shares, per district"""
+    n = np.maximum(counts.sum(axis=(1, 2)), 1)
+    return -(counts * np.log(shares)).sum(axis=(1, 2)) / n
+
+
+def fit(districts, counts, data_weeks=FORECAST_DATA_WEEKS):
+    """Per-district smoothing by holdout likelihood, refit on all rows; returns the forecast dict"""
+    older, newer = counts[:, 0], counts[:, 1]
+    # (grid, n_districts) holdout loss for every strength pair at once
+    grid = [(k, m) for k in SMOOTHING_GRID for m in PROFILE_GRID]
+    losses = np.stack([_log_loss(_shares(older, k, m), newer) for k, m in grid])
+    best = losses.argmin(axis=0)
+    smoothing = np.array([grid[b][0] for b in best])
+    strength = np.array([grid[b][1] for b in best])
+
+    everything = counts.sum(axis=1)
+    shares = _shares(everything, smoothing, strength)
+    weekly = everything.sum(axis=(1, 2)) / data_weeks
+    expected = shares * weekly[:, None, None]
+
+    # Backtest summary: model vs. a flat week and vs. each district's raw shares
+    held_out = newer.sum(axis=(1, 2))
+    weights = held_out / max(held_out.sum(), 1)
+    uniform = np.full_like(older, 1 / (DAYS * HOURS))
+    backtest = {
+        'holdout_incidents': int(held_out.sum()),
+        'log_loss': round(float(weights @ losses[best, np.arange(len(districts))]), 4),
+        'log_loss_uniform': round(float(weights @ _log_loss(uniform, newer)), 4),
+        'log_loss_unsmoothed': round(float(weights @ _log_loss(
+            _shares(older, SMOOTHING_GRID[0], PROFILE_GRID[0]), newer)), 4)
+    }
+
+    forecast = {}
+    for d, district in enumerate(districts.tolist()):
+        peak = np.argsort(expected[d], axis=None)[::-1][:5]
+        forecast[district] = {
+            'weekly_total': round(float(weekly[d]), 2),
+            'smoothing': [float(smoothing[d]), float(strength[d])],
+            'expected': np.round(expected[d], 3).tolist(),
+            'peaks': [{'DayOfWeek': int(slot // HOURS), 'HourofDay': int(slot % HOURS),
+                       'expected': round(float(expected[d].flat[slot]), 3)} for slot in peak]
+        }
+    return {'districts': forecast, 'backtest': backtest, 'data_weeks': data_weeks}
+
+
+class Forecaster:
+    """Fitted forecast cached until crime_table's incident rows change"""
+
+    def __init__(self, db_path=DB_PATH, data_weeks=FORECAST_DATA_WEEKS):
+        self.db_path = db_path
+        self.data_weeks = data_weeks
+        self._lock = threading.Lock()
+        self._key = None
+        self._forecast = None
+
+    def get(self):
+        """(forecast, cached)"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            key = conn.execute(f'SELECT COUNT(*), MAX(rowid) FROM "{TABLE_NAME}" WHERE {INCIDENTS}').fetchone()
+            with self._lock:
+                if key == self._key:
+                    return self._forecast, True
+                start = time.perf_counter()
+                forecast = fit(*history(conn), self.data_weeks)
+                forecast['fit_seconds'] = round(time.perf_counter() - start, 4)
+                forecast['rows'], forecast['max_rowid'] = key
+                self._key, self._forecast = key, forecast
+                return forecast, False
+        finally:
+            conn.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Backtest and print next-week incident forecasts per District")
+    parser.add_argument('--db', default=DB_PATH)
+    parser.add_argument('--data-weeks', type=float, default=FORECAST_DATA_WEEKS,
+                        help="weeks of incidents crime_table covers (it stores no dates)")
+    parser.add_argument('--top', type=int, default=3, help="busiest slots to print per district")
+    args = parser.parse_args()
+
+    forecast, _ = Forecaster(args.db, args.data_weeks).get()
+    backtest = forecast['backtest']
+    print(f"📊 Fitted {len(forecast['districts'])} districts on {forecast['rows']:,} rows "
+          f"in {forecast['fit_seconds'] * 1000:.1f} ms")
+    print(f"   Holdout log loss per incident ({backtest['holdout_incidents']:,} newest rows): "
+          f"model {backtest['log_loss']:.4f}, unsmoothed {backtest['log_loss_unsmoothed']:.4f}, "
+          f"flat week {backtest['log_loss_uniform']:.4f}")
+    for district, result in forecast['districts'].items():
+        peaks = ', '.join(f"day {p['DayOfWeek']} {p['HourofDay']:02d}h: {p['expected']:.1f}"
+                          for p in result['peaks'][:args.top])
+        print(f"   District {district:>2}: {result['weekly_total']:7.1f}/week "
+              f"(smoothing {result['smoothing'][0]:g}/{result['smoothing'][1]:g}) | {peaks}")
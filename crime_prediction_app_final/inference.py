@@ -0,0 +1,105 @@
+# inference.py
+# Single-pass forest inference.
+#
+# RandomForestClassifier.predict() is argmax(predict_proba()), so asking the
+# model for labels and then for probabilities walks all 400 trees twice. Here
+# each target's forest is traversed once for its class probabilities and the
+# labels are derived from those.
+import numpy as np
+from sklearn.isotonic import IsotonicRegression
+
+
+def forest_proba(model, X):
+    """Per-target class probabilities, one forest traversal each"""
+    return [estimator.predict_proba(X) for estimator in model.estimators_]
+
+
+def labels_from_proba(model, probas):
+    """Same labels model.predict() would return, shape (n_samples, n_targets)"""
+    return np.column_stack([
+        estimator.classes_.take(np.argmax(proba, axis=1), axis=0)
+        for estimator, proba in zip(model.estimators_, probas)
+    ])
+
+
+def fit_calibration(model, probas, y):
+    """One-vs-rest isotonic maps per target and class, fitted on held-out rows"""
+    y = np.asarray(y)
+    calibration = []
+    for t, (estimator, proba) in enumerate(zip(model.estimators_, probas)):
+        maps = []
+        for k, label in enumerate(estimator.classes_):
+            iso = IsotonicRegression(y_min=0.0, y_max=1.0, out_of_bounds='clip')
+            iso.fit(proba[:, k], (y[:, t] == label).astype(float))
+            maps.append(iso)
+        calibration.append(maps)
+    return calibration
+
+
+def calibrate(probas, calibration):
+    """Apply fitted maps and renormalise each row to sum to 1"""
+    calibrated = []
+    for proba, maps in zip(probas, calibration):
+        mapped = np.column_stack([iso.predict(proba[:, k]) for k, iso in enumerate(maps)])
+        totals = mapped.sum(axis=1, keepdims=True)
+        # Rows where every map clipped to 0 keep the raw forest votes
+        mapped = np.where(totals > 0, mapped / np.where(totals > 0, totals, 1), proba)
+        calibrated.append(mapped)
+    return calibrated
+
+
+def predict_with_proba(model, X, calibration=None):
+    """(labels, probas) from one traversal; labels follow the returned probabilities"""
+    probas = forest_proba(model, X)
+    if calibration is not None:
+        probas = calibrate(probas, calibration)
+    return labels_from_proba(model, probas), probas
+
+
+def top_k(proba_row, classes, k=3):
+    """[(class, probability)] for the k most likely classes, best first"""
+    order = np.argsort(proba_row)[::-1][:k]
+    return [(classes[i], float(proba_row[i])) for i in order]
+
+
+def feature_index(preprocessor):
+    """{feature: {category as str: output column}} for the fitted one-hot step
+
+    Categories dropped by drop='first', and unknown ones, have no column -
+    the same all-zero encoding preprocessor.transform produces for them.
+    """
+    ohe = preprocessor.named_transformers_['cat']
+    columns = preprocessor.transformers_[0][2]
+    drop_idx = ohe.drop_idx_ if ohe.drop_idx_ is not None else [None] * len(columns)
+    index = {}
+    offset = 0
+    for name, categories, dropped in zip(columns, ohe.categories_, drop_idx):
+        mapping = {}
+        for i, category in enumerate(categories):
+            if dropped is not None and i == dropped:
+                continue
+            mapping[str(category)] = offset
+            offset += 1
+        index[name] = mapping
+    return index
+
+
+def student_predict(student, record):
+    """(labels, probas) from the distilled linear student for one raw input record
+
+    Works straight from the request values: the active one-hot columns are
+    looked up in the student's feature index and their weights summed, so
+    neither pandas nor the ColumnTransformer is touched.
+    """
+    index = student['feature_index']
+    # The index is keyed by str(category), whatever type the category was fitted as
+    active = [index[name][str(value)] for name, value in record.items()
+              if name in index and str(value) in index[name]]
+    labels, probas = [], []
+    for target in student['targets']:
+        logits = target['intercept'] + target['coef'][:, active].sum(axis=1)
+        proba = np.exp(logits - logits.max())
+        proba /= proba.sum()
+        labels.append(target['classes'][proba.argmax()])
+        probas.append(proba[None, :])
+    return np.array([labels]), probas
@@ -0,0 +1,180 @@
+# onnx_model.py
+# ONNX export of the full serving pipeline and an onnxruntime CPU backend.
+#
+# The export converts the ColumnTransformer's one-hot step and both target
+# forests into one ONNX graph (skl2onnx): its inputs are the eight raw string
+# features, its outputs the labels and one probability tensor per target.
+# Serving it needs only onnxruntime - no pickled sklearn objects and no
+# particular sklearn version. A sidecar .json records the class labels and
+# the signature of the model it was exported from.
+#
+# With MODEL_BACKEND=onnx, /predict's forest path runs through OnnxPipeline
+# (ONNX_INTRA_OP_THREADS threads per call).
+#
+# Usage:
+#   python onnx_model.py                     # export, then check parity / latency
+#   python onnx_model.py --skip-export --max-rows 20000
+import argparse
+import json
+import os
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from config import (MODEL_PATH, PREPROCESSOR_PATH, ENCODER_PATH, ONNX_MODEL_PATH,
+                    CATEGORICAL_FEATURES, TARGETS)
+from features import encoder_categories
+from inference import calibrate
+from prediction_table import model_signature
+
+try:
+    import onnxruntime as ort
+except ImportError:
+    ort = None
+
+TARGET_OPSET = 15
+LATENCY_RUNS = 200
+
+
+def _meta_path(path):
+    return os.path.splitext(path)[0] + '.json'
+
+
+def export(model, preprocessor, path=ONNX_MODEL_PATH):
+    """Convert preprocessor + multi-target forest into one ONNX graph"""
+    from sklearn.pipeline import Pipeline
+    from skl2onnx import convert_sklearn
+    from skl2onnx.common.data_types import Int64TensorType, StringTensorType
+
+    categories = encoder_categories(preprocessor)
+    initial_types = [
+        (name, Int64TensorType([None, 1]) if categories[name].dtype.kind in 'iu'
+         else StringTensorType([None, 1]))
+        for name in CATEGORICAL_FEATURES
+    ]
+    pipeline = Pipeline([('preprocessor', preprocessor), ('model', model)])
+    # Probabilities come out as one tensor per target; zipmap does not apply
+    onx = convert_sklearn(pipeline, initial_types=initial_types, target_opset=TARGET_OPSET,
+                          options={id(model): {'zipmap': False}})
+    with open(path, 'wb') as f:
+        f.write(onx.SerializeToString())
+    with open(_meta_path(path), 'w') as f:
+        json.dump({
+            'classes': [estimator.classes_.tolist() for estimator in model.estimators_],
+            'model_signature': model_signature(),
+            'exported_at': pd.Timestamp.now().isoformat()
+        }, f)
+
+
+class OnnxPipeline:
+    """onnxruntime session over the exported graph, answering like predict_with_proba"""
+
+    def __init__(self, path=ONNX_MODEL_PATH, intra_op_threads=1):
+        if ort is None:
+            raise RuntimeError("onnxruntime is not installed")
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = intra_op_threads
+        options.inter_op_num_threads = 1
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(path, sess_options=options,
+                                            providers=['CPUExecutionProvider'])
+        with open(_meta_path(path)) as f:
+            self.meta = json.load(f)
+        self.classes = [np.array(c) for c in self.meta['classes']]
+        # skl2onnx sanitizes input names ('Primary Type' -> 'Primary_Type'); they
+        # keep the order of CATEGORICAL_FEATURES they were declared in
+        self.inputs = [(name, i.name, i.type)
+                       for name, i in zip(CATEGORICAL_FEATURES, self.session.get_inputs())]
+        # Outputs are (labels, probabilities); labels are re-derived after calibration
+        self.proba_output = self.session.get_outputs()[-1].name
+
+    def predict(self, frame, calibration=None):
+        """(labels, probas) for a DataFrame of raw feature values"""
+        feeds = {}
+        for name, input_name, typ in self.inputs:
+            column = frame[name].to_numpy()
+            column = column.astype(np.int64) if typ == 'tensor(int64)' else column.astype(str).astype(object)
+            feeds[input_name] = column.reshape(-1, 1)
+        probas = [np.asarray(p, dtype=np.float64)
+                  for p in self.session.run([self.proba_output], feeds)[0]]
+        if calibration is not None:
+            probas = calibrate(probas, calibration)
+        labels = np.column_stack([classes.take(proba.argmax(axis=1))
+                                  for classes, proba in zip(self.classes, probas)])
+        return labels, probas
+
+
+def load_pipeline(path=ONNX_MODEL_PATH, intra_op_threads=1):
+    """The ONNX backend if it exists and matches the current model, else None"""
+    if not os.path.exists(path):
+        print(f"⚠️ {path} not found; run onnx_model.py to export it")
+        return None
+    pipeline = OnnxPipeline(path, intra_op_threads)
+    if pipeline.meta.get('model_signature') != model_signature():
+        print("⚠️ ONNX export is stale for the current model; ignoring it")
+        return None
+    return pipeline
+
+
+def _single_row_ms(func, rows):
+    timings = []
+    for i in range(LATENCY_RUNS):
+        start = time.perf_counter()
+        func(rows.iloc[[i % len(rows)]])
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings) * 1000)
+
+
+if __name__ == '__main__':
+    from features import TRAINING_CSV, load_labeled_frame, align_to_encoder, split_holdout
+    from inference import predict_with_proba
+
+    parser = argparse.ArgumentParser(description="Export the pipeline to ONNX and compare it with sklearn")
+    parser.add_argument('--data', default=TRAINING_CSV,
+                        help="training CSV or SQLite database with crime_table, for the parity check")
+    parser.add_argument('--max-rows', type=int, default=20000)
+    parser.add_argument('--threads', type=int, default=1, help="onnxruntime intra-op threads")
+    parser.add_argument('--skip-export', action='store_true')
+    parser.add_argument('--output', default=ONNX_MODEL_PATH)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    model = joblib.load(MODEL_PATH)
+    preprocessor = joblib.load(PREPROCESSOR_PATH)
+    sklearn_load = time.perf_counter() - start
+    if not args.skip_export:
+        export(model, preprocessor, args.output)
+        print(f"✅ Exported {args.output} ({os.path.getsize(args.output) / 1e6:.1f} MB)")
+
+    start = time.perf_counter()
+    onnx_pipeline = OnnxPipeline(args.output, args.threads)
+    onnx_load = time.perf_counter() - start
+    print(f"📦 Load time: sklearn pickles {sklearn_load:.2f}s, ONNX session {onnx_load:.2f}s")
+
+    df = load_labeled_frame(args.data, joblib.load(ENCODER_PATH))
+    X = align_to_encoder(df, preprocessor)
+    _, X_test, _, y_test = split_holdout(X, df[TARGETS])
+    X_test, y_test = X_test[:args.max_rows], y_test.to_numpy()[:args.max_rows]
+
+    def sklearn_path(frame):
+        return predict_with_proba(model, preprocessor.transform(frame))
+
+    start = time.perf_counter()
+    expected, expected_probas = sklearn_path(X_test)
+    sklearn_batch = time.perf_counter() - start
+    start = time.perf_counter()
+    actual, actual_probas = onnx_pipeline.predict(X_test)
+    onnx_batch = time.perf_counter() - start
+
+    for t, target in enumerate(TARGETS):
+        print(f"=== {target} === agreement: {np.mean(actual[:, t] == expected[:, t]):.4f}, "
+              f"max |Δp|: {np.abs(actual_probas[t] - expected_probas[t]).max():.2e}, "
+              f"accuracy: {np.mean(expected[:, t] == y_test[:, t]):.4f} -> "
+              f"{np.mean(actual[:, t] == y_test[:, t]):.4f}")
+    print(f"⚡ Single row: sklearn {_single_row_ms(sklearn_path, X_test):.2f} ms, "
+          f"ONNX {_single_row_ms(onnx_pipeline.predict, X_test):.2f} ms")
+    print(f"⚡ Batch: sklearn {sklearn_batch / len(X_test) * 1e6:.1f} µs, "
+          f"ONNX {onnx_batch / len(X_test) * 1e6:.1f} µs per row")
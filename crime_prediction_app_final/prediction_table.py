@@ -0,0 +1,288 @@
+# prediction_table.py
+# Precomputed forest answers for the most common /predict inputs.
+#
+# The input space is finite (eight categorical fields), and most requests hit
+# a small, frequent part of it. This job enumerates the top-N combinations
+# seen in crime_table (or the full cartesian space of the fitted categories),
+# scores them with the forest in parallel chunks, and writes an open-addressing
+# hash table as one .npy file. /predict memory-maps it and answers a hit with
+# one or two array probes instead of running the model.
+#
+# Usage:
+#   python prediction_table.py --top 1000000
+#   python prediction_table.py --full --max-combinations 50000000
+#   python prediction_table.py --backend quantized
+#
+# Combinations go through the same InputValidator and records_frame() as
+# /predict, so keys and encodings match what a request produces, and
+# probabilities are stored as float32 so a hit returns the forest's answer to
+# /predict's four decimals. Combinations are scored by the serving backend
+# (--backend, MODEL_BACKEND by default), so a hit answers like the model that
+# serves misses. The table records that backend and a signature of the
+# model, preprocessor, encoder, calibration and backend artifact it was built
+# from; the app ignores it when it serves another backend or once any of
+# them changes.
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import sqlite3
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from config import (DB_PATH, TABLE_NAME, MODEL_PATH, PREPROCESSOR_PATH, ENCODER_PATH,
+                    CALIBRATION_PATH, PREDICTION_TABLE_PATH, CATEGORICAL_FEATURES,
+                    QUANTIZED_MODEL_PATH, ONNX_MODEL_PATH, MODEL_BACKEND)
+from features import encoder_categories, records_frame
+from inference import predict_with_proba
+from risk_grid import day_or_night
+from validation import InputValidator
+
+CHUNK_SIZE = 50000
+EMPTY_KEY = 0
+# Artifacts each serving backend answers from besides the sklearn pickles
+BACKEND_PATHS = {'sklearn': (), 'quantized': (QUANTIZED_MODEL_PATH,), 'onnx': (ONNX_MODEL_PATH,)}
+
+_worker = {}
+
+
+def record_key(record):
+    """Stable 64-bit key for one input record ({feature: category}, compared as str)"""
+    text = '\x1f'.join(str(record[name]) for name in CATEGORICAL_FEATURES)
+    key = int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), 'little')
+    return key or 1
+
+
+def model_signature(extra_paths=()):
+    """Changes whenever the model, preprocessor, encoder, calibration or an extra artifact is replaced"""
+    parts = []
+    for path in (MODEL_PATH, PREPROCESSOR_PATH, ENCODER_PATH, CALIBRATION_PATH, *extra_paths):
+        if os.path.exists(path):
+            stat = os.stat(path)
+            parts.append(f"{os.path.basename(path)}:{stat.st_size}:{int(stat.st_mtime)}")
+    return '|'.join(parts)
+
+
+def _table_dtype(n_arrest, n_category):
+    return np.dtype([
+        ('key', '<u8'),
+        ('arrest', 'u1'),
+        ('category', 'u1'),
+        ('arrest_proba', '<f4', (n_arrest,)),
+        ('category_proba', '<f4', (n_category,))
+    ])
+
+
+def build_hash_table(rows):
+    """Place scored rows into a power-of-two open-addressing table (linear probing)"""
+    capacity = 1 << max(4, int(np.ceil(np.log2(max(len(rows), 1) * 2))))
+    mask = np.uint64(capacity - 1)
+    table = np.zeros(capacity, dtype=rows.dtype)
+
+    pending = np.arange(len(rows))
+    probe = np.zeros(len(rows), dtype=np.uint64)
+    while pending.size:
+        slots = ((rows['key'][pending] + probe[pending]) & mask).astype(np.int64)
+        free = table['key'][slots] == EMPTY_KEY
+        # First claimant wins each free slot; the rest probe further
+        _, first = np.unique(slots[free], return_index=True)
+        winners = pending[free][first]
+        table[slots[free][first]] = rows[winners]
+        placed = np.zeros(len(rows), dtype=bool)
+        placed[winners] = True
+        pending = pending[~placed[pending]]
+        probe[pending] += np.uint64(1)
+    return table
+
+
+class PredictionTable:
+    """Memory-mapped lookup of precomputed (labels, probas) by input record"""
+
+    def __init__(self, path):
+        self.table = np.load(path, mmap_mode='r')
+        self.mask = len(self.table) - 1
+        with open(os.path.splitext(path)[0] + '.json') as f:
+            self.meta = json.load(f)
+        self.classes = [np.array(c) for c in self.meta['classes']]
+
+    def lookup(self, record):
+        """(labels, probas) shaped like predict_with_proba's output, or None on a miss"""
+        key = record_key(record)
+        slot = key & self.mask
+        while True:
+            entry = self.table[slot]
+            stored = int(entry['key'])
+            if stored == key:
+                labels = np.array([[self.classes[0][entry['arrest']],
+                                    self.classes[1][entry['category']]]])
+                probas = [entry['arrest_proba'].astype(np.float64)[None, :],
+                          entry['category_proba'].astype(np.float64)[None, :]]
+                return labels, probas
+            if stored == EMPTY_KEY:
+                return None
+            slot = (slot + 1) & self.mask
+
+
+def load_table(path=PREDICTION_TABLE_PATH, backend=MODEL_BACKEND):
+    """The table if it exists and was built by `backend` from the current model, else None"""
+    if not os.path.exists(path):
+        return None
+    table = PredictionTable(path)
+    built_by = table.meta.get('backend', 'sklearn')
+    if built_by != backend:
+        print(f"⚠️ Prediction table was built with the {built_by} backend, not {backend}; ignoring it")
+        return None
+    if table.meta.get('model_signature') != model_signature(BACKEND_PATHS[backend]):
+        print("⚠️ Prediction table is stale for the current model; ignoring it")
+        return None
+    return table
+
+
+def frequent_combinations(preprocessor, top, db_path=DB_PATH):
+    """The `top` most frequent crime_table inputs, normalized as /predict normalizes them
+
+    Rows the validator rejects are skipped, and raw spellings of one input
+    (e.g. District 12 and 12.0) collapse into a single combination.
+    """
+    validator = InputValidator(encoder_categories(preprocessor))
+    quoted = ', '.join(f'"{c}"' for c in CATEGORICAL_FEATURES)
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute(
+            f'SELECT {quoted} FROM "{TABLE_NAME}" GROUP BY {quoted} '
+            f'ORDER BY COUNT(*) DESC LIMIT ?', (top,)).fetchall()
+    finally:
+        conn.close()
+    combos = {}
+    for row in rows:
+        record, errors = validator.validate(dict(zip(CATEGORICAL_FEATURES, row)))
+        if not errors:
+            combos.setdefault(tuple(record[name] for name in CATEGORICAL_FEATURES), None)
+    return list(combos)
+
+
+def full_combinations(preprocessor, limit):
+    """Every combination of fitted categories, with DayorNight derived from the hour"""
+    categories = encoder_categories(preprocessor)
+    fields = [name for name in CATEGORICAL_FEATURES if name != 'DayorNight']
+    values = [categories[name].tolist() for name in fields]
+    total = int(np.prod([len(v) for v in values], dtype=np.float64))
+    if total > limit:
+        raise ValueError(f"Full space has {total:,} combinations (limit {limit:,}); use --top")
+
+    night_at = CATEGORICAL_FEATURES.index('DayorNight')
+    for combo in itertools.product(*values):
+        hour = int(float(combo[fields.index('HourofDay')]))
+        combo = list(combo)
+        combo.insert(night_at, day_or_night(hour))
+        yield tuple(combo)
+
+
+def _init_worker(backend):
+    _worker['backend'] = backend
+    _worker['preprocessor'] = joblib.load(PREPROCESSOR_PATH)
+    _worker['calibration'] = (joblib.load(CALIBRATION_PATH)
+                              if os.path.exists(CALIBRATION_PATH) else None)
+    # The forest /predict serves misses with (see app.py)
+    if backend == 'onnx':
+        from onnx_model import OnnxPipeline
+        _worker['model'] = OnnxPipeline(ONNX_MODEL_PATH)
+    elif backend == 'quantized':
+        _worker['model'] = joblib.load(QUANTIZED_MODEL_PATH, mmap_mode='r')
+    else:
+        _worker['model'] = joblib.load(MODEL_PATH)
+
+
+def _score_chunk(combos):
+    records = [dict(zip(CATEGORICAL_FEATURES, combo)) for combo in combos]
+    frame = records_frame(records, _worker['preprocessor'])
+    if _worker['backend'] == 'onnx':
+        labels, probas = _worker['model'].predict(frame, _worker['calibration'])
+    else:
+        X = _worker['preprocessor'].transform(frame)
+        labels, probas = predict_with_proba(_worker['model'], X, _worker['calibration'])
+    keys = np.array([record_key(record) for record in records], dtype=np.uint64)
+    return keys, labels, probas
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _score_all(pool, chunks, in_flight):
+    """pool.map that keeps at most `in_flight` chunks materialised at once"""
+    pending = deque()
+    for chunk in chunks:
+        pending.append(pool.submit(_score_chunk, chunk))
+        if len(pending) >= in_flight:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Precompute forest answers for common inputs")
+    parser.add_argument('--top', type=int, default=1000000,
+                        help="most frequent input combinations in crime_table to score")
+    parser.add_argument('--full', action='store_true',
+                        help="score the full cartesian space of fitted categories")
+    parser.add_argument('--max-combinations', type=int, default=50000000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--backend', choices=sorted(BACKEND_PATHS), default=MODEL_BACKEND,
+                        help="serving backend that scores the combinations (default: MODEL_BACKEND)")
+    parser.add_argument('--output', default=PREDICTION_TABLE_PATH)
+    args = parser.parse_args()
+
+    start = time.time()
+    model = joblib.load(MODEL_PATH)
+    classes = [estimator.classes_ for estimator in model.estimators_]
+    if args.full:
+        combos = full_combinations(joblib.load(PREPROCESSOR_PATH), args.max_combinations)
+    else:
+        combos = frequent_combinations(joblib.load(PREPROCESSOR_PATH), args.top)
+    del model
+
+    keys, labels, arrest_proba, category_proba = [], [], [], []
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                             initargs=(args.backend,)) as pool:
+        for chunk_keys, chunk_labels, chunk_probas in _score_all(pool, _chunks(combos, CHUNK_SIZE), 2 * args.workers):
+            keys.append(chunk_keys)
+            labels.append(chunk_labels)
+            arrest_proba.append(chunk_probas[0])
+            category_proba.append(chunk_probas[1])
+            print(f"🧮 Scored {sum(len(k) for k in keys):,} combinations...")
+
+    if not keys:
+        raise SystemExit("❌ No combinations to score")
+    labels = np.vstack(labels)
+    rows = np.zeros(sum(len(k) for k in keys), dtype=_table_dtype(len(classes[0]), len(classes[1])))
+    rows['key'] = np.concatenate(keys)
+    rows['arrest'] = np.searchsorted(classes[0], labels[:, 0])
+    rows['category'] = np.searchsorted(classes[1], labels[:, 1])
+    rows['arrest_proba'] = np.vstack(arrest_proba)
+    rows['category_proba'] = np.vstack(category_proba)
+
+    table = build_hash_table(rows)
+    np.save(args.output, table)
+    with open(os.path.splitext(args.output)[0] + '.json', 'w') as f:
+        json.dump({
+            'backend': args.backend,
+            'model_signature': model_signature(BACKEND_PATHS[args.backend]),
+            'classes': [c.tolist() for c in classes],
+            'entries': len(rows),
+            'capacity': len(table),
+            'built_at': pd.Timestamp.now().isoformat()
+        }, f)
+    print(f"✅ Saved {len(rows):,} entries to {args.output} "
+          f"({table.nbytes / 1e6:.1f} MB) in {time.time() - start:.1f}s")
@@ -0,0 +1,180 @@
+# quantized_forest.py
+# Compact, quantized representation of the multi-target forest.
+#
+# Every input column is a 0/1 one-hot indicator, so every split threshold in
+# the forest is 0.5 and a split is just "is this bit set". The quantized form
+# keeps, per node, only the feature index (uint16) and one child offset
+# (int32): nodes are laid out breadth-first so the right child always sits
+# next to the left one, and a negative offset points into the leaf table.
+# Leaves store class probabilities as uint8 (probability * 255).
+#
+# Usage:
+#   python quantized_forest.py [--data crime_data_finalfortraining.csv]
+#
+# The saved artifact is loaded with joblib mmap_mode='r', so the node arrays
+# are memory-mapped rather than copied into each worker.
+import argparse
+import pickle
+import time
+
+import joblib
+import numpy as np
+import scipy.sparse as sp
+
+from config import MODEL_PATH, PREPROCESSOR_PATH, ENCODER_PATH, QUANTIZED_MODEL_PATH, TARGETS
+from features import TRAINING_CSV, load_labeled_frame, align_to_encoder, split_holdout
+
+LEAF_SCALE = 255
+CHUNK_ROWS = 4096
+
+
+def _layout_tree(tree):
+    """Breadth-first node order with siblings adjacent, as (order, new_id)"""
+    left, right = tree.children_left, tree.children_right
+    levels = []
+    level = np.array([0])
+    while level.size:
+        levels.append(level)
+        internal = level[left[level] != -1]
+        level = np.column_stack([left[internal], right[internal]]).ravel()
+    order = np.concatenate(levels)
+    new_id = np.empty(len(order), dtype=np.int64)
+    new_id[order] = np.arange(len(order))
+    return order, new_id
+
+
+class QuantizedForest:
+    """Bit-test / uint8-leaf copy of one fitted RandomForestClassifier"""
+
+    def __init__(self, forest):
+        self.classes_ = forest.classes_
+        n_features = forest.n_features_in_
+        feature_dtype = np.uint16 if n_features < 2 ** 16 else np.uint32
+
+        features, children, leaves, roots = [], [], [], []
+        node_offset = leaf_offset = 0
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            thresholds = tree.threshold[tree.children_left != -1]
+            if thresholds.size and not np.all((thresholds > 0) & (thresholds < 1)):
+                raise ValueError("Forest has splits on non-binary features; cannot quantize")
+
+            order, new_id = _layout_tree(tree)
+            is_leaf = tree.children_left[order] == -1
+            leaf_index = np.cumsum(is_leaf) - 1
+
+            child = np.empty(len(order), dtype=np.int32)
+            child[~is_leaf] = new_id[tree.children_left[order[~is_leaf]]] + node_offset
+            child[is_leaf] = -(leaf_index[is_leaf] + leaf_offset + 1)
+
+            value = tree.value[order[is_leaf], 0, :]
+            value = value / value.sum(axis=1, keepdims=True)
+
+            features.append(np.where(is_leaf, 0, tree.feature[order]).astype(feature_dtype))
+            children.append(child)
+            leaves.append(np.rint(value * LEAF_SCALE).astype(np.uint8))
+            roots.append(node_offset)
+            node_offset += len(order)
+            leaf_offset += int(is_leaf.sum())
+
+        self.features_ = np.concatenate(features)
+        self.children_ = np.concatenate(children)
+        self.leaf_values_ = np.concatenate(leaves)
+        self.roots_ = np.array(roots, dtype=np.int32)
+
+    @property
+    def nbytes(self):
+        return (self.features_.nbytes + self.children_.nbytes
+                + self.leaf_values_.nbytes + self.roots_.nbytes)
+
+    def _votes(self, bits):
+        """Summed uint8 leaf values for a dense (rows, n_features) bool chunk"""
+        n_rows, n_trees = bits.shape[0], len(self.roots_)
+        flat_bits = bits.ravel()
+        row_base = np.repeat(np.arange(n_rows) * bits.shape[1], n_trees)
+        nodes = np.tile(self.roots_, n_rows)
+        # Walk all (row, tree) pairs one level per step, dropping those at a leaf
+        active = np.arange(nodes.size)
+        while active.size:
+            current = nodes[active]
+            child = self.children_[current]
+            internal = child >= 0
+            active, current, child = active[internal], current[internal], child[internal]
+            go_right = flat_bits[row_base[active] + self.features_[current]]
+            nodes[active] = child + go_right
+        leaf = -self.children_[nodes] - 1
+        return self.leaf_values_[leaf].reshape(n_rows, n_trees, -1).sum(axis=1, dtype=np.int64)
+
+    def predict_proba(self, X):
+        n = X.shape[0]
+        proba = np.empty((n, len(self.classes_)))
+        scale = float(LEAF_SCALE * len(self.roots_))
+        for start in range(0, n, CHUNK_ROWS):
+            chunk = X[start:start + CHUNK_ROWS]
+            bits = (chunk.toarray() if sp.issparse(chunk) else np.asarray(chunk)) > 0.5
+            proba[start:start + CHUNK_ROWS] = self._votes(bits) / scale
+        return proba
+
+    def predict(self, X):
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1), axis=0)
+
+
+class QuantizedMultiOutputForest:
+    """Drop-in for the fitted MultiOutputClassifier: estimators_, predict, predict_proba"""
+
+    def __init__(self, model):
+        self.estimators_ = [QuantizedForest(forest) for forest in model.estimators_]
+
+    @property
+    def nbytes(self):
+        return sum(estimator.nbytes for estimator in self.estimators_)
+
+    def predict_proba(self, X):
+        return [estimator.predict_proba(X) for estimator in self.estimators_]
+
+    def predict(self, X):
+        return np.column_stack([estimator.predict(X) for estimator in self.estimators_])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Build the quantized forest artifact")
+    parser.add_argument('--data', default=TRAINING_CSV,
+                        help="training CSV or SQLite database with crime_table, for the parity check")
+    parser.add_argument('--max-rows', type=int, default=20000)
+    parser.add_argument('--output', default=QUANTIZED_MODEL_PATH)
+    args = parser.parse_args()
+
+    print("📦 Loading AI models...")
+    model = joblib.load(MODEL_PATH)
+    preprocessor = joblib.load(PREPROCESSOR_PATH)
+    encoder = joblib.load(ENCODER_PATH)
+
+    # Build through the module so the pickle references quantized_forest, not __main__
+    import quantized_forest
+    quantized = quantized_forest.QuantizedMultiOutputForest(model)
+    full_bytes = len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL))
+    print(f"🗜️  Model memory: {full_bytes / 1e6:.1f} MB -> {quantized.nbytes / 1e6:.1f} MB "
+          f"({full_bytes / quantized.nbytes:.1f}x smaller)")
+
+    df = load_labeled_frame(args.data, encoder)
+    X = align_to_encoder(df, preprocessor)
+    _, X_test, _, y_test = split_holdout(X, df[TARGETS])
+    X_test = preprocessor.transform(X_test[:args.max_rows])
+    y_test = y_test.to_numpy()[:args.max_rows]
+
+    start = time.perf_counter()
+    expected = model.predict(X_test)
+    sklearn_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    actual = quantized.predict(X_test)
+    quantized_seconds = time.perf_counter() - start
+
+    for t, target in enumerate(TARGETS):
+        print(f"=== {target} === agreement: {np.mean(actual[:, t] == expected[:, t]):.4f}, "
+              f"accuracy: {np.mean(expected[:, t] == y_test[:, t]):.4f} -> "
+              f"{np.mean(actual[:, t] == y_test[:, t]):.4f}")
+    print(f"⚡ Batch latency: {sklearn_seconds / len(y_test) * 1e6:.1f} -> "
+          f"{quantized_seconds / len(y_test) * 1e6:.1f} µs per row")
+
+    joblib.dump(quantized, args.output)
+    print(f"✅ Saved {args.output}")
@@ -0,0 +1,62 @@
+# risk_grid.py
+# District x HourofDay x DayOfWeek risk grid for one crime type.
+#
+# The 4,200 cells are encoded straight into one CSR matrix through the
+# fitted one-hot column index (no DataFrame, no ColumnTransformer) and scored
+# with a single forest call.
+import itertools
+
+import numpy as np
+import scipy.sparse as sp
+
+from inference import predict_with_proba
+
+HOURS = list(range(24))
+DAYS = list(range(7))
+
+
+def day_or_night(hour):
+    # Same rule as the training notebook: 6 AM to 6 PM is DAY
+    return 'DAY' if 6 <= hour <= 18 else 'NIGHT'
+
+
+def grid_matrix(index, fixed, districts, hours=HOURS, days=DAYS):
+    """CSR design matrix with one row per (district, hour, day) cell, in C order"""
+    n_columns = sum(len(mapping) for mapping in index.values())
+    cells = np.array(list(itertools.product(range(len(districts)), range(len(hours)),
+                                            range(len(days)))))
+
+    def lookup(name, values):
+        return np.array([index[name].get(str(v), -1) for v in values])
+
+    columns = [np.full(len(cells), index[name].get(str(value), -1))
+               for name, value in fixed.items()]
+    columns.append(lookup('District', districts)[cells[:, 0]])
+    columns.append(lookup('HourofDay', hours)[cells[:, 1]])
+    columns.append(lookup('DayorNight', [day_or_night(h) for h in hours])[cells[:, 1]])
+    columns.append(lookup('DayOfWeek', days)[cells[:, 2]])
+
+    # Dropped-first and unknown categories have no column (-1), as in the encoder
+    columns = np.sort(np.column_stack(columns), axis=1)
+    present = columns >= 0
+    indptr = np.concatenate([[0], np.cumsum(present.sum(axis=1))])
+    data = np.ones(int(present.sum()))
+    return sp.csr_matrix((data, columns[present], indptr), shape=(len(cells), n_columns))
+
+
+def score_grid(model, index, fixed, districts, risk_weights, calibration=None):
+    """Arrest probability, most likely category and expected severity per cell"""
+    X = grid_matrix(index, fixed, districts)
+    _, probas = predict_with_proba(model, X, calibration)
+
+    arrest_classes = list(model.estimators_[0].classes_)
+    arrest = probas[0][:, arrest_classes.index(1)] if 1 in arrest_classes else np.zeros(X.shape[0])
+    category_classes = model.estimators_[1].classes_
+    weights = np.array([risk_weights.get(int(c), 0.5) for c in category_classes])
+
+    return {
+        'shape': [len(districts), len(HOURS), len(DAYS)],
+        'arrest_probability': np.round(arrest, 3).tolist(),
+        'top_category': category_classes.take(probas[1].argmax(axis=1)).astype(int).tolist(),
+        'risk': np.round(probas[1] @ weights, 3).tolist()
+    }
@@ -0,0 +1,150 @@
+# serializers.py
+# Response serialization for the API: fast JSON, MessagePack and gzip.
+#
+# FastJSONProvider replaces Flask's JSON provider, so every jsonify() call
+# goes through it:
+#   - JSON is encoded compactly with orjson when installed (stdlib json
+#     otherwise), numpy scalars and arrays included - also under app.debug,
+#     which the app runs with; set app.json.compact = False for indented
+#     output;
+#   - a client sending "Accept: application/msgpack" gets MessagePack instead
+#     (when msgpack is installed), without any route knowing about it.
+# compress_response() is an after_request hook that gzips JSON / MessagePack
+# bodies above GZIP_THRESHOLD bytes for clients that accept gzip (q-values
+# parsed by static_assets.accepted_encodings, so "gzip;q=0" refuses it).
+#
+# Usage (benchmark of one /getData-style response):
+#   python serializers.py --rows 100000
+import argparse
+import gzip
+import json
+import time
+
+import numpy as np
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+
+from static_assets import accepted_encodings
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib json
+    orjson = None
+try:
+    import msgpack
+except ImportError:  # optional: JSON only
+    msgpack = None
+
+MSGPACK_TYPES = ('application/msgpack', 'application/x-msgpack', 'application/vnd.msgpack')
+GZIP_THRESHOLD = 1024
+GZIP_LEVEL = 5
+
+
+def _default(obj):
+    """numpy values and tuples-of-rows that neither encoder handles natively"""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"{type(obj).__name__} is not serializable")
+
+
+def dumps_json(obj):
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default,
+                            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, default=_default, separators=(',', ':')).encode()
+
+
+def dumps_msgpack(obj):
+    return msgpack.packb(obj, default=_default, use_bin_type=True)
+
+
+def wants_msgpack():
+    if msgpack is None:
+        return False
+    accept = request.accept_mimetypes
+    best = accept.best_match(('application/json',) + MSGPACK_TYPES, default='application/json')
+    return best in MSGPACK_TYPES
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson, with MessagePack content negotiation"""
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs:
+            kwargs.setdefault('default', _default)
+            return super().dumps(obj, **kwargs)
+        return dumps_json(obj).decode()
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        if wants_msgpack():
+            return self._app.response_class(dumps_msgpack(obj), mimetype='application/msgpack')
+        # Compact orjson even in debug mode; indented stdlib JSON only on explicit opt-in
+        if self.compact is False:
+            return super().response(obj)
+        return self._app.response_class(dumps_json(obj), mimetype=self.mimetype)
+
+
+def compress_response(response):
+    """after_request hook: gzip large API bodies for clients that accept it"""
+    if (response.direct_passthrough or response.is_streamed
+            or response.status_code < 200 or response.status_code in (204, 304)
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in ('application/json', 'application/msgpack')
+            or 'gzip' not in accepted_encodings(request.headers.get('Accept-Encoding', ''))):
+        return response
+    body = response.get_data()
+    if len(body) < GZIP_THRESHOLD:
+        return response
+    response.set_data(gzip.compress(body, compresslevel=GZIP_LEVEL))
+    response.headers['Content-Encoding'] = 'gzip'
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def _benchmark(name, encode, payload, runs):
+    start = time.process_time()
+    for _ in range(runs):
+        body = encode(payload)
+    encode_ms = (time.process_time() - start) / runs * 1000
+    start = time.process_time()
+    for _ in range(runs):
+        compressed = gzip.compress(body, compresslevel=GZIP_LEVEL)
+    gzip_ms = (time.process_time() - start) / runs * 1000
+    print(f"   {name:<14} {len(body) / 1e6:8.2f} MB  {encode_ms:8.1f} ms CPU | "
+          f"gzip {len(compressed) / 1e6:6.2f} MB  +{gzip_ms:6.1f} ms CPU")
+
+
+if __name__ == '__main__':
+    import sqlite3
+
+    from config import DB_PATH, TABLE_NAME
+
+    parser = argparse.ArgumentParser(description="Benchmark /getData-style response encodings")
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(DB_PATH)
+    conn.row_factory = sqlite3.Row
+    rows = [dict(row) for row in conn.execute(f'SELECT * FROM "{TABLE_NAME}" LIMIT ?', (args.rows,))]
+    conn.close()
+    if not rows:
+        raise SystemExit(f"❌ No rows in {DB_PATH}")
+    # Repeat the sample if the table is smaller than the requested response
+    rows = (rows * (args.rows // len(rows) + 1))[:args.rows]
+    payload = {'success': True, 'crimeRecords': rows, 'totalCrime': len(rows)}
+
+    print(f"📊 One response of {len(rows):,} rows (mean of {args.runs} runs):")
+    _benchmark('json (stdlib)', lambda obj: json.dumps(obj).encode(), payload, args.runs)
+    if orjson is not None:
+        _benchmark('orjson', dumps_json, payload, args.runs)
+    if msgpack is not None:
+        _benchmark('msgpack', dumps_msgpack, payload, args.runs)
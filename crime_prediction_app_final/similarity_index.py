@@ -0,0 +1,337 @@
+# similarity_index.py
+# Precomputed index of crime_table for "most similar incidents" (/similar).
+#
+# Each crime_table row is reduced to its eight feature codes - its position in
+# the preprocessor's fitted categories for every field, -1 for anything the
+# encoder never saw - stored field by field in one .npy file next to the row's
+# SQLite rowid. The app memory-maps it. A query turns the incoming record into
+# one small score table per field (1 for the same value, partial credit for an
+# hour within HOUR_BAND), so a row's similarity is a weighted sum of eight
+# array gathers, and one argpartition picks the top N. Rows are sorted by
+# SORT_FIELDS, so the query first scores only the contiguous range sharing
+# the record's District and Primary Type and widens to the whole index only
+# when that range cannot hold the exact top N. Only those N rows are then
+# read from SQLite, by rowid.
+#
+# Only recorded incidents are indexed: rows written by /predict (case numbers
+# 'JK......') are the user's own hypothetical inputs, which would otherwise
+# come back as their own best match. Incidents inserted after the build
+# (load_dataset.py, other loaders) are appended to an in-memory tail:
+# catch_up() reads the rows above the index's rowid watermark, and the app
+# calls it before each query. The watermark is the table's MAX(rowid) as
+# scanned, not the last indexed row, so /predict rows above the last
+# incident are not rescanned on every query. Run --update offline to fold
+# the tail into the file.
+#
+# Usage:
+#   python similarity_index.py            # build from crime_table
+#   python similarity_index.py --update   # append rows inserted since the build
+#
+# The index records the fitted categories it was coded against; the app
+# ignores it once the preprocessor changes.
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from config import (DB_PATH, TABLE_NAME, PREPROCESSOR_PATH, SIMILARITY_INDEX_PATH,
+                    CATEGORICAL_FEATURES)
+from features import encoder_categories
+
+# Relative weight of a matching value per field
+FIELD_WEIGHTS = {
+    'Primary Type': 2.0, 'Description': 2.0, 'Location Description': 2.0, 'Domestic': 0.5,
+    'District': 3.0, 'DayorNight': 0.5, 'DayOfWeek': 0.5, 'HourofDay': 2.0
+}
+# Hours this far apart (circularly) still earn partial credit
+HOUR_BAND = 2
+# The base is sorted by these fields so matching rows can be scored first
+SORT_FIELDS = ('District', 'Primary Type')
+NUMERIC_FIELDS = ('Domestic', 'District', 'DayOfWeek', 'HourofDay')
+CHUNK_SIZE = 200000
+MAX_RESULTS = 100
+
+
+def _rowids_path(path):
+    return os.path.splitext(path)[0] + '_rowids.npy'
+
+
+def _meta_path(path):
+    return os.path.splitext(path)[0] + '.json'
+
+
+def _normalize(name, value):
+    """Comparable form of a DB value or fitted category: int for numeric fields, str otherwise"""
+    if name in NUMERIC_FIELDS:
+        return int(float(value))
+    return str(value)
+
+
+def categories_signature(categories):
+    text = json.dumps({name: [str(c) for c in categories[name]] for name in CATEGORICAL_FEATURES})
+    return hashlib.blake2b(text.encode(), digest_size=8).hexdigest()
+
+
+class Codebook:
+    """Maps feature values to their code in the fitted categories"""
+
+    def __init__(self, categories):
+        self.categories = categories
+        self.codes = {name: {_normalize(name, c): i for i, c in enumerate(categories[name])}
+                      for name in CATEGORICAL_FEATURES}
+
+    def encode_frame(self, frame):
+        """(8, n) int16 codes of a DataFrame of raw crime_table values"""
+        codes = np.empty((len(CATEGORICAL_FEATURES), len(frame)), dtype=np.int16)
+        for f, name in enumerate(CATEGORICAL_FEATURES):
+            column = frame[name]
+            if name in NUMERIC_FIELDS:
+                column = pd.to_numeric(column, errors='coerce').round().astype('Int64')
+            else:
+                column = column.astype(str)
+            codes[f] = column.map(self.codes[name]).fillna(-1).to_numpy(dtype=np.int16)
+        return codes
+
+    def score_tables(self, record):
+        """Per-field similarity of every category to the record's value
+
+        Each table has one extra trailing 0, so code -1 (unseen value) gathers
+        a score of 0 without a separate mask.
+        """
+        tables = []
+        for name in CATEGORICAL_FEATURES:
+            fitted = self.categories[name]
+            table = np.zeros(len(fitted) + 1, dtype=np.float32)
+            try:
+                value = _normalize(name, record[name])
+            except (KeyError, TypeError, ValueError):
+                tables.append(table)
+                continue
+            if name == 'HourofDay':
+                hours = np.array([_normalize(name, c) for c in fitted])
+                distance = np.abs(hours - value)
+                distance = np.minimum(distance, 24 - distance)
+                table[:-1] = np.clip(1 - distance / (HOUR_BAND + 1), 0, None)
+            elif value in self.codes[name]:
+                table[self.codes[name][value]] = 1
+            tables.append(table * FIELD_WEIGHTS[name])
+        return tables
+
+
+def _max_rowid(conn):
+    return conn.execute(f'SELECT MAX(rowid) FROM "{TABLE_NAME}"').fetchone()[0] or 0
+
+
+def _read_rows(conn, after_rowid, upto_rowid, chunksize=CHUNK_SIZE):
+    """Chunks of the recorded incidents with after_rowid < rowid <= upto_rowid"""
+    quoted = ', '.join(f'"{c}"' for c in CATEGORICAL_FEATURES)
+    return pd.read_sql_query(
+        f'SELECT rowid AS _rowid, {quoted} FROM "{TABLE_NAME}" '
+        f'WHERE rowid > ? AND rowid <= ? AND "Case Number" NOT LIKE \'JK%\' ORDER BY rowid',
+        conn, params=(after_rowid, upto_rowid), chunksize=chunksize)
+
+
+class SimilarityIndex:
+    """Memory-mapped feature codes of crime_table plus an in-memory tail of newer rows"""
+
+    def __init__(self, path, categories):
+        self.codes = np.load(path, mmap_mode='r')
+        self.rowids = np.load(_rowids_path(path), mmap_mode='r')
+        with open(_meta_path(path)) as f:
+            self.meta = json.load(f)
+        self.codebook = Codebook(categories)
+        self._lock = threading.Lock()
+        # Tail buffers grow by doubling; only the first _tail_len entries are rows
+        self._tail_codes = np.empty((len(CATEGORICAL_FEATURES), 1024), dtype=np.int16)
+        self._tail_rowids = np.empty(1024, dtype=np.int64)
+        self._tail_len = 0
+        self.watermark = self.meta['max_rowid']
+
+    def __len__(self):
+        return len(self.rowids) + self._tail_len
+
+    def _append(self, codes, rowids):
+        end = self._tail_len + len(rowids)
+        if end > len(self._tail_rowids):
+            capacity = max(end, 2 * len(self._tail_rowids))
+            grown_codes = np.empty((len(CATEGORICAL_FEATURES), capacity), dtype=np.int16)
+            grown_rowids = np.empty(capacity, dtype=np.int64)
+            grown_codes[:, :self._tail_len] = self._tail_codes[:, :self._tail_len]
+            grown_rowids[:self._tail_len] = self._tail_rowids[:self._tail_len]
+            self._tail_codes, self._tail_rowids = grown_codes, grown_rowids
+        self._tail_codes[:, self._tail_len:end] = codes
+        self._tail_rowids[self._tail_len:end] = rowids
+        self._tail_len = end
+
+    def catch_up(self, conn):
+        """Append rows inserted since the last call; returns how many were added"""
+        with self._lock:
+            added = 0
+            upto = _max_rowid(conn)
+            if upto <= self.watermark:
+                return added
+            for chunk in _read_rows(conn, self.watermark, upto):
+                if chunk.empty:
+                    continue
+                self._append(self.codebook.encode_frame(chunk), chunk['_rowid'].to_numpy(dtype=np.int64))
+                added += len(chunk)
+            # Past the rows left out as well, so they are not read again
+            self.watermark = upto
+            return added
+
+    def _ranges(self, record):
+        """(start, end, bound) base ranges to score, narrowest first
+
+        The base is sorted by SORT_FIELDS, so the rows sharing the record's
+        first k sort values are one contiguous range; every row outside it
+        misses one of those values and scores at most `bound`.
+        """
+        total = sum(FIELD_WEIGHTS.values())
+        start, end = 0, len(self.rowids)
+        ranges = []
+        for k, name in enumerate(SORT_FIELDS):
+            try:
+                code = self.codebook.codes[name][_normalize(name, record[name])]
+            except (KeyError, TypeError, ValueError):
+                break
+            column = self.codes[CATEGORICAL_FEATURES.index(name), start:end]
+            start, end = (start + int(np.searchsorted(column, code, 'left')),
+                          start + int(np.searchsorted(column, code, 'right')))
+            ranges.append((start, end, total - min(FIELD_WEIGHTS[s] for s in SORT_FIELDS[:k + 1])))
+        return ranges[::-1] + [(0, len(self.rowids), np.inf)]
+
+    def query(self, record, n=10):
+        """(rowids, similarities in [0, 1]) of the n rows most similar to record"""
+        tables = self.codebook.score_tables(record)
+        with self._lock:
+            # Appends only write past _tail_len, so these views stay consistent
+            tail_codes = self._tail_codes[:, :self._tail_len]
+            tail_rowids = self._tail_rowids[:self._tail_len]
+
+        # Score the narrowest range first; stop once its n-th best beats
+        # anything outside it, else widen (finally to the whole base)
+        for start, end, bound in self._ranges(record):
+            rowids = np.concatenate([self.rowids[start:end], tail_rowids])
+            scores = np.zeros(len(rowids), dtype=np.float32)
+            base, tail = scores[:end - start], scores[end - start:]
+            for f, table in enumerate(tables):
+                base += table[self.codes[f, start:end]]
+                tail += table[tail_codes[f]]
+            k = min(n, len(scores))
+            if k == 0:
+                if bound == np.inf:
+                    return np.empty(0, dtype=np.int64), np.empty(0)
+                continue
+            top = np.argpartition(-scores, k - 1)[:k]
+            if (k == n and scores[top].min() > bound) or bound == np.inf:
+                break
+
+        rowids, scores = rowids[top], scores[top]
+        # Highest score first; among equals the most recent row first
+        order = np.lexsort((-rowids, -scores))
+        return rowids[order], scores[order] / sum(FIELD_WEIGHTS.values())
+
+
+def fetch_rows(conn, rowids, similarities):
+    """crime_table rows by rowid with their similarity, in the given order
+
+    Rows deleted since they were indexed are skipped.
+    """
+    if len(rowids) == 0:
+        return []
+    cursor = conn.cursor()
+    cursor.row_factory = sqlite3.Row
+    placeholders = ', '.join('?' * len(rowids))
+    rows = cursor.execute(f'SELECT rowid AS _rowid, * FROM "{TABLE_NAME}" WHERE rowid IN ({placeholders})',
+                          [int(r) for r in rowids]).fetchall()
+    by_rowid = {row['_rowid']: row for row in rows}
+    results = []
+    for rowid, similarity in zip(rowids.tolist(), similarities.tolist()):
+        if rowid in by_rowid:
+            row = {k: by_rowid[rowid][k] for k in by_rowid[rowid].keys() if k != '_rowid'}
+            row['similarity'] = round(similarity, 4)
+            results.append(row)
+    return results
+
+
+def load_index(categories, path=SIMILARITY_INDEX_PATH):
+    """The index if it exists and matches the fitted categories, else None"""
+    if not os.path.exists(path):
+        return None
+    index = SimilarityIndex(path, categories)
+    if index.meta.get('categories_signature') != categories_signature(categories):
+        print("⚠️ Similarity index is stale for the current preprocessor; ignoring it")
+        return None
+    return index
+
+
+def write_index(path, codes, rowids, categories, max_rowid):
+    """Write codes / rowids / meta; readers that mapped the old files keep them
+
+    max_rowid is the table's MAX(rowid) when it was scanned, the watermark
+    later updates continue from.
+    """
+    for target, array in ((path, codes), (_rowids_path(path), rowids)):
+        staging = target + '.tmp.npy'
+        np.save(staging, array)
+        os.replace(staging, target)
+    with open(_meta_path(path), 'w') as f:
+        json.dump({
+            'rows': int(len(rowids)),
+            'max_rowid': int(max_rowid),
+            'categories_signature': categories_signature(categories),
+            'built_at': pd.Timestamp.now().isoformat()
+        }, f)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Build the similar-incident index over crime_table")
+    parser.add_argument('--db', default=DB_PATH)
+    parser.add_argument('--output', default=SIMILARITY_INDEX_PATH)
+    parser.add_argument('--update', action='store_true',
+                        help="append rows inserted since the last build instead of rebuilding")
+    args = parser.parse_args()
+
+    categories = encoder_categories(joblib.load(PREPROCESSOR_PATH))
+    codebook = Codebook(categories)
+    conn = sqlite3.connect(args.db)
+    start = time.perf_counter()
+
+    codes = [np.empty((len(CATEGORICAL_FEATURES), 0), dtype=np.int16)]
+    rowids = [np.empty(0, dtype=np.int64)]
+    after = 0
+    if args.update:
+        index = load_index(categories, args.output)
+        if index is None:
+            raise SystemExit(f"❌ No usable index at {args.output}; build it without --update")
+        codes, rowids, after = [np.asarray(index.codes)], [np.asarray(index.rowids)], index.watermark
+    upto = max(_max_rowid(conn), after)
+    for chunk in _read_rows(conn, after, upto):
+        codes.append(codebook.encode_frame(chunk))
+        rowids.append(chunk['_rowid'].to_numpy(dtype=np.int64))
+        print(f"   {sum(len(r) for r in rowids):,} rows encoded")
+    codes, rowids = np.concatenate(codes, axis=1), np.concatenate(rowids)
+    order = np.lexsort([codes[CATEGORICAL_FEATURES.index(name)] for name in SORT_FIELDS[::-1]])
+    codes, rowids = np.ascontiguousarray(codes[:, order]), rowids[order]
+    write_index(args.output, codes, rowids, categories, upto)
+    print(f"✅ Wrote {args.output}: {len(rowids):,} rows, "
+          f"{(codes.nbytes + rowids.nbytes) / 1e6:.1f} MB in {time.perf_counter() - start:.1f}s")
+
+    # Query latency on the written (memory-mapped) index
+    index = SimilarityIndex(args.output, categories)
+    sample = pd.read_sql_query(f'SELECT * FROM "{TABLE_NAME}" ORDER BY RANDOM() LIMIT 100', conn)
+    timings = []
+    for record in sample.to_dict('records'):
+        t = time.perf_counter()
+        fetch_rows(conn, *index.query(record, 10))
+        timings.append(time.perf_counter() - t)
+    conn.close()
+    print(f"⚡ Top-10 query incl. row fetch: p50 {np.median(timings) * 1000:.2f} ms, "
+          f"p95 {np.percentile(timings, 95) * 1000:.2f} ms")
@@ -0,0 +1,314 @@
+// Get data from database
+document.addEventListener("DOMContentLoaded", async function () {
+    try {
+        const response = await fetch('/getData', {
+            method: 'GET',
+            headers: { 'Content-Type': 'application/json' }
+        });
+
+        const result = await response.json();
+        console.log('Database: ', result);
+
+        if (result.success && result.crimeRecords) {
+            document.getElementById('crime_records').innerText = result.crimeRecords.length.toLocaleString();
+        }
+    } catch(err) {
+        console.log('Error fetch data from database: ', err)
+    }
+
+    // Initialize floating animations
+    document.querySelectorAll('.stat-card').forEach((card, index) => {
+        card.style.animation = `float ${4 + index}s ease-in-out infinite`;
+    });
+});
+
+// Theme toggle
+document.getElementById('themeSwitch').addEventListener('click', function() {
+    document.body.classList.toggle('light-theme');
+    localStorage.setItem('theme', document.body.classList.contains('light-theme') ? 'light' : 'dark');
+});
+
+// Load saved theme
+if (localStorage.getItem('theme') === 'light') {
+    document.body.classList.add('light-theme');
+}
+
+// Dashboard Modal Functions
+function showDashboardModal() {
+    document.getElementById('dashboardModal').style.display = 'flex';
+}
+
+function closeDashboardModal() {
+    document.getElementById('dashboardModal').style.display = 'none';
+}
+
+function openDashboardWindow() {
+    // Open Power BI URL
+    const powerBiUrl = 'https://app.powerbi.com/view?r=eyJrIjoiODdiNzkxMjktN2FhMy00OGZkLWI0ZTUtOTI3MmFiMTk2NWNlIiwidCI6IjkwMWQ5YTk5LTI3NTgtNGM5ZS1iNWM3LTI2MWM2OTIwZmQzNyIsImMiOjl9';
+    window.open(powerBiUrl, '_blank');
+
+    // Close the modal
+    closeDashboardModal();
+}
+
+// Form submission
+document.getElementById('predictionForm').addEventListener('submit', async function(e) {
+    e.preventDefault();
+
+    // Show loading animation
+    document.getElementById('loading').style.display = 'flex';
+
+    // Get form data
+    const formData = {};
+    const formElements = this.elements;
+
+    for (let element of formElements) {
+        if (element.name && element.type !== 'submit') {
+            formData[element.name] = element.value.toString();
+        }
+    }
+
+    // Auto-set Day/Night
+    const hour = parseInt(formData['HourofDay']);
+    formData['DayorNight'] = (hour >= 6 && hour <= 18) ? 'DAY' : 'NIGHT';
+
+    // Interactive form: fast student model, forest when it is unsure
+    formData['tier'] = 'auto';
+
+    console.log('Sending data:', formData);
+
+    try {
+        const response = await fetch('/predict', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(formData)
+        });
+
+        const result = await response.json();
+        console.log('AI Response:', result);
+
+        // Hide loading
+        document.getElementById('loading').style.display = 'none';
+
+        if (result.success) {
+            displayAdvancedResults(result, formData);
+        } else {
+            showError(result.error);
+        }
+    } catch (error) {
+        console.error('Error:', error);
+        document.getElementById('loading').style.display = 'none';
+        showError('Network connection failed');
+    }
+});
+
+// Display advanced results
+function displayAdvancedResults(result, formData) {
+    const predictions = result.predictions;
+    const crimeCategory = predictions.category;
+    const arrestPrediction = predictions.arrest;
+
+    // Get category info
+    const categoryMap = {
+        'Drug Crime': { color: '#10b981', icon: '💊', risk: 30 },
+        'Other Crime': { color: '#6b7280', icon: '📄', risk: 20 },
+        'Property Crime': { color: '#f59e0b', icon: '💰', risk: 40 },
+        'Sex Crime': { color: '#8b5cf6', icon: '🔒', risk: 70 },
+        'Violent Crime': { color: '#ef4444', icon: '⚔️', risk: 90 }
+    };
+
+    const categoryInfo = categoryMap[crimeCategory] || { color: '#6b7280', icon: '❓', risk: 50 };
+
+    // Calculate risk based on multiple factors
+    let riskScore = categoryInfo.risk;
+    if (formData['Domestic'] === '1') riskScore += 20;
+    if (formData['DayorNight'] === 'NIGHT') riskScore += 15;
+    if (parseInt(formData['District']) > 20) riskScore += 10;
+    riskScore = Math.min(100, riskScore);
+
+    // Arrest prediction styling
+    const arrestClass = arrestPrediction === 1 ? 
+        'background: linear-gradient(135deg, rgba(16, 185, 129, 0.2), rgba(5, 150, 105, 0.1)); border: 2px solid #10b981;' :
+        'background: linear-gradient(135deg, rgba(239, 68, 68, 0.2), rgba(220, 38, 38, 0.1)); border: 2px solid #ef4444;';
+
+    const arrestText = arrestPrediction === 1 ? 'HIGH' : 'LOW';
+    const arrestDesc = result.probabilities ?
+        `${Math.round(result.probabilities.arrest * 100)}% probability` :
+        (arrestPrediction === 1 ? '85% probability' : '23% probability');
+    const arrestIcon = arrestPrediction === 1 ? '✅' : '❌';
+
+    // Update results
+    const resultsHTML = `
+        <div class="prediction-cards">
+            <div class="prediction-card" style="${arrestClass}">
+                <div class="prediction-icon">${arrestIcon}</div>
+                <div class="prediction-title">Arrest Probability</div>
+                <div class="prediction-value">${arrestText}</div>
+                <div class="prediction-desc">${arrestDesc}</div>
+            </div>
+
+            <div class="prediction-card" style="background: linear-gradient(135deg, ${categoryInfo.color}20, ${categoryInfo.color}10); border: 2px solid ${categoryInfo.color};">
+                <div class="prediction-icon">${categoryInfo.icon}</div>
+                <div class="prediction-title">Crime Category</div>
+                <div class="prediction-value">${crimeCategory.split(' ')[0].toUpperCase()}</div>
+                <div class="prediction-desc">${crimeCategory}</div>
+            </div>
+        </div>
+
+        <div class="crime-radar">
+            <h3 style="margin-bottom: 20px; color: ${categoryInfo.color};">
+                <i class="fas fa-crosshairs"></i> Risk Assessment: ${riskScore}%
+            </h3>
+            <div class="radar-chart">
+                <div class="radar-line radar-line-1"></div>
+                <div class="radar-line radar-line-2"></div>
+                <div class="radar-line radar-line-3"></div>
+                <div class="radar-point" style="top: ${30 + riskScore/3}%; left: ${40 + riskScore/5}%; background: ${categoryInfo.color};"></div>
+                <div class="radar-point" style="top: ${60 - riskScore/4}%; left: ${70 - riskScore/7}%; background: ${categoryInfo.color};"></div>
+                <div class="radar-point" style="top: ${80 - riskScore/5}%; left: ${30 + riskScore/6}%; background: ${categoryInfo.color};"></div>
+            </div>
+
+            <div class="risk-meter">
+                <div class="risk-indicator" id="riskIndicator" style="left: ${riskScore}%; background: ${categoryInfo.color};"></div>
+            </div>
+
+            <div style="display: flex; justify-content: space-between; margin-top: 10px;">
+                <span style="color: #10b981;">Low Risk</span>
+                <span style="color: #f59e0b;">Medium Risk</span>
+                <span style="color: #ef4444;">High Risk</span>
+            </div>
+        </div>
+
+        <div class="prediction-details" style="margin-top: 30px; padding: 25px; background: var(--card-bg); border-radius: 15px; border-left: 4px solid ${categoryInfo.color};">
+            <h3 style="margin-bottom: 15px; color: ${categoryInfo.color};">
+                <i class="fas fa-chart-pie"></i> AI-Generated Insights
+            </h3>
+            <div style="display: grid; grid-template-columns: repeat(2, 1fr); gap: 15px; margin-bottom: 20px;">
+                <div>
+                    <div style="font-size: 0.9rem; color: var(--gray);">Historical Similar Cases</div>
+                    <div style="font-size: 1.2rem; font-weight: 600;">${Math.round(89558 * (riskScore/100))}</div>
+                </div>
+                <div>
+                    <div style="font-size: 0.9rem; color: var(--gray);">Avg. Police Response</div>
+                    <div style="font-size: 1.2rem; font-weight: 600;">${riskScore > 60 ? '12' : '22'} min</div>
+                </div>
+                <div>
+                    <div style="font-size: 0.9rem; color: var(--gray);">Case Clearance Rate</div>
+                    <div style="font-size: 1.2rem; font-weight: 600;">${arrestPrediction === 1 ? '68%' : '34%'}</div>
+                </div>
+                <div>
+                    <div style="font-size: 0.9rem; color: var(--gray);">Priority Level</div>
+                    <div style="font-size: 1.2rem; font-weight: 600;">${riskScore > 70 ? 'HIGH' : riskScore > 40 ? 'MEDIUM' : 'LOW'}</div>
+                </div>
+            </div>
+
+            <div style="background: rgba(255,255,255,0.05); padding: 15px; border-radius: 10px; margin-top: 15px;">
+                <div style="font-size: 0.9rem; color: var(--gray); margin-bottom: 5px;">
+                    <i class="fas fa-lightbulb"></i> AI Recommendation:
+                </div>
+                <div style="font-size: 0.95rem; color: var(--light);">
+                    ${arrestPrediction === 1 ? 
+                        '🚨 Immediate response recommended. High probability of suspect apprehension based on location and crime type.' :
+                        '📋 Standard investigation protocol. Focus on evidence collection and witness statements.'}
+                </div>
+            </div>
+        </div>
+    `;
+
+    document.getElementById('resultContent').innerHTML = resultsHTML;
+
+    // Animate the risk indicator
+    setTimeout(() => {
+        const indicator = document.getElementById('riskIndicator');
+        if (indicator) {
+            indicator.style.transition = 'left 2s ease';
+        }
+    }, 100);
+
+    // Add floating animation to cards
+    document.querySelectorAll('.prediction-card').forEach((card, index) => {
+        card.style.animation = `float ${3 + index * 0.5}s ease-in-out infinite`;
+    });
+}
+
+// Show error
+function showError(message) {
+    document.getElementById('resultContent').innerHTML = `
+        <div style="text-align: center; padding: 50px;">
+            <div style="font-size: 4rem; color: #ef4444; margin-bottom: 20px;">
+                <i class="fas fa-exclamation-triangle"></i>
+            </div>
+            <h3 style="color: #ef4444; margin-bottom: 10px;">Analysis Failed</h3>
+            <p style="color: var(--gray);">${message}</p>
+            <button onclick="window.location.reload()" style="margin-top: 20px; padding: 12px 30px; background: var(--primary); color: white; border: none; border-radius: 10px; cursor: pointer; font-weight: 600;">
+                <i class="fas fa-redo"></i> Try Again
+            </button>
+        </div>
+    `;
+}
+
+// Load sample data
+function loadSample(type) {
+    const samples = {
+        theft: {
+            'Primary Type': 'THEFT',
+            'Description': 'OVER $500',
+            'Location Description': 'STREET',
+            'Domestic': '0',
+            'District': '12',
+            'DayOfWeek': '3',
+            'HourofDay': '14',
+            'DayorNight': 'DAY'
+        },
+        violent: {
+            'Primary Type': 'BATTERY',
+            'Description': 'AGGRAVATED',
+            'Location Description': 'RESIDENCE',
+            'Domestic': '1',
+            'District': '8',
+            'DayOfWeek': '5',
+            'HourofDay': '22',
+            'DayorNight': 'NIGHT'
+        },
+        drug: {
+            'Primary Type': 'NARCOTICS',
+            'Description': 'POSSESSION',
+            'Location Description': 'PARKING LOT',
+            'Domestic': '0',
+            'District': '15',
+            'DayOfWeek': '6',
+            'HourofDay': '23',
+            'DayorNight': 'NIGHT'
+        },
+        burglary: {
+            'Primary Type': 'BURGLARY',
+            'Description': 'FORCIBLE ENTRY',
+            'Location Description': 'RESIDENCE',
+            'Domestic': '0',
+            'District': '18',
+            'DayOfWeek': '1',
+            'HourofDay': '3',
+            'DayorNight': 'NIGHT'
+        }
+    };
+
+    const sample = samples[type];
+    for (const key in sample) {
+        const element = document.querySelector(`[name="${key}"]`);
+        if (element) {
+            element.value = sample[key];
+        }
+    }
+
+    // Auto submit after delay
+    setTimeout(() => {
+        document.getElementById('predictionForm').dispatchEvent(new Event('submit'));
+    }, 800);
+}
+
+// Close modal if clicked outside
+document.getElementById('dashboardModal').addEventListener('click', function(e) {
+    if (e.target === this) {
+        closeDashboardModal();
+    }
+});
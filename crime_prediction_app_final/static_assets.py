@@ -0,0 +1,122 @@
+# static_assets.py
+# The web UI as versioned, precompressed static assets.
+#
+# static/index.html, static/app.css and static/app.js are the page, its
+# stylesheet and its script. At startup each CSS/JS file is given a
+# content-hash name (app.3f2a9c1b7d4e.css) and the page is rendered with those
+# names, so the assets can be cached for a year and a new deploy changes the
+# URLs. Every asset is compressed once with gzip (and brotli if installed);
+# a request is answered from memory with the best encoding the client
+# accepts, an ETag, and 304 Not Modified when If-None-Match matches. The page
+# itself is revalidated on every visit, which costs a 304 with no body.
+#
+# Usage:
+#   python static_assets.py            # write the hashed / compressed files to static/dist
+import gzip
+import hashlib
+import os
+
+from flask import Response
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+PAGE = 'index.html'
+VERSIONED = ['app.css', 'app.js']
+CONTENT_TYPES = {
+    '.html': 'text/html; charset=utf-8',
+    '.css': 'text/css; charset=utf-8',
+    '.js': 'application/javascript; charset=utf-8'
+}
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'no-cache'
+SUFFIXES = {'gzip': '.gz', 'br': '.br'}
+
+
+class Asset:
+    """One file's bytes in every encoding, with its ETag and cache policy"""
+
+    def __init__(self, name, body, cache_control):
+        self.name = name
+        self.content_type = CONTENT_TYPES[os.path.splitext(name)[1]]
+        self.cache_control = cache_control
+        self.etag = hashlib.sha256(body).hexdigest()[:16]
+        self.bodies = {'identity': body, 'gzip': gzip.compress(body, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            self.bodies['br'] = brotli.compress(body, quality=11)
+
+
+def build(static_dir=STATIC_DIR):
+    """{url name: Asset} for the page and its content-hashed CSS/JS"""
+    assets = {}
+    with open(os.path.join(static_dir, PAGE), encoding='utf-8') as f:
+        page = f.read()
+    for name in VERSIONED:
+        with open(os.path.join(static_dir, name), 'rb') as f:
+            body = f.read()
+        stem, ext = os.path.splitext(name)
+        hashed = f"{stem}.{hashlib.sha256(body).hexdigest()[:12]}{ext}"
+        assets[hashed] = Asset(hashed, body, IMMUTABLE)
+        page = page.replace('{{' + name + '}}', f'/assets/{hashed}')
+    assets[PAGE] = Asset(PAGE, page.encode('utf-8'), REVALIDATE)
+    return assets
+
+
+def accepted_encodings(header):
+    """Codings an Accept-Encoding header accepts, lower-cased; those with q=0 are refused"""
+    accepted = set()
+    for part in header.split(','):
+        token, _, params = part.strip().partition(';')
+        name, _, value = params.replace(' ', '').partition('=')
+        if name.lower() == 'q':
+            try:
+                if float(value) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(token.strip().lower())
+    return accepted
+
+
+def respond(asset, request):
+    """Response for `asset`: 304 on a matching ETag, else the smallest accepted encoding"""
+    accepted = accepted_encodings(request.headers.get('Accept-Encoding', ''))
+    encoding = 'identity'
+    for candidate in ('br', 'gzip'):
+        if candidate in asset.bodies and (candidate in accepted or '*' in accepted):
+            encoding = candidate
+            break
+    # Each encoding gets its own strong ETag; any of them validates the asset
+    etag = asset.etag if encoding == 'identity' else f"{asset.etag}-{encoding}"
+
+    headers = {'ETag': f'"{etag}"', 'Cache-Control': asset.cache_control, 'Vary': 'Accept-Encoding'}
+    if_none_match = request.headers.get('If-None-Match', '')
+    tags = {tag.strip().removeprefix('W/').strip('"').split('-')[0] for tag in if_none_match.split(',')}
+    if '*' in tags or asset.etag in tags:
+        return Response(status=304, headers=headers)
+
+    if encoding != 'identity':
+        headers['Content-Encoding'] = encoding
+    return Response(asset.bodies[encoding], status=200, headers=headers, content_type=asset.content_type)
+
+
+def write(assets, dist_dir):
+    """Write every asset and its compressed variants (name.gz, name.br) for a front proxy"""
+    os.makedirs(dist_dir, exist_ok=True)
+    for name, asset in assets.items():
+        for encoding, body in asset.bodies.items():
+            with open(os.path.join(dist_dir, name + SUFFIXES.get(encoding, '')), 'wb') as f:
+                f.write(body)
+
+
+if __name__ == '__main__':
+    assets = build()
+    dist_dir = os.path.join(STATIC_DIR, 'dist')
+    write(assets, dist_dir)
+    for name, asset in assets.items():
+        sizes = ', '.join(f"{encoding} {len(body):,} B" for encoding, body in asset.bodies.items())
+        print(f"📦 {name}: {sizes}")
+    print(f"✅ Wrote {len(assets)} assets to {dist_dir}")
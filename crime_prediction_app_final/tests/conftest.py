@@ -0,0 +1,178 @@
+# conftest.py
+# A tiny, notebook-faithful deployment for the test suite.
+#
+# The artifacts are fitted the way the training notebook fits them: District
+# as strings like '12.0' (it went through a float column), Domestic,
+# DayOfWeek and HourofDay as int64, the text fields as upper-case strings.
+# crime_table stores District and the other numeric fields as integers, like
+# the rows /predict writes. Everything lives in one temporary directory that
+# becomes the working directory, since config.py's artifact paths are
+# relative; app.py is imported from there once per session.
+import os
+import subprocess
+import sqlite3
+import sys
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+# Read by config.py at import, so set before any app module is imported
+os.environ['CRIME_DB_PATH'] = 'crime_data.db'
+os.environ['WARMUP_MODE'] = 'off'
+os.environ['CLIENT_RATE_LIMIT'] = '0'
+os.environ['MODEL_BACKEND'] = 'sklearn'
+os.environ['PREDICT_TIER'] = 'teacher'
+
+# Primary Type -> (Crime Category, descriptions)
+CRIME_TYPES = {
+    'THEFT': ('Property Crime', ['$500 AND UNDER', 'OVER $500', 'RETAIL THEFT']),
+    'BATTERY': ('Violent Crime', ['SIMPLE', 'DOMESTIC BATTERY SIMPLE']),
+    'NARCOTICS': ('Drug Crime', ['POSS: CANNABIS 30GMS OR LESS', 'POSS: HEROIN(WHITE)']),
+    'CRIM SEXUAL ASSAULT': ('Sex Crime', ['NON-AGGRAVATED']),
+    'DECEPTIVE PRACTICE': ('Other Crime', ['FINANCIAL IDENTITY THEFT OVER $ 300'])
+}
+LOCATIONS = ['STREET', 'RESIDENCE', 'APARTMENT', 'SIDEWALK']
+DISTRICTS = [1, 4, 12, 25]
+N_ROWS = 1200
+N_TREES = 12
+TABLE_TOP = 200
+
+
+def incidents(n=N_ROWS, seed=0):
+    """crime_table rows with a learnable link between features and targets"""
+    rng = np.random.default_rng(seed)
+    types = list(CRIME_TYPES)
+    primary = rng.choice(types, size=n, p=[0.4, 0.25, 0.2, 0.05, 0.1])
+    description = [rng.choice(CRIME_TYPES[p][1]) for p in primary]
+    hour = rng.integers(0, 24, size=n)
+    frame = pd.DataFrame({
+        'ID': np.arange(1, n + 1),
+        'Case Number': [f'HZ{i:06d}' for i in range(1, n + 1)],
+        'Primary Type': primary,
+        'Description': description,
+        'Location Description': rng.choice(LOCATIONS, size=n),
+        'Arrest': ((primary == 'NARCOTICS') | (rng.random(n) < 0.15)).astype(int),
+        'Domestic': ((np.array(description) == 'DOMESTIC BATTERY SIMPLE') | (rng.random(n) < 0.05)).astype(int),
+        'District': rng.choice(DISTRICTS, size=n, p=[0.4, 0.3, 0.2, 0.1]),
+        'Crime Category': [CRIME_TYPES[p][0] for p in primary],
+        'DayOfWeek': rng.integers(0, 7, size=n),
+        'HourofDay': hour,
+        'DayorNight': np.where((hour >= 6) & (hour <= 18), 'DAY', 'NIGHT')
+    })
+    return frame
+
+
+def notebook_features(frame):
+    """Feature frame typed like the notebook's training frame"""
+    from config import CATEGORICAL_FEATURES
+
+    X = frame[CATEGORICAL_FEATURES].copy()
+    X['District'] = X['District'].astype(float).astype(str)
+    for name in ('Domestic', 'DayOfWeek', 'HourofDay'):
+        X[name] = X[name].astype(np.int64)
+    return X
+
+
+def run_script(name, *args):
+    """Run one of the app's command-line jobs in the working directory"""
+    result = subprocess.run([sys.executable, os.path.join(APP_DIR, name), *args],
+                            capture_output=True, text=True, env=dict(os.environ, PYTHONPATH=APP_DIR))
+    assert result.returncode == 0, result.stdout + result.stderr
+    return result.stdout
+
+
+@pytest.fixture(scope='session')
+def workdir(tmp_path_factory):
+    """Working directory holding the model, preprocessor, encoder and crime_data.db"""
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.multioutput import MultiOutputClassifier
+    from sklearn.preprocessing import LabelEncoder
+
+    from config import DB_PATH, MODEL_PATH, PREPROCESSOR_PATH, ENCODER_PATH, TABLE_NAME
+    from train_model import new_preprocessor
+
+    path = tmp_path_factory.mktemp('deployment')
+    previous = os.getcwd()
+    os.chdir(path)
+
+    frame = incidents()
+    encoder = LabelEncoder().fit(frame['Crime Category'])
+    preprocessor = new_preprocessor()
+    X = preprocessor.fit_transform(notebook_features(frame))
+    y = np.column_stack([frame['Arrest'], encoder.transform(frame['Crime Category'])])
+    model = MultiOutputClassifier(RandomForestClassifier(n_estimators=N_TREES, random_state=42,
+                                                         class_weight='balanced'))
+    model.fit(X, y)
+    joblib.dump(model, MODEL_PATH)
+    joblib.dump(preprocessor, PREPROCESSOR_PATH)
+    joblib.dump(encoder, ENCODER_PATH)
+
+    conn = sqlite3.connect(DB_PATH)
+    frame.to_sql(TABLE_NAME, conn, index=False)
+    conn.close()
+
+    run_script('similarity_index.py')
+    run_script('text_search.py', '--query', 'theft')
+    run_script('prediction_table.py', '--top', str(TABLE_TOP), '--workers', '1')
+    yield path
+    os.chdir(previous)
+
+
+@pytest.fixture(scope='session')
+def table_combos(workdir):
+    """The combinations the prediction table was built from, before any /predict writes"""
+    from config import PREPROCESSOR_PATH
+    from prediction_table import frequent_combinations
+
+    return frequent_combinations(joblib.load(os.path.join(workdir, PREPROCESSOR_PATH)),
+                                 TABLE_TOP)
+
+
+@pytest.fixture(scope='session')
+def quantized_model(workdir):
+    """Path of the quantized forest artifact, built by quantized_forest.py"""
+    from config import QUANTIZED_MODEL_PATH
+
+    run_script('quantized_forest.py', '--data', 'crime_data.db')
+    return os.path.join(workdir, QUANTIZED_MODEL_PATH)
+
+
+@pytest.fixture(scope='session')
+def student_model(workdir):
+    """The distilled student, built by distill_model.py"""
+    from config import STUDENT_PATH
+
+    run_script('distill_model.py', '--data', 'crime_data.db')
+    return joblib.load(os.path.join(workdir, STUDENT_PATH))
+
+
+@pytest.fixture(scope='session')
+def app_module(workdir, table_combos):
+    import app
+    return app
+
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
+
+
+@pytest.fixture
+def db(workdir):
+    from config import DB_PATH
+
+    conn = sqlite3.connect(DB_PATH)
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def valid_input():
+    """A /predict body in the loose form clients send"""
+    return {'Primary Type': 'theft', 'Description': ' over $500 ', 'Location Description': 'Street',
+            'Domestic': 'false', 'District': '12', 'DayOfWeek': 4, 'HourofDay': '14'}
@@ -0,0 +1,66 @@
+import threading
+
+from flask import Flask, jsonify
+
+from admission import AdmissionController, TokenBuckets
+
+
+def guarded_app(controller, view=None):
+    app = Flask(__name__)
+
+    @app.route('/work')
+    @controller.guard
+    def work():
+        if view is not None:
+            view()
+        return jsonify({'success': True})
+
+    return app
+
+
+def test_token_bucket_refills_at_rate():
+    buckets = TokenBuckets(rate=2, burst=2)
+    assert buckets.take('a', now=0.0) == 0
+    assert buckets.take('a', now=0.0) == 0
+    assert buckets.take('a', now=0.0) == 0.5
+    assert buckets.take('a', now=0.5) == 0
+    assert buckets.take('b', now=0.5) == 0
+
+
+def test_forwarded_for_does_not_buy_a_new_bucket():
+    client = guarded_app(AdmissionController(4, 4, 1.0, rate=0.001, burst=2)).test_client()
+    statuses = [client.get('/work', headers={'X-Forwarded-For': f'10.0.0.{i}'}).status_code
+                for i in range(4)]
+    assert statuses == [200, 200, 429, 429]
+    other = client.get('/work', environ_base={'REMOTE_ADDR': '192.0.2.7'})
+    assert other.status_code == 200
+
+
+def test_rate_limited_response_carries_retry_after():
+    client = guarded_app(AdmissionController(4, 4, 1.0, rate=0.5, burst=1)).test_client()
+    client.get('/work')
+    response = client.get('/work')
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) >= 1
+
+
+def test_full_queue_is_shed_with_503():
+    entered, release = threading.Event(), threading.Event()
+    controller = AdmissionController(max_in_flight=1, max_queue=0, deadline=1.0)
+
+    def hold():
+        entered.set()
+        release.wait(5)
+
+    app = guarded_app(controller, hold)
+    worker = threading.Thread(target=lambda: app.test_client().get('/work'))
+    worker.start()
+    try:
+        assert entered.wait(5)
+        response = app.test_client().get('/work')
+        assert response.status_code == 503
+        assert controller.snapshot()['rejected_queue_full'] == 1
+    finally:
+        release.set()
+        worker.join()
+    assert app.test_client().get('/work').status_code == 200
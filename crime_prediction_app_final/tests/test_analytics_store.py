@@ -0,0 +1,55 @@
+import shutil
+
+import pytest
+
+pytest.importorskip('pyarrow')
+
+import analytics_store
+from config import DB_PATH, PARQUET_ROOT
+
+
+@pytest.fixture
+def store(workdir):
+    yield PARQUET_ROOT
+    shutil.rmtree(PARQUET_ROOT, ignore_errors=True)
+
+
+def summary(client, **params):
+    body = client.get('/analytics/summary', query_string=params).get_json()
+    assert body['success'], body
+    return body
+
+
+def test_parquet_summary_matches_sqlite(client, db, store):
+    before = summary(client, by='Crime Category', District='12')
+    assert before['source'] == 'sqlite'
+
+    rows = db.execute('SELECT COUNT(*) FROM crime_table').fetchone()[0]
+    assert analytics_store.sync(DB_PATH, store, full=True) == rows
+    after = summary(client, by='Crime Category', District='12')
+    assert after['source'] == 'parquet'
+    assert after['groups'] == before['groups'] and after['total'] == before['total'] > 0
+
+
+def test_sync_appends_only_new_rows(client, db, store):
+    analytics_store.sync(DB_PATH, store, full=True)
+    total = summary(client, by='District')['total']
+    db.execute('''
+        INSERT INTO crime_table ("ID", "Case Number", "Primary Type", "Description",
+            "Location Description", "Arrest", "Domestic", "District", "Crime Category",
+            "DayOfWeek", "HourofDay", "DayorNight")
+        VALUES (910001, 'HZ910001', 'THEFT', 'OVER $500', 'STREET', 1, 0, 4, 'Property Crime', 2, 9, 'DAY')
+    ''')
+    db.commit()
+    try:
+        assert analytics_store.sync(DB_PATH, store) == 1
+        assert analytics_store.sync(DB_PATH, store) == 0
+        assert summary(client, by='District')['total'] == total + 1
+    finally:
+        db.execute('DELETE FROM crime_table WHERE "ID" = 910001')
+        db.commit()
+
+
+def test_unknown_column_is_rejected(client):
+    body = client.get('/analytics/summary', query_string={'by': 'Nope'}).get_json()
+    assert not body['success'] and 'Unknown column' in body['error']
@@ -0,0 +1,38 @@
+import pytest
+
+pa = pytest.importorskip('pyarrow')
+
+import analytics_store
+from conftest import run_script
+
+
+def read_stream(body):
+    return pa.ipc.open_stream(body).read_all()
+
+
+def test_arrow_stream_matches_json_rows(client):
+    rows = client.get('/getData').get_json()['crimeRecords']
+    response = client.get('/getData', query_string={'format': 'arrow'})
+    assert response.mimetype == analytics_store.ARROW_STREAM_TYPE
+    table = read_stream(response.get_data())
+    assert table.num_rows == len(rows)
+    assert table.column_names == list(rows[0])
+    for name in analytics_store.DICTIONARY_COLUMNS:
+        assert pa.types.is_dictionary(table.schema.field(name).type)
+    by_id = {row['ID']: row for row in rows}
+    for record in table.slice(0, 50).to_pylist():
+        assert record == by_id[record['ID']]
+
+
+def test_arrow_is_negotiated_by_accept_header(client):
+    response = client.get('/getData', headers={'Accept': analytics_store.ARROW_STREAM_TYPE})
+    assert response.mimetype == analytics_store.ARROW_STREAM_TYPE
+    assert response.is_streamed
+    assert read_stream(response.get_data()).num_rows > 0
+
+
+def test_export_writes_a_readable_stream(workdir, db):
+    run_script('analytics_store.py', '--export', 'crime_table.arrows')
+    with open(workdir / 'crime_table.arrows', 'rb') as f:
+        table = read_stream(f.read())
+    assert table.num_rows == db.execute('SELECT COUNT(*) FROM crime_table').fetchone()[0]
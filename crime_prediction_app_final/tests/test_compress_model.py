@@ -0,0 +1,74 @@
+import copy
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+from config import TARGETS
+from conftest import APP_DIR, run_script
+from compress_model import compress_forest, forest_accuracy, gate, shrink
+
+
+def _holdout(app_module, db):
+    import pandas as pd
+    from features import align_to_encoder
+
+    frame = pd.read_sql_query('SELECT * FROM crime_table WHERE "Case Number" NOT LIKE \'JK%\' LIMIT 400', db)
+    X = app_module.preprocessor.transform(align_to_encoder(frame, app_module.preprocessor))
+    Y = np.column_stack([frame['Arrest'], app_module.encoder.transform(frame['Crime Category'])])
+    return X, Y
+
+
+def test_gate_falls_back_to_the_uncompressed_subset(app_module, db):
+    model = app_module.model
+    X, Y = _holdout(app_module, db)
+    # Stumps of one tree: far outside any budget
+    compressed = copy.copy(model)
+    compressed.estimators_ = [compress_forest(forest, [0], max_depth=1) for forest in model.estimators_]
+    subsets = [compress_forest(forest, range(len(forest.estimators_)), merge_leaves=False)
+               for forest in model.estimators_]
+    full, small, fell_back, failed = gate(model, compressed, subsets, X, Y, 0.0)
+    assert fell_back and not failed
+    for target in TARGETS:
+        assert small['accuracy'][target] == full['accuracy'][target]
+
+    compressed.estimators_ = [compress_forest(forest, [0], max_depth=1) for forest in model.estimators_]
+    stumps = [compress_forest(forest, [0], max_depth=1) for forest in model.estimators_]
+    _, _, _, failed = gate(model, compressed, stumps, X, Y, 0.0)
+    assert failed
+
+
+def test_shrink_stays_within_budget(app_module, db):
+    X, Y = _holdout(app_module, db)
+    forest = app_module.model.estimators_[1]
+    indices = list(range(len(forest.estimators_)))
+    budget = forest_accuracy(forest, X, Y[:, 1])
+    steps = []
+    best, _, _ = shrink(forest, indices, X, Y[:, 1], budget, steps, 'Crime Category')
+    assert forest_accuracy(best, X, Y[:, 1]) >= budget
+    assert steps[0]['max_depth'] is None
+
+
+def test_cli_refuses_a_model_outside_the_budget(workdir):
+    result = subprocess.run([sys.executable, os.path.join(APP_DIR, 'compress_model.py'), '--data',
+                             'crime_data.db', '--tolerance', '0.01', '--output', 'strict.pkl',
+                             '--report', 'strict.json'],
+                            capture_output=True, text=True, env=dict(os.environ, PYTHONPATH=APP_DIR))
+    with open(workdir / 'strict.json') as f:
+        report = json.load(f)
+    # One selected Arrest tree passes on the selection rows but not on the report rows
+    assert 'Arrest' in report['uncompressed_fallback']
+    assert not report['within_tolerance']
+    assert result.returncode == 1 and not (workdir / 'strict.pkl').exists()
+
+
+def test_cli_saves_within_the_budget(workdir):
+    run_script('compress_model.py', '--data', 'crime_data.db', '--tolerance', '0.5',
+               '--output', 'compressed.pkl', '--report', 'compression.json')
+    with open(workdir / 'compression.json') as f:
+        report = json.load(f)
+    assert report['within_tolerance'] and (workdir / 'compressed.pkl').exists()
+    for target in TARGETS:
+        assert report['compressed']['accuracy'][target] >= report['full']['accuracy'][target] - 0.5
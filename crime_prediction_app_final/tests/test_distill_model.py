@@ -0,0 +1,29 @@
+import numpy as np
+
+from config import CATEGORICAL_FEATURES, TARGETS
+from features import records_frame
+from inference import predict_with_proba, student_predict
+
+
+def test_student_agrees_with_the_teacher(app_module, student_model, table_combos):
+    records = [dict(zip(CATEGORICAL_FEATURES, combo)) for combo in table_combos]
+    X = app_module.preprocessor.transform(records_frame(records, app_module.preprocessor))
+    teacher_labels, teacher_probas = predict_with_proba(app_module.model, X)
+    answers = [student_predict(student_model, record) for record in records]
+    student_labels = np.vstack([labels for labels, _ in answers])
+    # A linear student of a 12-tree toy forest: close, not exact, on the noisy Arrest target
+    for t, target in enumerate(TARGETS):
+        student_probas = np.vstack([probas[t] for _, probas in answers])
+        agreement = np.mean(student_labels[:, t] == teacher_labels[:, t])
+        assert agreement >= 0.85, (target, agreement)
+        assert np.abs(student_probas - teacher_probas[t]).mean() < 0.2, target
+        np.testing.assert_allclose(student_probas.sum(axis=1), 1)
+
+
+def test_student_tier_is_served(app_module, client, student_model, valid_input, monkeypatch):
+    monkeypatch.setattr(app_module, 'student', student_model)
+    body = client.post('/predict', json=dict(valid_input, tier='student')).get_json()
+    assert body['success'], body
+    assert body['tier'] == 'student'
+    teacher = client.post('/predict', json=dict(valid_input, tier='teacher')).get_json()
+    assert body['predictions'] == teacher['predictions']
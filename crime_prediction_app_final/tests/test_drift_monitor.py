@@ -0,0 +1,28 @@
+import json
+
+import pytest
+
+from conftest import N_ROWS, run_script
+from drift_monitor import DriftMonitor
+
+
+@pytest.fixture(scope='module')
+def baseline(app_module):
+    run_script('drift_monitor.py', '--source', 'crime_data.db')
+    with open('drift_baseline.json') as f:
+        return json.load(f)
+
+
+def test_baseline_counts_every_field_from_crime_table(baseline):
+    for name, spec in baseline['features'].items():
+        # The training side of the notebook's 80/20 split
+        assert sum(spec['counts']) == int(N_ROWS * 0.8), name
+
+
+def test_validated_records_are_never_unknown(app_module, baseline, valid_input):
+    monitor = DriftMonitor(baseline)
+    record, _ = app_module.validator.validate(valid_input)
+    monitor.observe(record, (0, 2))
+    report = monitor.report()
+    assert all(feature['unknown_rate'] == 0 for feature in report['features'].values())
+    assert report['requests'] == 1
@@ -0,0 +1,39 @@
+import json
+import os
+import subprocess
+import sys
+
+import scipy.sparse as sp
+
+from conftest import APP_DIR, run_script
+
+
+def test_missing_baseline_is_an_error(workdir):
+    result = subprocess.run([sys.executable, os.path.join(APP_DIR, 'evaluate_model.py'),
+                             '--baseline', 'no_such_report.json'],
+                            capture_output=True, text=True, env=dict(os.environ, PYTHONPATH=APP_DIR))
+    assert result.returncode == 2
+    assert 'no_such_report.json does not exist' in result.stderr
+
+
+def test_single_row_latencies_time_one_row_per_call(app_module, monkeypatch):
+    import evaluate_model
+
+    X = sp.random(500, app_module.model.estimators_[0].n_features_in_, density=0.01, format='csr')
+    rows = []
+    monkeypatch.setattr(evaluate_model, 'predict_with_proba',
+                        lambda model, X, calibration=None: rows.append(X.shape[0]))
+    timings = evaluate_model.single_row_latencies(app_module.model, X, samples=40)
+    assert len(timings) == 40
+    # One warm-up call, then one call per timed row
+    assert rows == [1] * 41
+
+
+def test_report_has_serial_latency(workdir):
+    run_script('evaluate_model.py', '--source', 'crime_data.db', '--workers', '2', '--no-cache',
+               '--output', 'evaluation.json')
+    with open(workdir / 'evaluation.json') as f:
+        report = json.load(f)
+    latency = report['latency']
+    assert 0 < latency['single_row_p50_ms'] <= latency['single_row_p95_ms']
+    assert report['gates']['passed']
@@ -0,0 +1,44 @@
+import numpy as np
+
+from config import CATEGORICAL_FEATURES
+from explain import Explainer, column_fields
+from features import records_frame
+
+
+def saabas_reference(forest, X, fields):
+    """Per-row, per-tree path walk the vectorized explainer must reproduce"""
+    n_rows, n_classes = X.shape[0], len(forest.classes_)
+    by_field = np.zeros((n_rows, len(CATEGORICAL_FEATURES) + 1, n_classes))
+    for estimator in forest.estimators_:
+        tree = estimator.tree_
+        paths = tree.decision_path(X.astype(np.float32))
+        dist = tree.value[:, 0, :] / tree.value[:, 0, :].sum(axis=1, keepdims=True)
+        for row in range(n_rows):
+            path = np.sort(paths.indices[paths.indptr[row]:paths.indptr[row + 1]])
+            for parent, child in zip(path[:-1], path[1:]):
+                by_field[row, fields[tree.feature[parent]]] += dist[child] - dist[parent]
+    return by_field[:, :-1] / len(forest.estimators_)
+
+
+def test_contributions_add_up_to_the_forest(app_module, table_combos):
+    records = [dict(zip(CATEGORICAL_FEATURES, combo)) for combo in table_combos[:20]]
+    X = app_module.preprocessor.transform(records_frame(records, app_module.preprocessor))
+    explainer = Explainer(app_module.model, app_module.encoded_columns)
+    fields = column_fields(app_module.encoded_columns, X.shape[1])
+    for forest, forest_explainer in zip(app_module.model.estimators_, explainer.forests):
+        proba, by_field = forest_explainer.contributions(X)
+        np.testing.assert_allclose(proba, forest.predict_proba(X), atol=1e-12)
+        np.testing.assert_allclose(forest_explainer.bias + by_field.sum(axis=1), proba, atol=1e-12)
+        np.testing.assert_allclose(by_field, saabas_reference(forest, X, fields), atol=1e-12)
+
+
+def test_explainer_is_built_on_the_first_explain_request(app_module, client, valid_input):
+    app_module.explainer = None
+    assert client.post('/predict', json=valid_input).get_json()['success']
+    assert app_module.explainer is None
+    body = client.post('/predict', json=dict(valid_input, explain=True)).get_json()
+    assert 'explanation' in body
+    built = app_module.explainer
+    assert built is not None and built.nbytes > 0
+    client.post('/predict', json=dict(valid_input, explain=True))
+    assert app_module.explainer is built
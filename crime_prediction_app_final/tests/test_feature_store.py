@@ -0,0 +1,70 @@
+import json
+import os
+import sqlite3
+
+import joblib
+import numpy as np
+import pytest
+
+import feature_store
+import train_model
+from config import DB_PATH, ENCODER_PATH, FEATURE_STORE_DIR
+
+
+@pytest.fixture
+def source(workdir, tmp_path):
+    """A private copy of crime_data.db, so other tests' writes do not change its hash"""
+    path = str(tmp_path / 'crime_copy.db')
+    with sqlite3.connect(DB_PATH) as conn, sqlite3.connect(path) as copy:
+        conn.backup(copy)
+    yield path
+    feature_store.prune(path)
+
+
+def entries_for(source):
+    entries = []
+    for name in os.listdir(FEATURE_STORE_DIR):
+        meta = os.path.join(FEATURE_STORE_DIR, name, 'meta.json')
+        if os.path.exists(meta):
+            with open(meta) as f:
+                if json.load(f)['source'] == os.path.abspath(source):
+                    entries.append(name)
+    return entries
+
+
+def test_cached_features_match_a_fresh_build(app_module, source, monkeypatch):
+    encoder = joblib.load(ENCODER_PATH)
+    frame, X, y, _ = train_model.load_features(source, encoder, app_module.preprocessor)
+    assert len(entries_for(source)) == 1
+
+    def not_called(*args, **kwargs):
+        raise AssertionError("features were rebuilt instead of read from the store")
+
+    with monkeypatch.context() as patched:
+        patched.setattr(train_model, 'load_training_arrays', not_called)
+        cached_frame, cached_X, cached_y, _ = train_model.load_features(source, encoder, app_module.preprocessor)
+    assert (cached_X != X).nnz == 0
+    np.testing.assert_array_equal(cached_y, y)
+    assert cached_frame.equals(frame)
+
+    fresh = train_model.load_features(source, encoder, app_module.preprocessor, use_cache=False)
+    assert (fresh[1] != cached_X).nnz == 0
+
+
+def test_changed_source_gets_a_new_entry(app_module, source):
+    encoder = joblib.load(ENCODER_PATH)
+    _, X, _, _ = train_model.load_features(source, encoder, app_module.preprocessor)
+    first = entries_for(source)
+
+    with sqlite3.connect(source) as conn:
+        conn.execute('''
+            INSERT INTO crime_table ("ID", "Case Number", "Primary Type", "Description",
+                "Location Description", "Arrest", "Domestic", "District", "Crime Category",
+                "DayOfWeek", "HourofDay", "DayorNight")
+            VALUES (920001, 'HZ920001', 'THEFT', 'OVER $500', 'STREET', 0, 0, 1, 'Property Crime', 3, 22, 'NIGHT')
+        ''')
+    _, changed_X, _, _ = train_model.load_features(source, encoder, app_module.preprocessor)
+    assert changed_X.shape[0] == X.shape[0] + 1
+    second = entries_for(source)
+    # The entry for the old contents is pruned
+    assert len(second) == 1 and second != first
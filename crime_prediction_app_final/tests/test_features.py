@@ -0,0 +1,28 @@
+import joblib
+
+from config import DB_PATH, ENCODER_PATH
+from conftest import N_ROWS
+from features import load_labeled_frame, load_training_arrays
+
+
+def _predict(client, valid_input):
+    body = client.post('/predict', json=valid_input).get_json()
+    assert body['success'], body
+
+
+def test_training_arrays_skip_predicted_rows(client, db, valid_input):
+    _predict(client, valid_input)
+    encoder = joblib.load(ENCODER_PATH)
+    predicted = db.execute('SELECT COUNT(*) FROM crime_table WHERE "Case Number" LIKE \'JK%\'').fetchone()[0]
+    assert predicted > 0
+    frame, y = load_training_arrays(DB_PATH, encoder)
+    assert len(frame) == len(y) == N_ROWS
+    assert len(load_training_arrays(DB_PATH, encoder, include_predicted=True)[0]) == N_ROWS + predicted
+
+
+def test_labeled_frame_skips_predicted_rows(client, valid_input):
+    _predict(client, valid_input)
+    encoder = joblib.load(ENCODER_PATH)
+    frame = load_labeled_frame(DB_PATH, encoder)
+    assert len(frame) == N_ROWS
+    assert len(load_labeled_frame(DB_PATH, encoder, include_predicted=True)) > N_ROWS
@@ -0,0 +1,32 @@
+import numpy as np
+
+import forecast
+from conftest import DISTRICTS, N_ROWS
+
+
+def test_history_counts_only_incidents(db, client, valid_input):
+    assert client.post('/predict', json=valid_input).get_json()['success']
+    districts, counts = forecast.history(db)
+    assert districts.tolist() == DISTRICTS
+    assert counts.sum() == N_ROWS
+
+
+def test_forecast_is_cached_across_predictions(client, valid_input):
+    first = client.get('/forecast').get_json()
+    assert first['success'], first
+    assert first['rows'] == N_ROWS
+    assert client.get('/forecast').get_json()['cached']
+
+    assert client.post('/predict', json=valid_input).get_json()['success']
+    after = client.get('/forecast').get_json()
+    assert after['cached']
+    assert after['rows'] == N_ROWS
+
+
+def test_forecast_volume_matches_history(client):
+    body = client.get('/forecast').get_json()
+    weekly = sum(d['weekly_total'] for d in body['districts'].values())
+    np.testing.assert_allclose(weekly * body['data_weeks'], N_ROWS, rtol=1e-3)
+    one = client.get('/forecast?district=12').get_json()
+    assert list(one['districts']) == ['12']
+    assert client.get('/forecast?district=7').status_code == 404
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+pytest.importorskip('onnxruntime')
+pytest.importorskip('skl2onnx')
+
+from config import CATEGORICAL_FEATURES
+from features import records_frame
+from inference import predict_with_proba
+from onnx_model import OnnxPipeline, export, load_pipeline
+
+
+@pytest.fixture(scope='module')
+def exported(app_module, workdir):
+    path = str(workdir / 'pipeline_test.onnx')
+    export(app_module.model, app_module.preprocessor, path)
+    return path
+
+
+def test_onnx_pipeline_agrees_with_sklearn(app_module, table_combos, exported):
+    records = [dict(zip(CATEGORICAL_FEATURES, combo)) for combo in table_combos]
+    frame = records_frame(records, app_module.preprocessor)
+    expected, expected_probas = predict_with_proba(app_module.model, app_module.preprocessor.transform(frame))
+    labels, probas = OnnxPipeline(exported).predict(frame)
+    np.testing.assert_array_equal(labels, expected)
+    for proba, expected_proba in zip(probas, expected_probas):
+        np.testing.assert_allclose(proba, expected_proba, atol=1e-5)
+
+
+def test_load_pipeline_accepts_a_current_export(exported):
+    assert load_pipeline(exported) is not None
+
+
+def test_predict_serves_the_onnx_backend(app_module, client, valid_input, exported, monkeypatch):
+    body = dict(valid_input, tier='teacher')
+    expected = client.post('/predict', json=body).get_json()
+    monkeypatch.setattr(app_module, 'lookup_table', None)
+    monkeypatch.setattr(app_module, 'onnx_pipeline', load_pipeline(exported))
+    served = client.post('/predict', json=body).get_json()
+    assert served['success'], served
+    assert served['predictions'] == expected['predictions']
+    for target, probabilities in expected['probabilities'].items():
+        assert served['probabilities'][target] == pytest.approx(probabilities, abs=1e-4)
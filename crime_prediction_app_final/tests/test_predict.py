@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from config import CATEGORICAL_FEATURES
+from features import align_to_encoder, encoder_categories, records_frame
+
+
+def test_fitted_categories_are_notebook_typed(app_module):
+    categories = encoder_categories(app_module.preprocessor)
+    assert '12.0' in categories['District'].tolist()
+    for name in ('Domestic', 'DayOfWeek', 'HourofDay'):
+        assert categories[name].dtype.kind == 'i'
+
+
+def test_validator_returns_fitted_categories(app_module, valid_input):
+    record, errors = app_module.validator.validate(valid_input)
+    assert errors == []
+    assert record['District'] == '12.0'
+    assert record['HourofDay'] == 14 and record['Domestic'] == 0
+    assert record['DayorNight'] == 'DAY'
+    row = app_module.validator.row_values(record)
+    assert row['District'] == 12 and row['HourofDay'] == 14
+
+
+def test_records_frame_activates_every_feature(app_module, valid_input):
+    record, _ = app_module.validator.validate(valid_input)
+    X = app_module.preprocessor.transform(records_frame([record], app_module.preprocessor))
+    # drop='first' leaves one feature per first category without a column; none of these are first
+    ohe = app_module.preprocessor.named_transformers_['cat']
+    dropped = {name: categories[0] for name, categories in zip(CATEGORICAL_FEATURES, ohe.categories_)}
+    active = sum(record[name] != dropped[name] for name in CATEGORICAL_FEATURES)
+    assert X.getnnz() == active
+
+
+def test_predict_matches_the_forest_on_aligned_input(client, app_module, valid_input):
+    response = client.post('/predict', json=dict(valid_input, tier='teacher'))
+    body = response.get_json()
+    assert response.status_code == 200, body
+    # The lookup tier may answer a common input; it must give the forest's answer too
+    assert body['tier'] in ('teacher', 'lookup')
+
+    record, _ = app_module.validator.validate(valid_input)
+    X = app_module.preprocessor.transform(records_frame([record], app_module.preprocessor))
+    expected = app_module.model.estimators_[1].predict_proba(X)[0]
+    classes = app_module.model.estimators_[1].classes_
+    names = [app_module.CRIME_CATEGORY_MAPPING[int(c)]['name'] for c in classes]
+    got = np.array([body['probabilities']['category'][name] for name in names])
+    np.testing.assert_allclose(got, np.round(expected, 4))
+
+
+def test_explain_agrees_with_predict(client, valid_input):
+    plain = client.post('/predict', json=dict(valid_input, tier='teacher')).get_json()
+    explained = client.post('/predict', json=dict(valid_input, explain=True)).get_json()
+    assert explained['success'], explained
+    assert explained['probabilities'] == plain['probabilities']
+    assert 'explanation' in explained
+
+
+def test_predict_stores_integer_fields(client, db, valid_input):
+    body = client.post('/predict', json=valid_input).get_json()
+    assert body['success'], body
+    row = db.execute('SELECT "District", typeof("District"), "Domestic", "DayOfWeek", "HourofDay", '
+                     '"DayorNight" FROM crime_table WHERE "Case Number" = ?',
+                     (body['form_response'][1],)).fetchone()
+    assert row == (12, 'integer', 0, 4, 14, 'DAY')
+
+
+def test_invalid_input_is_reported(client, valid_input):
+    response = client.post('/predict', json=dict(valid_input, District='99'))
+    assert response.status_code == 400
+    assert response.get_json()['errors'][0]['code'] == 'out_of_range'
+
+
+def test_crime_table_rows_align_with_text_fitted_district(app_module, db):
+    frame = pd.read_sql_query('SELECT * FROM crime_table LIMIT 50', db)
+    aligned = align_to_encoder(frame, app_module.preprocessor)
+    fitted = set(encoder_categories(app_module.preprocessor)['District'].tolist())
+    assert set(aligned['District']) <= fitted
+    assert aligned['HourofDay'].dtype.kind == 'i'
+
+
+@pytest.mark.parametrize('requested, returned', [(0, 1), (-2, 1), (2, 2), (99, 5)])
+def test_top_k_is_clamped_to_the_classes(client, valid_input, requested, returned):
+    body = client.post('/predict', json=dict(valid_input, top_k=requested)).get_json()
+    assert body['success'], body
+    top = body['top_categories']
+    assert len(top) == returned
+    assert top[0]['category'] == body['predictions']['category']
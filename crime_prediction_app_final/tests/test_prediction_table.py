@@ -0,0 +1,72 @@
+import joblib
+import numpy as np
+
+from config import CATEGORICAL_FEATURES
+from conftest import TABLE_TOP, run_script
+from features import records_frame
+from inference import predict_with_proba
+from prediction_table import frequent_combinations, load_table, record_key
+
+
+def test_table_matches_the_current_artifacts(app_module):
+    assert app_module.lookup_table is not None
+
+
+def test_frequent_combinations_are_canonical(app_module, table_combos):
+    assert table_combos
+    for combo in table_combos:
+        record = dict(zip(CATEGORICAL_FEATURES, combo))
+        assert record['District'].endswith('.0')
+        assert isinstance(record['HourofDay'], int)
+        assert app_module.lookup_table.lookup(record) is not None
+
+
+def test_raw_spellings_share_a_key(app_module, valid_input):
+    record, _ = app_module.validator.validate(valid_input)
+    again, _ = app_module.validator.validate(dict(valid_input, District=12.0, Domestic=False))
+    assert record_key(record) == record_key(again)
+
+
+def test_lookup_tier_matches_the_forest(client, app_module, table_combos):
+    data = dict(zip(CATEGORICAL_FEATURES, table_combos[0]))
+    data.pop('DayorNight')
+    # Sent the way a client would: District as a plain number
+    data['District'] = int(float(data['District']))
+
+    body = client.post('/predict', json=data).get_json()
+    assert body['tier'] == 'lookup', body
+
+    record, _ = app_module.validator.validate(data)
+    X = app_module.preprocessor.transform(records_frame([record], app_module.preprocessor))
+    forest = app_module.model.estimators_[1]
+    names = [app_module.CRIME_CATEGORY_MAPPING[int(c)]['name'] for c in forest.classes_]
+    got = np.array([body['probabilities']['category'][name] for name in names])
+    np.testing.assert_allclose(got, np.round(forest.predict_proba(X)[0], 4))
+
+    explained = client.post('/predict', json=dict(data, explain=True)).get_json()
+    assert explained['tier'] == 'teacher'
+    assert explained['probabilities']['category'] == body['probabilities']['category']
+
+
+def test_table_is_refused_by_another_backend(app_module):
+    assert load_table(backend='sklearn') is not None
+    assert load_table(backend='quantized') is None
+
+
+def test_table_scored_by_the_quantized_backend(app_module, quantized_model):
+    run_script('prediction_table.py', '--top', str(TABLE_TOP), '--workers', '1',
+               '--backend', 'quantized', '--output', 'prediction_table_quantized.npy')
+    table = load_table('prediction_table_quantized.npy', backend='quantized')
+    assert table is not None and table.meta['backend'] == 'quantized'
+    assert load_table('prediction_table_quantized.npy', backend='sklearn') is None
+
+    # Built just now, so from the combinations crime_table holds now (/predict rows included)
+    combos = frequent_combinations(app_module.preprocessor, TABLE_TOP)
+    records = [dict(zip(CATEGORICAL_FEATURES, combo)) for combo in combos]
+    X = app_module.preprocessor.transform(records_frame(records, app_module.preprocessor))
+    labels, probas = predict_with_proba(joblib.load(quantized_model, mmap_mode='r'), X)
+    for i, record in enumerate(records):
+        hit_labels, hit_probas = table.lookup(record)
+        np.testing.assert_array_equal(hit_labels[0], labels[i])
+        for hit, proba in zip(hit_probas, probas):
+            np.testing.assert_allclose(hit[0], proba[i], atol=1e-6)
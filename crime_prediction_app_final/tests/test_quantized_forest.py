@@ -0,0 +1,48 @@
+import joblib
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from config import CATEGORICAL_FEATURES
+from features import records_frame
+from inference import predict_with_proba
+from quantized_forest import LEAF_SCALE, QuantizedForest
+
+
+@pytest.fixture(scope='module')
+def quantized(quantized_model):
+    return joblib.load(quantized_model, mmap_mode='r')
+
+
+def test_quantized_agrees_with_the_full_forest(app_module, quantized, table_combos):
+    records = [dict(zip(CATEGORICAL_FEATURES, combo)) for combo in table_combos]
+    X = app_module.preprocessor.transform(records_frame(records, app_module.preprocessor))
+    expected_labels, expected = predict_with_proba(app_module.model, X)
+    labels, probas = predict_with_proba(quantized, X)
+    for t, (proba, full) in enumerate(zip(probas, expected)):
+        # Each leaf is rounded to 1/255; the forest averages those roundings
+        assert np.abs(proba - full).max() <= 0.5 / LEAF_SCALE + 1e-9
+        # Labels can differ only where the forest's top two classes nearly tie
+        differ = labels[:, t] != expected_labels[:, t]
+        top_two = np.sort(full, axis=1)[:, -2:]
+        assert np.all(top_two[differ, 1] - top_two[differ, 0] <= 1 / LEAF_SCALE)
+    assert quantized.nbytes > 0
+
+
+def test_predict_serves_the_quantized_backend(app_module, client, quantized, valid_input, monkeypatch):
+    body = dict(valid_input, tier='teacher')
+    expected = client.post('/predict', json=body).get_json()
+    monkeypatch.setattr(app_module, 'lookup_table', None)
+    monkeypatch.setattr(app_module, 'serving_model', quantized)
+    served = client.post('/predict', json=body).get_json()
+    assert served['success'], served
+    assert served['predictions'] == expected['predictions']
+    for target, probabilities in expected['probabilities'].items():
+        assert served['probabilities'][target] == pytest.approx(probabilities, abs=0.5 / LEAF_SCALE + 1e-4)
+
+
+def test_non_binary_splits_are_refused():
+    rng = np.random.default_rng(0)
+    X, y = rng.random((100, 3)) * 10, rng.integers(0, 2, 100)
+    with pytest.raises(ValueError):
+        QuantizedForest(RandomForestClassifier(n_estimators=2, random_state=0).fit(X, y))
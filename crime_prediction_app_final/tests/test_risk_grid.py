@@ -0,0 +1,51 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from features import records_frame
+from risk_grid import DAYS, HOURS, day_or_night, grid_matrix
+
+FIXED = ('Primary Type', 'Description', 'Location Description', 'Domestic')
+
+
+def cell_records(app_module, valid_input, districts):
+    record, errors = app_module.validator.validate(valid_input, list(FIXED))
+    assert errors == []
+    fixed = {name: record[name] for name in FIXED}
+    records = [dict(fixed, District=district, HourofDay=hour, DayorNight=day_or_night(hour), DayOfWeek=day)
+               for district, hour, day in itertools.product(districts, HOURS, DAYS)]
+    return fixed, records
+
+
+def test_grid_matrix_equals_the_preprocessor(app_module, valid_input):
+    districts = app_module.encoder_categories(app_module.preprocessor)['District'].tolist()
+    fixed, records = cell_records(app_module, valid_input, districts)
+    expected = app_module.preprocessor.transform(records_frame(records, app_module.preprocessor))
+    actual = grid_matrix(app_module.encoded_columns, fixed, districts)
+    assert actual.shape == expected.shape
+    assert (actual != expected).nnz == 0
+
+
+def test_risk_grid_cells_match_per_row_predict(app_module, client, valid_input):
+    body = client.get('/risk-grid', query_string=valid_input).get_json()
+    assert body['success'], body
+    districts = sorted(app_module.encoder_categories(app_module.preprocessor)['District'],
+                       key=lambda d: int(float(d)))
+    assert body['axes']['District'] == [int(float(d)) for d in districts]
+    assert body['shape'] == [len(districts), len(HOURS), len(DAYS)]
+
+    _, records = cell_records(app_module, valid_input, districts)
+    arrest_forest, category_forest = app_module.model.estimators_
+    weights = np.array([app_module.RISK_LEVEL_WEIGHTS[app_module.CRIME_CATEGORY_MAPPING[int(c)]['risk']]
+                        for c in category_forest.classes_])
+    for i in np.random.default_rng(0).choice(len(records), size=60, replace=False):
+        X = app_module.preprocessor.transform(records_frame([records[i]], app_module.preprocessor))
+        arrest = arrest_forest.predict_proba(X)[0][list(arrest_forest.classes_).index(1)]
+        category = category_forest.predict_proba(X)[0]
+        assert body['arrest_probability'][i] == round(float(arrest), 3)
+        assert body['top_category'][i] == int(category_forest.classes_[category.argmax()])
+        assert body['risk'][i] == pytest.approx(category @ weights, abs=1e-3)
+
+    again = client.get('/risk-grid', query_string=valid_input).get_json()
+    assert again['cached'] and again['risk'] == body['risk']
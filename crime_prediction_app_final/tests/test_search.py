@@ -0,0 +1,32 @@
+import sqlite3
+
+import text_search
+from config import TABLE_NAME
+
+
+def test_index_ready_only_reads(tmp_path):
+    path = str(tmp_path / 'bare.db')
+    conn = sqlite3.connect(path)
+    conn.execute(f'CREATE TABLE "{TABLE_NAME}" ("Description" TEXT, "Location Description" TEXT)')
+    conn.close()
+    assert not text_search.index_ready(path)
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()[0] == 1
+    conn.close()
+
+    assert text_search.ensure_index(path)
+    assert text_search.index_ready(path)
+
+
+def test_search_ranks_and_pages(client, app_module):
+    assert app_module.search_enabled
+    first = client.get('/search', query_string={'q': 'over 50', 'per_page': 5}).get_json()
+    assert first['success'], first
+    assert first['results'] and all('OVER $500' in row['Description'] for row in first['results'])
+    assert first['has_more']
+
+
+def test_predicted_rows_are_searchable_at_once(client, valid_input):
+    case = client.post('/predict', json=dict(valid_input, Description='RETAIL THEFT')).get_json()['form_response'][1]
+    body = client.get('/search', query_string={'q': 'retail', 'order': 'recent', 'per_page': 1}).get_json()
+    assert body['results'][0]['Case Number'] == case
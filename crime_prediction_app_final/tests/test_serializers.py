@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+from flask import Flask, jsonify
+
+import serializers
+
+
+def json_app(debug, compact=None):
+    app = Flask(__name__)
+    app.json = serializers.FastJSONProvider(app)
+    app.json.compact = compact
+    app.debug = debug
+
+    @app.route('/data')
+    def data():
+        return jsonify({'rows': [1, 2], 'value': np.float32(0.5)})
+
+    return app
+
+
+def test_debug_mode_keeps_compact_json():
+    body = json_app(debug=True).test_client().get('/data').get_data(as_text=True)
+    assert body == '{"rows":[1,2],"value":0.5}'
+
+
+def test_indented_json_only_when_asked_for():
+    body = json_app(debug=False, compact=False).test_client().get('/data').get_data(as_text=True)
+    assert '\n  ' in body
+
+
+@pytest.mark.skipif(serializers.msgpack is None, reason="msgpack not installed")
+def test_msgpack_is_negotiated():
+    response = json_app(debug=True).test_client().get('/data', headers={'Accept': 'application/msgpack'})
+    assert response.mimetype == 'application/msgpack'
+    assert serializers.msgpack.unpackb(response.get_data())['rows'] == [1, 2]
+
+
+@pytest.mark.parametrize('accept, gzipped', [
+    ('gzip', True), ('deflate, GZIP;q=0.5', True), ('gzip;q=0', False), ('gzip; q=0.000', False),
+    ('br', False), ('', False)
+])
+def test_gzip_follows_q_values(accept, gzipped):
+    app = json_app(debug=False)
+    app.after_request(serializers.compress_response)
+
+    @app.route('/large')
+    def large():
+        return jsonify({'rows': list(range(2000))})
+
+    response = app.test_client().get('/large', headers={'Accept-Encoding': accept})
+    assert (response.headers.get('Content-Encoding') == 'gzip') == gzipped
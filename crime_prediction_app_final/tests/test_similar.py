@@ -0,0 +1,45 @@
+import sqlite3
+
+from config import DB_PATH
+
+
+def test_predicted_rows_are_not_their_own_match(client, valid_input):
+    assert client.post('/predict', json=valid_input).get_json()['success']
+    body = client.post('/similar', json=dict(valid_input, n=20)).get_json()
+    assert body['success'], body
+    assert body['count'] == 20
+    assert not [row for row in body['incidents'] if row['Case Number'].startswith('JK')]
+    scores = [row['similarity'] for row in body['incidents']]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_new_incidents_are_caught_up(client, db, valid_input):
+    before = client.get('/similar', query_string=valid_input).get_json()['indexed_rows']
+    rowid = db.execute('''
+        INSERT INTO crime_table ("ID", "Case Number", "Primary Type", "Description",
+            "Location Description", "Arrest", "Domestic", "District", "Crime Category",
+            "DayOfWeek", "HourofDay", "DayorNight")
+        VALUES (900001, 'HZ900001', 'THEFT', 'OVER $500', 'STREET', 0, 0, 12, 'Property Crime', 4, 14, 'DAY')
+    ''').lastrowid
+    db.commit()
+    body = client.get('/similar', query_string=dict(valid_input, n=1)).get_json()
+    assert body['indexed_rows'] == before + 1
+    top = body['incidents'][0]
+    assert top['Case Number'] == 'HZ900001' and top['similarity'] == 1.0
+    db.execute('DELETE FROM crime_table WHERE rowid = ?', (rowid,))
+    db.commit()
+
+
+def test_invalid_record_is_rejected(client, valid_input):
+    response = client.post('/similar', json=dict(valid_input, HourofDay=30))
+    assert response.status_code == 400
+
+
+def test_watermark_passes_predicted_rows(app_module, client, db, valid_input):
+    index = app_module.similar_index
+    assert client.post('/predict', json=valid_input).get_json()['success']
+    client.get('/similar', query_string=valid_input)
+    top = db.execute('SELECT MAX(rowid) FROM crime_table').fetchone()[0]
+    assert index.watermark == top
+    with sqlite3.connect(DB_PATH) as conn:
+        assert index.catch_up(conn) == 0
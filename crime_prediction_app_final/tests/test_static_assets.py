@@ -0,0 +1,51 @@
+import gzip
+import os
+import re
+
+import static_assets
+
+
+def asset_urls(page):
+    return re.findall(r'/assets/(app\.[0-9a-f]{12}\.(?:css|js))', page)
+
+
+def source_name(hashed):
+    """app.3f2a9c1b7d4e.css -> app.css"""
+    stem, _, ext = hashed.split('.')
+    return f'{stem}.{ext}'
+
+
+def test_page_links_content_hashed_assets(client):
+    response = client.get('/', headers={'Accept-Encoding': 'identity'})
+    assert response.status_code == 200
+    assert response.headers['Cache-Control'] == static_assets.REVALIDATE
+    names = asset_urls(response.get_data(as_text=True))
+    assert sorted(source_name(name) for name in names) == sorted(static_assets.VERSIONED)
+    for name in names:
+        served = client.get(f'/assets/{name}', headers={'Accept-Encoding': 'identity'})
+        assert served.status_code == 200
+        assert served.headers['Cache-Control'] == static_assets.IMMUTABLE
+        with open(os.path.join(static_assets.STATIC_DIR, source_name(name)), 'rb') as f:
+            assert served.get_data() == f.read()
+
+
+def test_gzip_and_revalidation(client):
+    name = asset_urls(client.get('/').get_data(as_text=True))[0]
+    plain = client.get(f'/assets/{name}', headers={'Accept-Encoding': 'identity'})
+    zipped = client.get(f'/assets/{name}', headers={'Accept-Encoding': 'gzip'})
+    assert zipped.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(zipped.get_data()) == plain.get_data()
+    assert zipped.headers['ETag'] != plain.headers['ETag']
+
+    refused = client.get(f'/assets/{name}', headers={'Accept-Encoding': 'gzip;q=0'})
+    assert 'Content-Encoding' not in refused.headers
+
+    # Either encoding's ETag validates the asset
+    for etag in (plain.headers['ETag'], zipped.headers['ETag']):
+        again = client.get(f'/assets/{name}', headers={'If-None-Match': etag})
+        assert again.status_code == 304 and again.get_data() == b''
+
+
+def test_unknown_asset_is_not_found(client):
+    assert client.get('/assets/app.000000000000.js').status_code == 404
+    assert client.get(f'/assets/{static_assets.PAGE}').status_code == 404
@@ -0,0 +1,46 @@
+import joblib
+import numpy as np
+import pytest
+
+from config import DB_PATH, ENCODER_PATH, TARGETS
+from features import iter_labeled_chunks
+from train_model import assemble_forest, check_forest, encode, fit_tree, train_out_of_core
+
+
+@pytest.fixture
+def encoder(workdir):
+    return joblib.load(ENCODER_PATH)
+
+
+@pytest.mark.parametrize('reuse_preprocessor', [True, False])
+def test_out_of_core_forest_covers_every_class(app_module, encoder, reuse_preprocessor):
+    preprocessor = app_module.preprocessor if reuse_preprocessor else None
+    # About 20 rows per tree, so most trees never see the rarest categories
+    model, preprocessor = train_out_of_core(DB_PATH, encoder, preprocessor, n_trees=6, sample_rows=20,
+                                            group_size=3, chunksize=500, n_jobs=1)
+    chunk = next(iter_labeled_chunks(DB_PATH, encoder, 300))
+    X = encode(chunk, preprocessor)
+    for forest, target in zip(model.estimators_, TARGETS):
+        assert forest.classes_.tolist() == sorted(chunk[target].unique().tolist())
+        assert all(tree.classes_.tolist() == forest.classes_.tolist() for tree in forest.estimators_)
+    probas = model.predict_proba(X)
+    assert [p.shape for p in probas] == [(300, 2), (300, 5)]
+    assert model.predict(X).shape == (300, 2)
+
+
+def test_check_forest_rejects_short_trees(app_module, encoder):
+    chunk = next(iter_labeled_chunks(DB_PATH, encoder, 200))
+    X = encode(chunk, app_module.preprocessor)
+    y = chunk['Crime Category'].to_numpy()
+    full = fit_tree(X, y, np.ones(len(y)), {label: 1.0 for label in range(5)}, 0)
+    rows = y != 3
+    short = fit_tree(X[rows], y[rows], np.ones(rows.sum()), {label: 1.0 for label in range(5)}, 1)
+    assert len(short.classes_) == 4
+
+    params = {'n_estimators': 2, 'max_features': 'sqrt', 'random_state': 0}
+    forest = assemble_forest([full, short], range(5), X.shape[1], params)
+    check_forest(forest, X)
+
+    forest.estimators_[1] = fit_tree(X[rows], y[rows], np.ones(rows.sum()), {label: 1.0 for label in range(5)}, 1)
+    with pytest.raises((RuntimeError, ValueError)):
+        check_forest(forest, X)
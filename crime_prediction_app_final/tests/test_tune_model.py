@@ -0,0 +1,31 @@
+import io
+
+import pytest
+
+from tune_model import hyperband
+
+
+class RecordingPool:
+    """Stands in for the process pool: records the trials and scores them by their rows"""
+
+    def __init__(self):
+        self.trials = []
+
+    def map(self, func, trials):
+        trials = list(trials)
+        self.trials.extend(trials)
+        return [{**trial, 'objective': trial['rows'] / 1e6,
+                 'accuracy': [0.5, 0.5], 'size_mb': 1.0, 'latency_ms': 1.0} for trial in trials]
+
+
+def test_hyperband_rejects_max_rows_below_min_rows():
+    with pytest.raises(ValueError, match='at least min_rows'):
+        hyperband(RecordingPool(), 1000, 2000, 3, 0, io.StringIO())
+
+
+def test_hyperband_runs_one_bracket_when_rows_are_equal():
+    pool = RecordingPool()
+    best = hyperband(pool, 1000, 1000, 3, 0, io.StringIO())
+    assert best is not None
+    assert {trial['bracket'] for trial in pool.trials} == {0}
+    assert all(trial['rows'] == 1000 for trial in pool.trials)
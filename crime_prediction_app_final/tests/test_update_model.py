@@ -0,0 +1,29 @@
+import joblib
+import numpy as np
+
+from config import DB_PATH, ENCODER_PATH, MODEL_PATH
+from features import iter_labeled_chunks
+from train_model import encode
+from update_model import add_trees
+
+
+def test_batch_missing_a_category_votes_for_the_right_classes(app_module):
+    encoder = joblib.load(ENCODER_PATH)
+    forest = joblib.load(MODEL_PATH).estimators_[1]
+    chunk = next(iter_labeled_chunks(DB_PATH, encoder, 800))
+    X = encode(chunk, app_module.preprocessor)
+    y = chunk['Crime Category'].to_numpy()
+    rows = y != 2
+    assert set(y[rows]) == {0, 1, 3, 4}
+
+    # Retire every old tree so the forest holds only the new batch
+    add_trees(forest, X[rows], y[rows], n_trees=5, max_trees=5, seed=7)
+    assert len(forest.estimators_) == 5
+    proba = forest.predict_proba(X)
+    assert proba.shape == (X.shape[0], 5)
+    assert np.all(proba[:, 2] == 0)
+    np.testing.assert_allclose(proba.sum(axis=1), 1)
+    # Fitted on the rows it now predicts, the batch recovers their classes
+    predicted = forest.predict(X[rows])
+    assert 2 not in predicted
+    assert (predicted[y[rows] == 3] == 3).mean() > 0.5
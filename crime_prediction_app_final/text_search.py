@@ -0,0 +1,242 @@
+# text_search.py
+# Full-text search over crime_table's Description and Location Description.
+#
+# SEARCH_TABLE is an external-content FTS5 table over crime_table: it stores
+# only the inverted index (plus prefix indexes for 2- and 3-character
+# prefixes) and reads the text itself from crime_table by rowid. Triggers on
+# crime_table keep it in sync on insert, update and delete, so rows written
+# by /predict are searchable immediately. ensure_index() creates the tables,
+# index and triggers and rebuilds when any are missing - e.g. after
+# load_dataset.py replaced crime_table, which drops its triggers. It writes
+# to the database and can rebuild for minutes, so it only runs from the
+# command line below; the app just checks index_ready() at startup.
+#
+# search() turns free text into an FTS5 query in which every word is a
+# prefix ("over 50" matches "OVER $500") and pages with LIMIT / OFFSET,
+# fetching one extra row to report whether more follow:
+#   - order=recent walks SEARCH_TABLE's doclist newest first and stops after
+#     one page, whatever the number of matches;
+#   - order=rank ranks with BM25 (Description weighted above Location
+#     Description). BM25 needs statistics over every match, which is slow for
+#     common words across millions of rows - but the two columns hold only a
+#     few thousand distinct text pairs, and rows with the same text score the
+#     same. So a second FTS5 table indexes the distinct pairs (kept by the
+#     same triggers), is ranked instead, and each pair's rows are read newest
+#     first through an index on the two columns.
+#
+# Usage:
+#   python text_search.py                  # create / repair the index, then benchmark (run after load_dataset.py)
+#   python text_search.py --rebuild        # rebuild from crime_table
+#   python text_search.py --query "theft street"
+import argparse
+import re
+import sqlite3
+import time
+
+from config import DB_PATH, TABLE_NAME, SEARCH_TABLE
+
+SEARCH_FIELDS = {'description': 'Description', 'location': 'Location Description'}
+# BM25 weights, in SEARCH_FIELDS order
+FIELD_WEIGHTS = (2.0, 1.0)
+MAX_PER_PAGE = 100
+MAX_TERMS = 8
+
+PAIRS_TABLE = f'{SEARCH_TABLE}_pairs'
+PAIRS_SEARCH_TABLE = f'{SEARCH_TABLE}_pairs_text'
+TEXT_INDEX = f'{SEARCH_TABLE}_text_idx'
+
+_columns = ', '.join(f'"{c}"' for c in SEARCH_FIELDS.values())
+_new_values = ', '.join(f'new."{c}"' for c in SEARCH_FIELDS.values())
+_old_values = ', '.join(f'old."{c}"' for c in SEARCH_FIELDS.values())
+_same_text = ' AND '.join(f'"{c}" = ?' for c in SEARCH_FIELDS.values())
+
+TRIGGERS = {
+    f'{SEARCH_TABLE}_ai': f'''
+        CREATE TRIGGER IF NOT EXISTS "{SEARCH_TABLE}_ai" AFTER INSERT ON "{TABLE_NAME}" BEGIN
+            INSERT INTO "{SEARCH_TABLE}"(rowid, {_columns}) VALUES (new.rowid, {_new_values});
+            INSERT OR IGNORE INTO "{PAIRS_TABLE}"({_columns}) VALUES ({_new_values});
+        END''',
+    f'{SEARCH_TABLE}_ad': f'''
+        CREATE TRIGGER IF NOT EXISTS "{SEARCH_TABLE}_ad" AFTER DELETE ON "{TABLE_NAME}" BEGIN
+            INSERT INTO "{SEARCH_TABLE}"("{SEARCH_TABLE}", rowid, {_columns})
+            VALUES ('delete', old.rowid, {_old_values});
+        END''',
+    f'{SEARCH_TABLE}_au': f'''
+        CREATE TRIGGER IF NOT EXISTS "{SEARCH_TABLE}_au" AFTER UPDATE ON "{TABLE_NAME}" BEGIN
+            INSERT INTO "{SEARCH_TABLE}"("{SEARCH_TABLE}", rowid, {_columns})
+            VALUES ('delete', old.rowid, {_old_values});
+            INSERT INTO "{SEARCH_TABLE}"(rowid, {_columns}) VALUES (new.rowid, {_new_values});
+            INSERT OR IGNORE INTO "{PAIRS_TABLE}"({_columns}) VALUES ({_new_values});
+        END''',
+    # Fires only for pairs not seen before (OR IGNORE skips the rest). Pairs
+    # whose rows were all deleted stay indexed; they simply yield no rows.
+    f'{PAIRS_TABLE}_ai': f'''
+        CREATE TRIGGER IF NOT EXISTS "{PAIRS_TABLE}_ai" AFTER INSERT ON "{PAIRS_TABLE}" BEGIN
+            INSERT INTO "{PAIRS_SEARCH_TABLE}"(rowid, {_columns}) VALUES (new.rowid, {_new_values});
+        END'''
+}
+
+
+def _create_fts(conn, table, content):
+    conn.execute(f'''
+        CREATE VIRTUAL TABLE IF NOT EXISTS "{table}" USING fts5(
+            {_columns}, content='{content}', content_rowid='rowid', prefix='2 3')''')
+    weights = ', '.join(str(w) for w in FIELD_WEIGHTS)
+    conn.execute(f'INSERT INTO "{table}"("{table}", rank) VALUES (\'rank\', ?)', (f'bm25({weights})',))
+
+
+def rebuild(conn):
+    """Re-index every crime_table row and text pair, merging each index into one segment"""
+    conn.execute(f'DELETE FROM "{PAIRS_TABLE}"')
+    conn.execute(f'INSERT OR IGNORE INTO "{PAIRS_TABLE}"({_columns}) '
+                 f'SELECT DISTINCT {_columns} FROM "{TABLE_NAME}"')
+    for table in (SEARCH_TABLE, PAIRS_SEARCH_TABLE):
+        conn.execute(f'INSERT INTO "{table}"("{table}") VALUES (\'rebuild\')')
+        conn.execute(f'INSERT INTO "{table}"("{table}") VALUES (\'optimize\')')
+    conn.commit()
+
+
+def index_ready(db_path=DB_PATH):
+    """True if the FTS tables, text index and sync triggers all exist (read-only check)"""
+    conn = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True)
+    try:
+        existing = {name for (name,) in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type IN ('table', 'index', 'trigger')")}
+    finally:
+        conn.close()
+    return {SEARCH_TABLE, PAIRS_TABLE, PAIRS_SEARCH_TABLE, TEXT_INDEX, *TRIGGERS} <= existing
+
+
+def ensure_index(db_path=DB_PATH, force_rebuild=False):
+    """Create the FTS tables, text index and triggers if needed; True if the index was (re)built"""
+    conn = sqlite3.connect(db_path)
+    try:
+        existing = {name for (name,) in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type IN ('table', 'index', 'trigger')")}
+        if TABLE_NAME not in existing:
+            raise RuntimeError(f"{TABLE_NAME} does not exist in {db_path}")
+        # Replacing crime_table drops its triggers and index with it
+        stale = force_rebuild or not ({TEXT_INDEX, *TRIGGERS} <= existing)
+        if SEARCH_TABLE not in existing or PAIRS_SEARCH_TABLE not in existing:
+            conn.execute(f'CREATE TABLE IF NOT EXISTS "{PAIRS_TABLE}"({_columns}, UNIQUE({_columns}))')
+            _create_fts(conn, SEARCH_TABLE, TABLE_NAME)
+            _create_fts(conn, PAIRS_SEARCH_TABLE, PAIRS_TABLE)
+            stale = True
+        conn.execute(f'CREATE INDEX IF NOT EXISTS "{TEXT_INDEX}" ON "{TABLE_NAME}"({_columns})')
+        for sql in TRIGGERS.values():
+            conn.execute(sql)
+        conn.commit()
+        if stale:
+            rebuild(conn)
+        return stale
+    finally:
+        conn.close()
+
+
+def match_expression(text, fields=None):
+    """FTS5 query for free text: every word a quoted prefix term, all required
+
+    Quoting each word keeps user input from being read as FTS5 syntax. Returns
+    None when the text has no searchable words.
+    """
+    words = re.findall(r'\w+', text.lower())[:MAX_TERMS]
+    if not words:
+        return None
+    expression = ' '.join(f'"{word}"*' for word in words)
+    if fields:
+        columns = ' '.join(f'"{SEARCH_FIELDS[field]}"' for field in fields)
+        expression = f'{{{columns}}} : ({expression})'
+    return expression
+
+
+def _recent(cursor, expression, limit, offset):
+    rows = cursor.execute(f'''
+        SELECT c.* FROM (
+            SELECT rowid FROM "{SEARCH_TABLE}" WHERE "{SEARCH_TABLE}" MATCH ?
+            ORDER BY rowid DESC LIMIT ? OFFSET ?
+        ) AS f JOIN "{TABLE_NAME}" AS c ON c.rowid = f.rowid
+        ORDER BY f.rowid DESC''', (expression, limit, offset)).fetchall()
+    return [dict(row) for row in rows]
+
+
+def _ranked(cursor, expression, limit, offset):
+    pairs = cursor.execute(f'''
+        SELECT {', '.join(f'p."{c}"' for c in SEARCH_FIELDS.values())}, -f.rank AS score
+        FROM "{PAIRS_SEARCH_TABLE}" AS f JOIN "{PAIRS_TABLE}" AS p ON p.rowid = f.rowid
+        WHERE "{PAIRS_SEARCH_TABLE}" MATCH ?
+        ORDER BY f.rank''', (expression,)).fetchall()
+    results = []
+    for pair in pairs:
+        text = tuple(pair)[:len(SEARCH_FIELDS)]
+        if offset:
+            # Whole pairs before the requested page are only counted (index-only)
+            count = cursor.execute(f'SELECT COUNT(*) FROM "{TABLE_NAME}" WHERE {_same_text}',
+                                   text).fetchone()[0]
+            if count <= offset:
+                offset -= count
+                continue
+        rows = cursor.execute(f'''
+            SELECT * FROM "{TABLE_NAME}" WHERE {_same_text}
+            ORDER BY rowid DESC LIMIT ? OFFSET ?''', (*text, limit - len(results), offset)).fetchall()
+        offset = 0
+        for row in rows:
+            result = dict(row)
+            result['score'] = round(pair['score'], 4)
+            results.append(result)
+        if len(results) >= limit:
+            break
+    return results
+
+
+def search(conn, text, fields=None, page=1, per_page=20, order='rank'):
+    """(rows, has_more) for one page of matches, as crime_table dicts
+
+    order='rank': best BM25 first, newest first among equal text, with a
+    'score' per row; order='recent': newest first.
+    """
+    expression = match_expression(text, fields)
+    if expression is None:
+        return [], False
+    cursor = conn.cursor()
+    cursor.row_factory = sqlite3.Row
+    fetch = _ranked if order == 'rank' else _recent
+    rows = fetch(cursor, expression, per_page + 1, (page - 1) * per_page)
+    return rows[:per_page], len(rows) > per_page
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Create, rebuild or query the crime_table full-text index")
+    parser.add_argument('--db', default=DB_PATH)
+    parser.add_argument('--rebuild', action='store_true')
+    parser.add_argument('--query', help="print the first page for this text")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    built = ensure_index(args.db, args.rebuild)
+    conn = sqlite3.connect(args.db)
+    indexed = conn.execute(f'SELECT COUNT(*) FROM "{TABLE_NAME}"').fetchone()[0]
+    if built:
+        print(f"✅ Indexed {indexed:,} rows in {time.perf_counter() - start:.1f}s")
+    else:
+        print(f"✅ Index up to date ({indexed:,} rows)")
+
+    if args.query:
+        rows, has_more = search(conn, args.query)
+        for row in rows:
+            print(f"   {row['score']:8.3f}  {row['Description']} @ {row['Location Description']}")
+        print(f"   more pages: {has_more}")
+    else:
+        # Latency over common words of the indexed text, full words and prefixes
+        words = [w.lower() for (text,) in conn.execute(
+            f'SELECT "Description" FROM "{TABLE_NAME}" LIMIT 200') for w in re.findall(r'\w+', text or '')]
+        queries = sorted(set(words))[:50] + sorted({w[:3] for w in words if len(w) >= 3})[:50]
+        for order in ('rank', 'recent'):
+            timings = []
+            for query in queries:
+                t = time.perf_counter()
+                search(conn, query, order=order)
+                timings.append(time.perf_counter() - t)
+            timings.sort()
+            print(f"⚡ {len(queries)} queries, order={order}: "
+                  f"p50 {timings[len(timings) // 2] * 1000:.2f} ms, max {timings[-1] * 1000:.2f} ms")
+    conn.close()
@@ -0,0 +1,370 @@
+# train_model.py
+# Supported training path for the multi-target forest.
+#
+# Default (in memory, sparse end to end): only the eight feature columns and
+# two targets are read, features are kept as pandas categoricals, targets as
+# an int8 (n, 2) array, and the ColumnTransformer's one-hot output stays a
+# CSR matrix through the split and the fit - unlike the notebook's first
+# variant, nothing goes through pd.get_dummies or a dense frame. Peak RSS is
+# reported per stage; --compare-dense measures the notebook's get_dummies
+# preparation in a separate process for comparison. The cleaned frame and
+# encoded matrix are cached in the feature store (feature_store.py) and reused
+# by later runs, tune_model.py and evaluation until the source or the cleaning
+# code changes; --no-cache rebuilds them.
+#
+# --out-of-core: for data that does not fit in memory. Rows are streamed in
+# chunks from the training CSV, crime_data.db or the Parquet store and one-hot
+# encoded chunk by chunk into float32 CSR. Each tree is grown on its own
+# bootstrap sample drawn on the fly with Poisson(m / N) row counts (online
+# bagging), so a tree sees about --sample-rows rows (sklearn's max_samples)
+# instead of the whole history. Trees are grown in groups, one streaming pass
+# per group, which bounds memory at --group-size x --sample-rows encoded rows.
+# class_weight='balanced' is applied through sample weights computed from the
+# full-data class counts. A small sample can miss a rare class; such a tree's
+# class columns are re-indexed onto the full class list before the forest is
+# assembled, and the assembled forest's predict_proba is checked on a sample.
+#
+# Both produce the same RandomForestClassifier-inside-MultiOutputClassifier
+# structure the notebook saves, so every other tool can load the result.
+#
+# Usage:
+#   python train_model.py --source crime_data_finalfortraining.csv [--compare-dense]
+#   python train_model.py --out-of-core --source crime_data.db --sample-rows 1000000
+import argparse
+import multiprocessing
+import sys
+import time
+
+import joblib
+import numpy as np
+import scipy.sparse as sp
+from joblib import Parallel, delayed
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import train_test_split
+from sklearn.multioutput import MultiOutputClassifier
+from sklearn.preprocessing import OneHotEncoder
+from sklearn.tree import DecisionTreeClassifier
+
+import feature_store
+from config import PREPROCESSOR_PATH, ENCODER_PATH, CATEGORICAL_FEATURES, TARGETS
+from features import (TRAINING_CSV, TEST_SIZE, RANDOM_STATE, iter_labeled_chunks,
+                      align_to_encoder, load_training_arrays, load_labeled_frame)
+from update_model import expand_classes
+
+OUTPUT_MODEL_PATH = 'multi_target_rf_model_trained.pkl'
+OUTPUT_PREPROCESSOR_PATH = 'preprocessor_trained.pkl'
+
+# The notebook's forest settings
+FOREST_PARAMS = {'n_estimators': 200, 'max_features': 'sqrt',
+                 'random_state': 42, 'class_weight': 'balanced'}
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MB (None if unavailable)"""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports KB, macOS bytes
+        return peak / 1e6 if sys.platform == 'darwin' else peak / 1024
+    except ImportError:
+        try:
+            import psutil
+            info = psutil.Process().memory_info()
+            return getattr(info, 'peak_wset', info.rss) / 1e6
+        except ImportError:
+            return None
+
+
+def _report_stage(report, stage):
+    report[stage] = peak_rss_mb()
+    if report[stage] is not None:
+        print(f"   {stage:<10} peak RSS {report[stage]:,.0f} MB")
+
+
+def new_preprocessor():
+    """The notebook's ColumnTransformer, forced to keep sparse output"""
+    return ColumnTransformer(
+        transformers=[('cat', OneHotEncoder(handle_unknown='ignore', drop='first'),
+                       CATEGORICAL_FEATURES)],
+        remainder='passthrough',
+        sparse_threshold=1.0
+    )
+
+
+def _encode_features(frame, preprocessor):
+    if preprocessor is None:
+        preprocessor = new_preprocessor()
+        X = preprocessor.fit_transform(frame)
+    else:
+        X = preprocessor.transform(align_to_encoder(frame, preprocessor))
+    return sp.csr_matrix(X, dtype=np.float32), preprocessor
+
+
+def load_features(source, encoder, preprocessor=None, report=None, use_cache=True):
+    """Cleaned frame, CSR design matrix, int targets and preprocessor for `source`
+
+    Served from the feature store when an entry for the same source contents
+    and pipeline code exists; otherwise built and stored.
+    """
+    report = {} if report is None else report
+    key = None
+    if use_cache:
+        key = feature_store.entry_key(source, PIPELINE_FUNCTIONS, encoder, preprocessor)
+        cached = feature_store.load(key)
+        if cached is not None:
+            print(f"💾 Loaded features from the feature store ({key})")
+            _report_stage(report, 'load')
+            _report_stage(report, 'encode')
+            return cached
+
+    frame, y = load_training_arrays(source, encoder)
+    _report_stage(report, 'load')
+    X, preprocessor = _encode_features(frame, preprocessor)
+    _report_stage(report, 'encode')
+    if key is not None:
+        feature_store.save(key, source, frame, X, y, preprocessor)
+    return frame, X, y, preprocessor
+
+
+def split_indices(y):
+    """Row indices of the notebook's stratified 80/20 split"""
+    return train_test_split(np.arange(len(y)), test_size=TEST_SIZE,
+                            random_state=RANDOM_STATE, stratify=y[:, 1])
+
+
+def prepare_sparse(source, encoder, preprocessor=None, report=None, use_cache=True):
+    """Load, encode and split without densifying; returns CSR splits and int targets"""
+    report = {} if report is None else report
+    frame, X, y, preprocessor = load_features(source, encoder, preprocessor, report, use_cache)
+    del frame
+
+    # Split row indices, then take CSR rows - no frame or matrix copy per split
+    train_idx, test_idx = split_indices(y)
+    splits = (X[train_idx], X[test_idx], y[train_idx], y[test_idx])
+    del X
+    _report_stage(report, 'split')
+    return splits, preprocessor, report
+
+
+# Code whose output the feature store caches; editing any of it invalidates entries
+PIPELINE_FUNCTIONS = [load_training_arrays, align_to_encoder, new_preprocessor, _encode_features]
+
+
+def train_in_memory(source, encoder, preprocessor=None, n_trees=200, n_jobs=-1, use_cache=True):
+    """Notebook-equivalent training on the sparse design matrix"""
+    report = {}
+    (X_train, X_test, y_train, y_test), preprocessor, report = prepare_sparse(
+        source, encoder, preprocessor, report, use_cache)
+    print(f"📊 Design matrix: {X_train.shape[0] + X_test.shape[0]:,} x {X_train.shape[1]:,}, "
+          f"{(X_train.data.nbytes + X_train.indices.nbytes + X_test.data.nbytes + X_test.indices.nbytes) / 1e6:,.0f} MB sparse "
+          f"vs {(X_train.shape[0] + X_test.shape[0]) * X_train.shape[1] / 1e6:,.0f} MB as a dense bool frame")
+
+    rf = RandomForestClassifier(**dict(FOREST_PARAMS, n_estimators=n_trees), n_jobs=n_jobs)
+    model = MultiOutputClassifier(rf)
+    model.fit(X_train, y_train)
+    _report_stage(report, 'fit')
+
+    y_pred = model.predict(X_test)
+    for t, target in enumerate(TARGETS):
+        report[f'accuracy_{target}'] = accuracy_score(y_test[:, t], y_pred[:, t])
+        print(f"=== {target} === Accuracy: {report[f'accuracy_{target}']:.4f}")
+    return model, preprocessor, report
+
+
+def _dense_notebook_peak(source, encoder_path):
+    """Peak RSS of the notebook's get_dummies preparation (runs in a child process)"""
+    import pandas as pd
+
+    encoder = joblib.load(encoder_path)
+    df = load_labeled_frame(source, encoder)
+    df_encoded = pd.get_dummies(df, columns=CATEGORICAL_FEATURES, drop_first=True)
+    X = df_encoded.drop(columns=TARGETS)
+    y = df_encoded[TARGETS]
+    train_test_split(X, y, test_size=TEST_SIZE, random_state=RANDOM_STATE,
+                     stratify=y['Crime Category'])
+    return peak_rss_mb()
+
+
+def _sparse_peak(source, encoder_path):
+    """Peak RSS of prepare_sparse (runs in a child process)"""
+    prepare_sparse(source, joblib.load(encoder_path), use_cache=False)
+    return peak_rss_mb()
+
+
+def compare_dense(source):
+    """Run both preparations in fresh processes so their peaks do not mix"""
+    context = multiprocessing.get_context('spawn')
+    results = {}
+    for name, func in (('sparse', _sparse_peak), ('dense', _dense_notebook_peak)):
+        with context.Pool(1) as pool:
+            results[name] = pool.apply(func, (source, ENCODER_PATH))
+    if None not in results.values():
+        print(f"🧠 Preparation peak RSS: get_dummies {results['dense']:,.0f} MB, "
+              f"sparse {results['sparse']:,.0f} MB "
+              f"(ratio {results['dense'] / results['sparse']:.1f}x)")
+    return results
+
+
+def scan(source, encoder, chunksize, collect_categories):
+    """First pass: row count, per-target class counts and (optionally) category sets"""
+    n_rows = 0
+    class_counts = [dict() for _ in TARGETS]
+    categories = {name: set() for name in CATEGORICAL_FEATURES}
+    for chunk in iter_labeled_chunks(source, encoder, chunksize):
+        n_rows += len(chunk)
+        for t, target in enumerate(TARGETS):
+            for label, count in chunk[target].value_counts().items():
+                class_counts[t][label] = class_counts[t].get(label, 0) + int(count)
+        if collect_categories:
+            for name in CATEGORICAL_FEATURES:
+                categories[name].update(chunk[name].astype(str).unique())
+    return n_rows, class_counts, categories
+
+
+def fit_preprocessor(categories, sample):
+    """ColumnTransformer like the notebook's, with categories fixed from the full scan"""
+    preprocessor = new_preprocessor()
+    preprocessor.set_params(cat__categories=[sorted(categories[name]) for name in CATEGORICAL_FEATURES])
+    preprocessor.fit(sample[CATEGORICAL_FEATURES].astype(str))
+    return preprocessor
+
+
+def balanced_weights(counts):
+    """class_weight='balanced': n_samples / (n_classes * count)"""
+    total = sum(counts.values())
+    return {label: total / (len(counts) * count) for label, count in counts.items()}
+
+
+def encode(chunk, preprocessor):
+    X = preprocessor.transform(align_to_encoder(chunk, preprocessor))
+    return sp.csr_matrix(X, dtype=np.float32)
+
+
+def draw_group(source, encoder, preprocessor, seeds, rate, chunksize):
+    """One streaming pass collecting a Poisson bootstrap sample for each tree seed"""
+    rngs = [np.random.default_rng(seed) for seed in seeds]
+    parts = [([], [], []) for _ in seeds]
+    for chunk in iter_labeled_chunks(source, encoder, chunksize):
+        X = encode(chunk, preprocessor)
+        y = chunk[TARGETS].to_numpy()
+        for rng, (xs, ys, counts) in zip(rngs, parts):
+            draw = rng.poisson(rate, size=len(chunk))
+            rows = np.flatnonzero(draw)
+            xs.append(X[rows])
+            ys.append(y[rows])
+            counts.append(draw[rows])
+    return [(sp.vstack(xs).tocsr(), np.concatenate(ys), np.concatenate(counts))
+            for xs, ys, counts in parts]
+
+
+def fit_tree(X, y, counts, weights, seed):
+    sample_weight = counts * np.array([weights[label] for label in y], dtype=np.float64)
+    tree = DecisionTreeClassifier(max_features='sqrt', random_state=seed)
+    return tree.fit(X, y, sample_weight=sample_weight)
+
+
+def assemble_forest(trees, classes, n_features, params):
+    """RandomForestClassifier holding pre-grown trees, as if fit() had built them
+
+    Trees whose sample lacked some classes are expanded to vote over all of them.
+    """
+    classes = np.asarray(classes)
+    forest = RandomForestClassifier(**params)
+    forest.estimator_ = DecisionTreeClassifier(max_features=params['max_features'])
+    forest.estimators_ = [expand_classes(tree, classes) for tree in trees]
+    forest.classes_ = classes
+    forest.n_classes_ = len(classes)
+    forest.n_outputs_ = 1
+    forest.n_features_in_ = n_features
+    forest.n_estimators = len(trees)
+    return forest
+
+
+def check_forest(forest, X):
+    """Raise if the assembled forest's predict_proba is not one distribution per row over its classes"""
+    proba = forest.predict_proba(X)
+    if proba.shape != (X.shape[0], forest.n_classes_) or not np.allclose(proba.sum(axis=1), 1):
+        raise RuntimeError(f"Assembled forest returned probabilities of shape {proba.shape} "
+                           f"for {X.shape[0]} rows and {forest.n_classes_} classes")
+
+
+def train_out_of_core(source, encoder, preprocessor=None, n_trees=200, sample_rows=1000000,
+                      group_size=10, chunksize=200000, n_jobs=-1, seed=42):
+    """Stream `source` and grow the multi-target forest group by group"""
+    n_rows, class_counts, categories = scan(source, encoder, chunksize, preprocessor is None)
+    print(f"📊 {n_rows:,} rows; sampling {min(sample_rows, n_rows):,} per tree")
+    if preprocessor is None:
+        sample = next(iter_labeled_chunks(source, encoder, 1))
+        preprocessor = fit_preprocessor(categories, sample)
+
+    rate = min(sample_rows, n_rows) / n_rows
+    weights = [balanced_weights(counts) for counts in class_counts]
+    trees = [[] for _ in TARGETS]
+    rng = np.random.default_rng(seed)
+    seeds = rng.integers(0, 2 ** 31 - 1, size=n_trees)
+    for start in range(0, n_trees, group_size):
+        group_seeds = seeds[start:start + group_size]
+        samples = draw_group(source, encoder, preprocessor, group_seeds, rate, chunksize)
+        # Both targets share each bootstrap sample; feature sampling differs per tree
+        fitted = Parallel(n_jobs=n_jobs, prefer='threads')(
+            delayed(fit_tree)(X, y[:, t], counts, weights[t], int(s) + t)
+            for (X, y, counts), s in zip(samples, group_seeds)
+            for t in range(len(TARGETS))
+        )
+        for i, tree in enumerate(fitted):
+            trees[i % len(TARGETS)].append(tree)
+        print(f"🌲 {min(start + group_size, n_trees)}/{n_trees} trees per target")
+
+    n_features = len(preprocessor.get_feature_names_out())
+    params = dict(FOREST_PARAMS, n_estimators=n_trees, max_samples=rate)
+    forests = [assemble_forest(trees[t], sorted(class_counts[t]), n_features, params)
+               for t in range(len(TARGETS))]
+    check = samples[0][0][:1000]
+    for forest in forests:
+        check_forest(forest, check)
+    model = MultiOutputClassifier(RandomForestClassifier(**FOREST_PARAMS))
+    model.estimators_ = forests
+    model.n_features_in_ = n_features
+    return model, preprocessor
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Train the multi-target forest")
+    parser.add_argument('--source', default=TRAINING_CSV,
+                        help="training CSV or SQLite database (Parquet store too with --out-of-core)")
+    parser.add_argument('--trees', type=int, default=FOREST_PARAMS['n_estimators'])
+    parser.add_argument('--compare-dense', action='store_true',
+                        help="measure the notebook's get_dummies preparation for comparison")
+    parser.add_argument('--out-of-core', action='store_true',
+                        help="stream the source and bag trees on bounded bootstrap samples")
+    parser.add_argument('--sample-rows', type=int, default=1000000,
+                        help="expected bootstrap sample size per tree (--out-of-core)")
+    parser.add_argument('--group-size', type=int, default=10,
+                        help="trees grown per streaming pass, memory ~ group size x sample rows (--out-of-core)")
+    parser.add_argument('--chunksize', type=int, default=200000)
+    parser.add_argument('--reuse-preprocessor', action='store_true',
+                        help="encode with the fitted preprocessor instead of fitting a new one")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="rebuild features instead of using the feature store")
+    parser.add_argument('--n-jobs', type=int, default=-1)
+    parser.add_argument('--output', default=OUTPUT_MODEL_PATH)
+    parser.add_argument('--preprocessor-output', default=OUTPUT_PREPROCESSOR_PATH)
+    args = parser.parse_args()
+
+    start = time.time()
+    encoder = joblib.load(ENCODER_PATH)
+    preprocessor = joblib.load(PREPROCESSOR_PATH) if args.reuse_preprocessor else None
+    if args.out_of_core:
+        model, preprocessor = train_out_of_core(args.source, encoder, preprocessor, args.trees,
+                                                args.sample_rows, args.group_size, args.chunksize,
+                                                args.n_jobs)
+    else:
+        if args.compare_dense:
+            compare_dense(args.source)
+        model, preprocessor, _ = train_in_memory(args.source, encoder, preprocessor,
+                                                 args.trees, args.n_jobs, not args.no_cache)
+    joblib.dump(model, args.output)
+    joblib.dump(preprocessor, args.preprocessor_output)
+    print(f"✅ Saved {args.output} and {args.preprocessor_output} in {time.time() - start:.1f}s")
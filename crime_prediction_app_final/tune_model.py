@@ -0,0 +1,181 @@
+# tune_model.py
+# Hyperparameter search for the forest with successive halving / Hyperband.
+#
+# Candidate settings for max_depth, min_samples_leaf, n_estimators and
+# max_features are first fitted on a small subset of the training rows; only
+# the best 1/eta of each rung is promoted to eta times more rows, so expensive
+# full-size fits are spent on a few promising settings. Trials run across a
+# process pool. Each trial is scored on a validation split carved out of the
+# notebook's training rows (the notebook's test rows are left untouched) by
+#
+#   objective = mean accuracy over both targets
+#               - size_weight * pickled size in 100 MB
+#               - latency_weight * single-request latency in ms
+#
+# and every trial is appended to a JSON-lines log as it finishes.
+#
+# Usage:
+#   python tune_model.py --candidates 27 --min-rows 20000 --eta 3
+#   python tune_model.py --hyperband --workers 8
+import argparse
+import json
+import math
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import train_test_split
+from sklearn.multioutput import MultiOutputClassifier
+
+from config import ENCODER_PATH, TARGETS
+from features import TRAINING_CSV, RANDOM_STATE
+from train_model import prepare_sparse
+
+SEARCH_SPACE = {
+    'max_depth': [None, 12, 16, 20, 24, 32],
+    'min_samples_leaf': [1, 2, 4, 8, 16],
+    'n_estimators': [50, 100, 200, 300],
+    'max_features': ['sqrt', 'log2', 0.1]
+}
+TRIALS_LOG = 'tuning_trials.jsonl'
+BEST_PATH = 'tuning_best.json'
+LATENCY_RUNS = 20
+
+_data = {}
+
+
+def sample_configs(n, seed):
+    rng = np.random.default_rng(seed)
+    configs = []
+    seen = set()
+    while len(configs) < n and len(seen) < np.prod([len(v) for v in SEARCH_SPACE.values()]):
+        config = {name: values[rng.integers(len(values))] for name, values in SEARCH_SPACE.items()}
+        key = json.dumps(config, sort_keys=True, default=str)
+        if key not in seen:
+            seen.add(key)
+            configs.append(config)
+    return configs
+
+
+def _init_worker(X_train, y_train, X_val, y_val, weights):
+    _data.update(X_train=X_train, y_train=y_train, X_val=X_val, y_val=y_val, weights=weights)
+
+
+def run_trial(trial):
+    """Fit one config on the first n_rows training rows and score it"""
+    start = time.time()
+    n_rows = trial['rows']
+    rf = RandomForestClassifier(class_weight='balanced', random_state=RANDOM_STATE, n_jobs=1,
+                                **trial['params'])
+    model = MultiOutputClassifier(rf).fit(_data['X_train'][:n_rows], _data['y_train'][:n_rows])
+
+    X_val, y_val = _data['X_val'], _data['y_val']
+    y_pred = model.predict(X_val)
+    accuracy = {target: float(np.mean(y_pred[:, t] == y_val[:, t])) for t, target in enumerate(TARGETS)}
+
+    single = X_val[:1]
+    timings = []
+    for _ in range(LATENCY_RUNS):
+        t0 = time.perf_counter()
+        model.predict(single)
+        timings.append(time.perf_counter() - t0)
+    latency_ms = float(np.median(timings) * 1000)
+    size_mb = len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)) / 1e6
+
+    size_weight, latency_weight = _data['weights']
+    objective = (float(np.mean(list(accuracy.values())))
+                 - size_weight * size_mb / 100 - latency_weight * latency_ms)
+    return dict(trial, accuracy=accuracy, size_mb=round(size_mb, 2),
+                latency_ms=round(latency_ms, 3), objective=round(objective, 6),
+                seconds=round(time.time() - start, 1))
+
+
+def successive_halving(pool, configs, min_rows, max_rows, eta, log, bracket=0):
+    """Promote the best 1/eta of each rung to eta times more rows"""
+    rows = min_rows
+    rung = 0
+    results = []
+    while configs:
+        trials = [{'bracket': bracket, 'rung': rung, 'rows': min(rows, max_rows), 'params': c}
+                  for c in configs]
+        results = list(pool.map(run_trial, trials))
+        for result in results:
+            log.write(json.dumps(result, default=str) + '\n')
+            log.flush()
+            print(f"   rung {rung} rows {result['rows']:>9,}  objective {result['objective']:.4f}  "
+                  f"acc {result['accuracy']}  {result['size_mb']} MB  {result['latency_ms']} ms")
+        if rows >= max_rows or len(configs) == 1:
+            break
+        results.sort(key=lambda r: r['objective'], reverse=True)
+        configs = [r['params'] for r in results[:max(1, len(configs) // eta)]]
+        rows *= eta
+        rung += 1
+    return max(results, key=lambda r: r['objective'])
+
+
+def hyperband(pool, max_rows, min_rows, eta, seed, log):
+    """Brackets trading many cheap trials against few expensive ones"""
+    if max_rows < min_rows:
+        raise ValueError(f"max_rows ({max_rows:,}) must be at least min_rows ({min_rows:,})")
+    s_max = max(0, int(math.log(max_rows / min_rows, eta)))
+    best = None
+    for s in range(s_max, -1, -1):
+        n = int(math.ceil((s_max + 1) / (s + 1) * eta ** s))
+        start_rows = int(max_rows * eta ** -s)
+        print(f"🎯 Bracket {s}: {n} configs from {start_rows:,} rows")
+        result = successive_halving(pool, sample_configs(n, seed + s), start_rows, max_rows,
+                                    eta, log, bracket=s)
+        if best is None or result['objective'] > best['objective']:
+            best = result
+    return best
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Tune the forest with successive halving")
+    parser.add_argument('--source', default=TRAINING_CSV,
+                        help="training CSV or SQLite database with crime_table")
+    parser.add_argument('--candidates', type=int, default=27)
+    parser.add_argument('--min-rows', type=int, default=20000, help="rows in the first rung")
+    parser.add_argument('--max-rows', type=int, help="rows in the last rung (default: all)")
+    parser.add_argument('--eta', type=int, default=3)
+    parser.add_argument('--hyperband', action='store_true', help="run Hyperband brackets")
+    parser.add_argument('--size-weight', type=float, default=0.01,
+                        help="objective penalty per 100 MB of pickled model")
+    parser.add_argument('--latency-weight', type=float, default=0.005,
+                        help="objective penalty per ms of single-request latency")
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--seed', type=int, default=RANDOM_STATE)
+    parser.add_argument('--log', default=TRIALS_LOG)
+    parser.add_argument('--output', default=BEST_PATH)
+    args = parser.parse_args()
+
+    encoder = joblib.load(ENCODER_PATH)
+    (X_train, _, y_train, _), _, _ = prepare_sparse(args.source, encoder)
+    X_fit, X_val, y_fit, y_val = train_test_split(X_train, y_train, test_size=0.2,
+                                                  random_state=args.seed, stratify=y_train[:, 1])
+    # Shuffle once so every rung's subset is a prefix of the next one
+    order = np.random.default_rng(args.seed).permutation(X_fit.shape[0])
+    X_fit, y_fit = X_fit[order], y_fit[order]
+    max_rows = min(args.max_rows or X_fit.shape[0], X_fit.shape[0])
+    if max_rows < args.min_rows:
+        parser.error(f"--min-rows {args.min_rows:,} exceeds the {max_rows:,} rows available for tuning")
+    print(f"📊 Tuning on up to {max_rows:,} rows, validating on {X_val.shape[0]:,}")
+
+    start = time.time()
+    with open(args.log, 'a') as log, ProcessPoolExecutor(
+            max_workers=args.workers, initializer=_init_worker,
+            initargs=(X_fit, y_fit, X_val, y_val, (args.size_weight, args.latency_weight))) as pool:
+        if args.hyperband:
+            best = hyperband(pool, max_rows, args.min_rows, args.eta, args.seed, log)
+        else:
+            best = successive_halving(pool, sample_configs(args.candidates, args.seed),
+                                      args.min_rows, max_rows, args.eta, log)
+
+    with open(args.output, 'w') as f:
+        json.dump(best, f, indent=2, default=str)
+    print(f"✅ Best settings {best['params']} (objective {best['objective']:.4f}) "
+          f"in {time.time() - start:.0f}s; trials logged to {args.log}")
@@ -0,0 +1,163 @@
+# update_model.py
+# Incremental forest updates from newly inserted incidents.
+#
+# Instead of refitting all 400 trees on the full history, each run fits a
+# small batch of new trees per target on the rows inserted since the last
+# model version (or on a sliding window of the most recent rows), appends them
+# to the forest and retires the oldest trees so the forest stays the same
+# size. Cost scales with the new rows, not the history.
+#
+# Usage:
+#   python update_model.py --since-id 1500000      # first run: set the watermark
+#   python update_model.py --new-trees 20           # later runs
+#   python update_model.py --window 200000          # sliding window instead
+#
+# The new model is written atomically over the served model file; workers
+# pick it up on restart. Stale prediction tables are ignored automatically.
+import argparse
+import json
+import os
+import sqlite3
+from datetime import datetime
+
+import joblib
+import numpy as np
+from sklearn.base import clone
+from sklearn.tree._tree import Tree
+
+from config import DB_PATH, TABLE_NAME, MODEL_PATH, PREPROCESSOR_PATH, ENCODER_PATH, \
+    MODEL_VERSIONS_PATH, TARGETS
+from features import load_incidents_since, align_to_encoder
+
+
+def expand_classes(estimator, classes, labels=None):
+    """Re-index a fitted tree's class columns onto the forest's full class list
+
+    New batches may not contain every class; their trees must still vote over
+    the same classes as the rest of the forest. `labels` are the classes of
+    the tree's columns and default to its classes_. Trees taken from a fitted
+    forest hold encoded indices (0., 1., ...) in classes_, not labels, so pass
+    that forest's classes_ for them; they keep index classes_ afterwards,
+    like every other tree of a forest.
+    """
+    in_forest = labels is not None
+    labels = estimator.classes_ if labels is None else np.asarray(labels)
+    if np.array_equal(labels, classes):
+        return estimator
+    tree = estimator.tree_
+    state = tree.__getstate__()
+    positions = np.searchsorted(classes, labels)
+    values = np.zeros((state['values'].shape[0], 1, len(classes)))
+    values[:, :, positions] = state['values']
+
+    expanded = Tree(tree.n_features, np.array([len(classes)], dtype=np.intp), 1)
+    expanded.__setstate__({
+        'max_depth': state['max_depth'],
+        'node_count': state['node_count'],
+        'nodes': state['nodes'],
+        'values': values
+    })
+    estimator.tree_ = expanded
+    estimator.classes_ = np.arange(len(classes), dtype=np.float64) if in_forest else classes
+    estimator.n_classes_ = len(classes)
+    return estimator
+
+
+def add_trees(forest, X, y, n_trees, max_trees, seed):
+    """Fit n_trees on (X, y), append them and drop the oldest beyond max_trees"""
+    batch = clone(forest).set_params(n_estimators=n_trees, random_state=seed, warm_start=False)
+    batch.fit(X, y)
+    new_trees = [expand_classes(tree, forest.classes_, batch.classes_) for tree in batch.estimators_]
+
+    estimators = list(forest.estimators_) + new_trees
+    retired = max(0, len(estimators) - max_trees)
+    forest.estimators_ = estimators[retired:]
+    forest.n_estimators = len(forest.estimators_)
+    return retired
+
+
+def read_versions(path=MODEL_VERSIONS_PATH):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_versions(versions, path=MODEL_VERSIONS_PATH):
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(versions, f, indent=2)
+    os.replace(tmp, path)
+
+
+def max_id(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(f'SELECT MAX("ID") FROM "{TABLE_NAME}"').fetchone()[0] or 0
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Add trees trained on new incidents to the forest")
+    parser.add_argument('--db', default=DB_PATH)
+    parser.add_argument('--since-id', type=int,
+                        help="train on rows with a higher ID (defaults to the last version's watermark)")
+    parser.add_argument('--window', type=int,
+                        help="train on the most recent N rows instead of the rows since the watermark")
+    parser.add_argument('--new-trees', type=int, default=20, help="trees added per target")
+    parser.add_argument('--max-trees', type=int,
+                        help="forest size after retiring the oldest trees (default: unchanged)")
+    parser.add_argument('--min-rows', type=int, default=1000,
+                        help="skip the update when fewer new rows are available")
+    parser.add_argument('--include-predicted', action='store_true',
+                        help="also train on rows written by /predict (model output, not ground truth)")
+    args = parser.parse_args()
+
+    versions = read_versions()
+    if versions is None and args.since_id is None and not args.window:
+        versions = {'version': 1, 'last_id': max_id(args.db), 'history': []}
+        write_versions(versions)
+        print(f"✅ Watermark initialised at ID {versions['last_id']:,}; "
+              f"the next run trains on rows inserted after it")
+        raise SystemExit(0)
+    versions = versions or {'version': 1, 'last_id': 0, 'history': []}
+    since_id = args.since_id if args.since_id is not None else versions['last_id']
+
+    print("📦 Loading AI models...")
+    model = joblib.load(MODEL_PATH)
+    preprocessor = joblib.load(PREPROCESSOR_PATH)
+    encoder = joblib.load(ENCODER_PATH)
+
+    df = load_incidents_since(args.db, encoder, since_id, args.window, args.include_predicted)
+    if len(df) < args.min_rows:
+        print(f"⏭️  Only {len(df):,} new rows (minimum {args.min_rows:,}); model unchanged")
+        raise SystemExit(0)
+
+    X = preprocessor.transform(align_to_encoder(df, preprocessor))
+    version = versions['version'] + 1
+    retired = []
+    for t, (target, forest) in enumerate(zip(TARGETS, model.estimators_)):
+        max_trees = args.max_trees or len(forest.estimators_)
+        retired.append(add_trees(forest, X, df[target].to_numpy(), args.new_trees,
+                                 max_trees, seed=42 + version))
+        print(f"=== {target} === +{args.new_trees} trees, -{retired[-1]} retired, "
+              f"{len(forest.estimators_)} total")
+
+    tmp = MODEL_PATH + '.tmp'
+    joblib.dump(model, tmp)
+    os.replace(tmp, MODEL_PATH)
+
+    last_id = int(df['ID'].max()) if args.window is None else max(versions['last_id'], int(df['ID'].max()))
+    versions['history'].append({
+        'version': version,
+        'rows': len(df),
+        'from_id': since_id if args.window is None else int(df['ID'].min()),
+        'to_id': int(df['ID'].max()),
+        'trees_added': args.new_trees,
+        'trees_retired': retired,
+        'published_at': datetime.now().isoformat()
+    })
+    versions.update({'version': version, 'last_id': last_id})
+    write_versions(versions)
+    print(f"✅ Published model version {version} trained on {len(df):,} new rows")
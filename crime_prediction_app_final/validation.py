@@ -0,0 +1,120 @@
+# validation.py
+# Request validation and normalization compiled from the fitted encoder.
+#
+# Text fields are normalized like the training notebook's
+# .str.upper().str.strip(); numeric fields accept 12, "12", " 12 " or "12.0"
+# and are range-checked; Domestic also accepts booleans and yes/no. Values are
+# then matched against the OneHotEncoder's fitted categories, so an input the
+# encoder would silently zero (handle_unknown='ignore') is reported instead.
+# Valid values come back as the fitted category itself, typed like it (the
+# notebook fits District as '12.0' but HourofDay as int64), so a record turned
+# into a frame encodes exactly like a training row. DayorNight is always
+# derived from HourofDay on the server.
+#
+# The per-field tables are built once at startup; validating a row is a few
+# string operations and dict lookups, so it is cheap enough for every row of
+# a batch. Errors are returned as a list of {'field', 'code', 'message',
+# 'value'} dicts (plus 'row' for batches and 'suggestions' for close matches).
+from difflib import get_close_matches
+
+from config import CATEGORICAL_FEATURES
+from risk_grid import day_or_night
+
+# Inclusive ranges of the integer fields
+RANGES = {'Domestic': (0, 1), 'District': (1, 25), 'DayOfWeek': (0, 6), 'HourofDay': (0, 23)}
+BOOLEAN_WORDS = {'TRUE': 1, 'FALSE': 0, 'YES': 1, 'NO': 0, 'Y': 1, 'N': 0}
+DERIVED = {'DayorNight'}
+MAX_SUGGESTIONS = 3
+
+
+def _error(field, code, message, value):
+    return {'field': field, 'code': code, 'message': message, 'value': value}
+
+
+def _to_int(value, words=None):
+    """12, '12', ' 12 ', '12.0' -> 12; ValueError for anything else"""
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, int):
+        return value
+    text = str(value).strip().upper()
+    if words and text in words:
+        return words[text]
+    number = float(text)
+    if not number.is_integer():
+        raise ValueError(f"{value!r} is not a whole number")
+    return int(number)
+
+
+class InputValidator:
+    """Validates /predict-style records against the fitted categories"""
+
+    def __init__(self, categories):
+        self.allowed = {}
+        # Range-checked number of each numeric category, for writing crime_table rows
+        self.numbers = {}
+        for name, fitted in categories.items():
+            if name in RANGES:
+                self.allowed[name] = {str(int(float(c))): c for c in fitted.tolist()}
+                self.numbers[name] = {c: int(float(c)) for c in fitted.tolist()}
+            else:
+                self.allowed[name] = {str(c).strip().upper(): c for c in fitted.tolist()}
+
+    def _field(self, name, raw):
+        """(canonical value, None) or (None, error)"""
+        if name in RANGES:
+            try:
+                number = _to_int(raw, BOOLEAN_WORDS if name == 'Domestic' else None)
+            except (TypeError, ValueError):
+                return None, _error(name, 'invalid_type', f"{name} must be a whole number", raw)
+            low, high = RANGES[name]
+            if not low <= number <= high:
+                return None, _error(name, 'out_of_range', f"{name} must be between {low} and {high}", raw)
+            key = str(number)
+        else:
+            key = str(raw).strip().upper()
+
+        value = self.allowed[name].get(key)
+        if value is None:
+            error = _error(name, 'unknown_category',
+                           f"{name} {key!r} was not seen in training", raw)
+            if name not in RANGES:
+                error['suggestions'] = get_close_matches(key, self.allowed[name], MAX_SUGGESTIONS)
+            return None, error
+        return value, None
+
+    def validate(self, data, fields=CATEGORICAL_FEATURES):
+        """(record {feature: fitted category}, errors) for one request body"""
+        record, errors = {}, []
+        for name in fields:
+            if name in DERIVED:
+                continue
+            raw = data.get(name)
+            if raw is None or (isinstance(raw, str) and not raw.strip()):
+                errors.append(_error(name, 'missing', f"{name} is required", raw))
+                continue
+            value, error = self._field(name, raw)
+            if error is None:
+                record[name] = value
+            else:
+                errors.append(error)
+        if 'DayorNight' in fields and 'HourofDay' in record:
+            derived = day_or_night(self.numbers['HourofDay'][record['HourofDay']])
+            record['DayorNight'] = self.allowed['DayorNight'].get(derived, derived)
+        return record, errors
+
+    def row_values(self, record):
+        """A validated record as crime_table stores it: numeric fields as ints"""
+        return {name: self.numbers[name][value] if name in self.numbers else value
+                for name, value in record.items()}
+
+    def validate_batch(self, rows, fields=CATEGORICAL_FEATURES):
+        """(records, errors) for many rows; errors carry the row index"""
+        records, errors = [], []
+        for i, data in enumerate(rows):
+            record, row_errors = self.validate(data, fields)
+            records.append(record)
+            for error in row_errors:
+                error['row'] = i
+                errors.append(error)
+        return records, errors
@@ -0,0 +1,77 @@
+# warmup.py
+# Startup warm-up so the first real /predict is as fast as the rest.
+#
+# A fresh worker pays for lazy imports, cold pandas / ColumnTransformer code
+# paths and first-touch page faults across the forest's node arrays on its
+# first requests. run() does all of that up front:
+#   1. reads every tree's node and value arrays (and the memory-mapped
+#      quantized forest / prediction table) so their pages are resident;
+#   2. runs the serving code paths - DataFrame -> preprocessor -> forest, the
+#      student and the lookup table - on synthetic records that together
+#      cover every fitted category, one row at a time and as one batch;
+#   3. calls any `primers` (e.g. cache fills) the app passes in.
+# The app reports ready on /health only after it finishes.
+import time
+
+import numpy as np
+
+from config import CATEGORICAL_FEATURES
+from features import encoder_categories, records_frame
+from inference import predict_with_proba, student_predict
+
+
+def synthetic_records(preprocessor):
+    """Records cycling through every fitted category of every feature"""
+    # tolist() keeps each category's type (str, or int for int-fitted columns)
+    categories = {name: values.tolist() for name, values in encoder_categories(preprocessor).items()}
+    n = max(len(values) for values in categories.values())
+    return [{name: categories[name][i % len(categories[name])] for name in CATEGORICAL_FEATURES}
+            for i in range(n)]
+
+
+def touch_model(model):
+    """Read every node array of a fitted or quantized multi-output forest; returns bytes read"""
+    touched = 0
+    for forest in model.estimators_:
+        if hasattr(forest, 'roots_'):
+            arrays = [forest.features_, forest.children_, forest.leaf_values_, forest.roots_]
+        else:
+            arrays = []
+            for estimator in forest.estimators_:
+                tree = estimator.tree_
+                arrays.extend([tree.children_left, tree.children_right, tree.feature,
+                               tree.threshold, tree.value])
+        for array in arrays:
+            np.add.reduce(array, axis=None)
+            touched += array.nbytes
+    return touched
+
+
+def run(preprocessor, serving_model, calibration=None, student=None, lookup_table=None,
+        rounds=2, touch_table=True, primers=()):
+    """Warm every serving path; returns a small report for /health"""
+    start = time.perf_counter()
+    report = {'model_bytes_touched': touch_model(serving_model)}
+    if lookup_table is not None and touch_table:
+        np.add.reduce(lookup_table.table['key'])
+        report['table_bytes_touched'] = lookup_table.table.nbytes
+
+    records = synthetic_records(preprocessor)
+    frame = records_frame(records, preprocessor)
+    for _ in range(rounds):
+        for i in range(len(records)):
+            # Same single-row path as /predict
+            X = preprocessor.transform(frame.iloc[[i]])
+            predict_with_proba(serving_model, X, calibration)
+            if student is not None:
+                student_predict(student, records[i])
+            if lookup_table is not None:
+                lookup_table.lookup(records[i])
+    predict_with_proba(serving_model, preprocessor.transform(frame), calibration)
+
+    for primer in primers:
+        primer()
+
+    report['synthetic_records'] = len(records)
+    report['seconds'] = round(time.perf_counter() - start, 3)
+    return report